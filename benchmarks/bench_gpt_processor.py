@@ -0,0 +1,73 @@
+"""
+Measure the throughput of the AI processing pipeline (prompt generation,
+requests, saving the answers) against the fake OpenAI-compatible server,
+independently of the remote service's speed.
+
+    python benchmarks/bench_gpt_processor.py --listings 500 --latency 0.05 --concurrency 50
+
+Prints the results as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+from dotenv import load_dotenv
+from database_manager import DatabaseManager
+from fake_llm_server import FakeLLMServer
+from gpt_processor import GPTProcessor
+from llm_backends import OpenAICompatibleBackend
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GPTProcessor against the fake LLM server")
+    parser.add_argument('--listings', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds the fake server waits per answer")
+    parser.add_argument('--concurrency', type=int, default=50, help="requests in flight")
+    args = parser.parse_args()
+
+    # The sample prompts are good enough, don't override a local .env
+    load_dotenv(os.path.join(ROOT, 'config', 'sample.env'))
+    os.environ['COMMANDJOBS_LISTINGS_PER_BATCH'] = str(args.listings)
+
+    server = FakeLLMServer(latency=args.latency).start_in_thread()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        listing_html = open(os.path.join(ROOT, 'config', 'base_resume.sample')).read()
+        db.cursor.executemany(
+            "INSERT INTO job_listings (original_text, original_html, source, external_id) VALUES (?, ?, ?, ?)",
+            [(f"Listing {i}", f"<p>Listing {i}</p>{listing_html}", 'benchmark', f'bench-{i}') for i in range(args.listings)])
+        db.conn.commit()
+        resume_path = os.path.join(ROOT, 'config', 'base_resume.sample')
+
+        backend = OpenAICompatibleBackend('not-needed', 'fake-model', base_url=server.base_url,
+                                          max_concurrency=args.concurrency)
+        processor = GPTProcessor(db, 'not-needed', backend=backend)
+
+        started = time.perf_counter()
+        asyncio.run(processor.process_job_listings_with_gpt(resume_path, lambda message: None))
+        elapsed = time.perf_counter() - started
+        processed = db.fetch_processed_listings_count()
+        db.close()
+
+    server.shutdown()
+    server.server_close()
+    print(json.dumps({
+        'benchmark': 'gpt_processor',
+        'listings': processed,
+        'latency': args.latency,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 3),
+        'listings_per_second': round(processed / elapsed, 1) if elapsed else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
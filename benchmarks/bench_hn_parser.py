@@ -0,0 +1,62 @@
+"""
+Measure how fast HNScraper.parse_page extracts the top-level comments of
+saved "Who is hiring" pages, with lxml and with BeautifulSoup's html.parser.
+
+    python benchmarks/bench_hn_parser.py --repeat 20
+    python benchmarks/bench_hn_parser.py benchmarks/corpus/hn/*.html
+
+Prints the results as JSON.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, ROOT)
+
+from job_scraper.hacker_news.scraper import HNScraper, PARSERS, lxml_html
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'hn', '*.html')
+
+
+def bench_parser(parser, pages, repeat):
+    scraper = HNScraper(db_path=':memory:', window=1, parser=parser)
+    comments = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            listings, _ = scraper.parse_page(html)
+            comments += len(listings)
+    elapsed = time.perf_counter() - start
+    return {
+        'parser': parser,
+        'pages': len(pages) * repeat,
+        'comments': comments,
+        'seconds': round(elapsed, 4),
+        'pages_per_second': round(len(pages) * repeat / elapsed, 2),
+        'comments_per_second': round(comments / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HN page parsers on saved pages")
+    parser.add_argument('pages', nargs='*', help="saved thread pages (default: benchmarks/corpus/hn)")
+    parser.add_argument('--repeat', type=int, default=10, help="times each page is parsed")
+    args = parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob(CORPUS))
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    results = [bench_parser(name, pages, args.repeat) for name in PARSERS
+               if name != 'lxml' or lxml_html is not None]
+    print(json.dumps({'files': [os.path.relpath(path, ROOT) for path in paths], 'results': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Measure the scrapers offline, on the pages recorded in benchmarks/corpus
+(HN thread pages, Work at a Startup company and job pages, Workday JSON),
+listed with their URLs in benchmarks/corpus/manifest.json:
+
+    parse   listings per second of each scraper's parsing code alone
+    memory  peak memory traced while parsing, per listing
+    ingest  the whole scrape through ScrapeScheduler, with every request
+            replayed from the corpus, into a temporary SQLite db, with the
+            seconds its requests, parsing and writes took (see metrics.py)
+
+    python benchmarks/bench_scrapers.py --repeat 5 --output bench.json
+    python benchmarks/bench_scrapers.py --parse-workers 4   # ingest parsing in 4 processes
+
+Prints the results as JSON (and writes them to --output), with the commit
+they were measured on, so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from database_manager import DatabaseManager
+from job_scraper.hacker_news.scraper import HNScraper
+from job_scraper.http_cache import HttpCache
+from job_scraper.http_client import create_session
+from job_scraper.scheduler import ScrapeScheduler
+from job_scraper.waas.work_startup_scraper import WorkStartupScraper
+from job_scraper.workday.api_client import WorkdayApiClient
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus')
+SCRAPERS = ('hn', 'waas', 'workday')
+
+
+def load_corpus():
+    with open(os.path.join(CORPUS, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    files = {}
+    for response in manifest['responses']:
+        if response['file'] not in files:
+            with open(os.path.join(CORPUS, response['file']), 'rb') as f:
+                files[response['file']] = f.read()
+    return manifest, files
+
+
+def corpus_files(files, prefix):
+    return [body for path, body in sorted(files.items()) if path.startswith(prefix)]
+
+
+def hn_parser(files):
+    scraper = HNScraper(db_path=':memory:', window=1)
+    pages = [body.decode('utf-8') for body in corpus_files(files, 'hn/')]
+
+    def parse():
+        return sum(len(scraper.parse_page(html)[0]) for html in pages)
+    return parse
+
+
+def waas_parser(files):
+    jobs_page = files['waas/jobs.html']
+    company_pages = corpus_files(files, 'waas/company_')
+    job_pages = [(path, body) for path, body in sorted(files.items()) if path.startswith('waas/job_')]
+
+    def parse():
+        WorkStartupScraper.parse_company_links(jobs_page)
+        for html in company_pages:
+            WorkStartupScraper.parse_company_jobs(html)
+        return sum(1 for path, html in job_pages if WorkStartupScraper.parse_job_details(path, html))
+    return parse
+
+
+def workday_parser(files):
+    search_pages = corpus_files(files, 'workday/jobs_offset_')
+    job_files = corpus_files(files, 'workday/job_')
+
+    def parse():
+        postings = {posting['externalPath']: posting
+                    for page in search_pages for posting in json.loads(page)['jobPostings']}
+        listings = 0
+        for body in job_files:
+            job = json.loads(body)['jobPostingInfo']
+            posting = postings.get(job['externalUrl'].split('/External', 1)[1], {})
+            listings += WorkdayApiClient.listing_from_job(job, posting) is not None
+        return listings
+    return parse
+
+
+PARSERS = {'hn': hn_parser, 'waas': waas_parser, 'workday': workday_parser}
+
+
+def bench_parse(parse, repeat):
+    listings = parse()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse()
+    elapsed = time.perf_counter() - start
+    return {'listings': listings, 'seconds': round(elapsed, 4),
+            'listings_per_second': round(listings * repeat / elapsed, 1)}
+
+
+def bench_memory(parse):
+    tracemalloc.start()
+    try:
+        listings = parse()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_kb': round(peak / 1024, 1), 'peak_bytes_per_listing': round(peak / max(listings, 1))}
+
+
+def replay_session(manifest, files, directory):
+    """A session answering every request of the manifest from a replay cache, and nothing else."""
+    cache = HttpCache(directory, 'replay')
+    session = create_session(pool_size=16, max_per_host=16, cache=cache)
+    for entry in manifest['responses']:
+        request = session.prepare_request(requests.Request(entry.get('method', 'GET'), entry['url'], json=entry.get('json')))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({'Content-Type': entry.get('content_type', 'text/html; charset=utf-8')})
+        response._content = files[entry['file']]
+        response.url = entry['url']
+        cache.store(cache.key(request), response)
+    return session
+
+
+def create_db(db_path):
+    DatabaseManager(db_path).close()
+    conn = sqlite3.connect(db_path)
+    # Columns normally added by the migrations
+    conn.execute("ALTER TABLE job_listings ADD COLUMN scraped_at TEXT")
+    conn.execute("ALTER TABLE job_listings ADD COLUMN thread_month TEXT")
+    conn.close()
+
+
+def bench_ingest(manifest, files, source_names, tmp_dir, parse_workers=0):
+    run_dir = tempfile.mkdtemp(dir=tmp_dir)
+    db_path = os.path.join(run_dir, 'bench.db')
+    create_db(db_path)
+    session = replay_session(manifest, files, os.path.join(run_dir, 'http'))
+    options = dict(manifest['sources'])
+    options['hn'] = {**options['hn'], 'backend': 'html'}
+    options['workday'] = {**options['workday'], 'backend': 'api'}
+    scheduler = ScrapeScheduler(db_path, source_names, session=session, source_options=options,
+                                parse_workers=parse_workers)
+    start = time.perf_counter()
+    results = scheduler.run()
+    elapsed = time.perf_counter() - start
+    listings = sum(result['listings'] for result in results.values())
+    return {'listings': listings, 'new': sum(result['new'] for result in results.values()),
+            'seconds': round(elapsed, 4), 'listings_per_second': round(listings / elapsed, 1),
+            'errors': {name: result['error'] for name, result in results.items() if result['error']},
+            'timers': scheduler.metrics.snapshot()['timers']}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers on the recorded corpus")
+    parser.add_argument('--repeat', type=int, default=5, help="times the corpus is parsed")
+    parser.add_argument('--scrapers', default=','.join(SCRAPERS), help="comma separated, from: " + ', '.join(SCRAPERS))
+    parser.add_argument('--parse-workers', type=int, default=0, help="processes parsing the pages while ingesting")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    manifest, files = load_corpus()
+    scrapers = [name.strip() for name in args.scrapers.split(',') if name.strip()]
+    results = {'commit': git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+               'python': sys.version.split()[0], 'parse_workers': args.parse_workers, 'scrapers': {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in scrapers:
+            parse = PARSERS[name](files)
+            results['scrapers'][name] = {
+                'parse': bench_parse(parse, args.repeat),
+                'memory': bench_memory(parse),
+                'ingest': bench_ingest(manifest, files, [name], tmp_dir, args.parse_workers),
+            }
+        # All of them at once, the way "Scrape all sources" runs them
+        results['ingest_all'] = bench_ingest(manifest, files, scrapers, tmp_dir, args.parse_workers)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == "__main__":
+    main()
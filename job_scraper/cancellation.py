@@ -0,0 +1,26 @@
+import threading
+
+
+class ScrapingInterrupt(Exception):
+    """Raised by a scraper, between pages or jobs, once its scrape was cancelled."""
+
+
+class CancelToken:
+    """
+    Set by whoever started a scrape (eg. the menu's stop key) to stop it,
+    from any thread. The scrapers check it between pages and jobs: they
+    stop fetching, hand over the listings they already parsed so they get
+    stored, then raise ScrapingInterrupt.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ScrapingInterrupt("Scraping cancelled")
@@ -0,0 +1,114 @@
+"""
+Backfill the listings of past "Ask HN: Who is hiring?" threads.
+
+The threads are found among the submissions of the whoishiring user, and
+several are crawled at once, each one as the scheduler's 'hn' source
+(see scheduler.py), through one session capped at
+{max_concurrency} requests in flight overall. Every listing is stored
+with the month of its thread (job_listings.thread_month, migration 011).
+The pages and comments are parsed by {parse_workers} processes shared by
+every thread's crawl of a backfill() (see parse_pool.py), started and
+stopped with it.
+
+    python -m job_scraper.hacker_news.backfill --months 12
+    python -m job_scraper.hacker_news.backfill --since 2024-01 --threads 4 --concurrency 32 --parse-workers 4
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from job_scraper.http_client import DEFAULT_TIMEOUT, create_session
+from job_scraper.hacker_news.scraper import HN_API_URL, HN_ITEM_URL, thread_month_from_title
+from job_scraper.parse_pool import ParsePool
+from job_scraper.scheduler import ScrapeScheduler
+
+
+class HNBackfill:
+    def __init__(self, db_path='job_listings.db', api_url=HN_API_URL, user='whoishiring', backend='api',
+                 max_threads=3, max_concurrency=16, parse_workers=None):
+        self.db_path = db_path
+        self.api_url = api_url.rstrip('/')
+        self.user = user
+        self.backend = backend
+        # How many threads are crawled at once, and how many requests
+        # are in flight overall, whichever thread they belong to
+        self.max_threads = max_threads
+        self.max_concurrency = max_concurrency
+        self.session = create_session(pool_size=max_concurrency, max_concurrency=max_concurrency)
+        self.parse_workers = parse_workers
+        # Stores the listings of every thread, the 'hn' source scrapes one thread at a time
+        self.scheduler = ScrapeScheduler(db_path, ['hn'], session=self.session)
+
+    def fetch_json(self, path):
+        response = self.session.get(f"{self.api_url}/{path}", timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def discover_threads(self, months=12, since=None):
+        """
+        Return [(thread id, month)] of the "Who is hiring" threads, newest
+        first: the last {months}, or every one since the {since} month ('2024-01').
+        """
+        submitted = self.fetch_json(f"user/{self.user}.json").get('submitted') or []
+        threads = []
+        # whoishiring posts 3 threads a month (hiring, freelancer, wants to be hired)
+        chunk_size = 30
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for start in range(0, len(submitted), chunk_size):
+                items = executor.map(lambda item_id: self.fetch_json(f"item/{item_id}.json"),
+                                     submitted[start:start + chunk_size])
+                for item in items:
+                    month = thread_month_from_title((item or {}).get('title'))
+                    if month is None:
+                        continue
+                    if since and month < since:
+                        return threads
+                    threads.append((item['id'], month))
+                    if not since and len(threads) >= months:
+                        return threads
+        return threads
+
+    def scrape_thread(self, thread_id, month, parse_pool=None):
+        """Scrape the thread and return its result, see ScrapeScheduler.run()."""
+        return self.scheduler.run_source('hn', parse_pool, start_url=f"{HN_ITEM_URL}{thread_id}", backend=self.backend,
+                                         api_url=self.api_url, api_concurrency=self.max_concurrency, thread_month=month)
+
+    def backfill(self, months=12, since=None, update_func=None):
+        """Crawl the threads, {max_threads} at a time, and return {month: new listings}."""
+        threads = self.discover_threads(months, since)
+        if update_func:
+            update_func(f"Found {len(threads)} \"Who is hiring\" threads, crawling {self.max_threads} at a time")
+        results = {}
+        with ParsePool(self.parse_workers) as parse_pool, ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+            futures = {executor.submit(self.scrape_thread, thread_id, month, parse_pool=parse_pool): month
+                       for thread_id, month in threads}
+            for future in as_completed(futures):
+                month = futures[future]
+                result = future.result()
+                results[month] = result['new']
+                if update_func:
+                    failed = f", failed ({result['error']})" if result['error'] else ""
+                    update_func(f"{month}: {results[month]} new listings{failed} ({len(results)}/{len(threads)} threads)")
+        return dict(sorted(results.items(), reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the listings of past \"Ask HN: Who is hiring?\" threads")
+    parser.add_argument('--db', default='job_listings.db')
+    parser.add_argument('--months', type=int, default=12, help="how many of the latest threads to crawl")
+    parser.add_argument('--since', help="crawl every thread since this month instead, eg. 2024-01")
+    parser.add_argument('--threads', type=int, default=3, help="threads crawled at once")
+    parser.add_argument('--concurrency', type=int, default=16, help="requests in flight overall")
+    parser.add_argument('--backend', choices=('api', 'html'), default='api')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="processes parsing the comments, COMMANDJOBS_PARSE_WORKERS by default")
+    parser.add_argument('--api-url', default=HN_API_URL)
+    args = parser.parse_args()
+
+    backfill = HNBackfill(args.db, api_url=args.api_url, backend=args.backend,
+                          max_threads=args.threads, max_concurrency=args.concurrency, parse_workers=args.parse_workers)
+    results = backfill.backfill(args.months, args.since, update_func=print)
+    print(f"Backfill complete: {sum(results.values())} new listings from {len(results)} threads")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,324 @@
-import requests
-from bs4 import BeautifulSoup
+import json
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
 import sqlite3
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-# Define a new exception for interrupting scraping
-class ScrapingInterrupt(Exception):
-    pass
+from job_scraper.cancellation import CancelToken
+from job_scraper.http_client import DEFAULT_TIMEOUT, create_session
+from job_scraper.metrics import ScrapeMetrics
+from job_scraper.parse_pool import ParsePool
+from job_scraper.storage import load_known_external_ids
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # optional, pages are parsed with BeautifulSoup's html.parser instead
+    lxml_html = None
+
+HN_API_URL = 'https://hacker-news.firebaseio.com/v0'
+HN_ITEM_URL = 'https://news.ycombinator.com/item?id='
+BACKENDS = ('html', 'api')
+PARSERS = ('lxml', 'html.parser')
+
+# Only the comment rows and the "More" link are built into a tree
+COMMENT_ROWS_STRAINER = SoupStrainer(['tr', 'a'], class_=['athing comtr', 'morelink'])
+TOP_LEVEL_COMMENTS_XPATH = ("//tr[contains(concat(' ', @class, ' '), ' comtr ')]"
+                            "[.//td[@class='ind']/img[@width='0']]")
+
+HIRING_TITLE_RE = re.compile(r"Ask HN: Who is hiring\? \((\w+) (\d{4})\)", re.IGNORECASE)
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+def thread_month_from_title(title):
+    """Return '2025-09' for "Ask HN: Who is hiring? (September 2025)", None for other titles."""
+    match = HIRING_TITLE_RE.search(title or '')
+    if not match or match.group(1).lower() not in MONTHS:
+        return None
+    return f"{match.group(2)}-{MONTHS.index(match.group(1).lower()) + 1:02d}"
 
 class HNScraper:
-    def __init__(self, db_path='job_listings.db'):
+    def __init__(self, db_path='job_listings.db', session=None, window=3, backend='html',
+                 api_url=HN_API_URL, api_concurrency=32, parser=None, thread_month=None, metrics=None,
+                 cancel_token=None, parse_pool=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HN backend {backend}, should be one of: {', '.join(BACKENDS)}")
+        # lxml when it's installed, it parses pages several times faster
+        self.parser = parser or ('lxml' if lxml_html is not None else 'html.parser')
+        if self.parser not in PARSERS:
+            raise ValueError(f"Unknown HN parser {self.parser}, should be one of: {', '.join(PARSERS)}")
+        if self.parser == 'lxml' and lxml_html is None:
+            raise ValueError("The lxml parser needs lxml installed: pip install lxml")
         self.db_path = db_path
-        # Define the base URL for Ask HN: Who's hiring
-        self.base_url = 'https://news.ycombinator.com/item?id=45093192&p=1'
-        self.new_entries_count = 0  # Initialize counter for new entries
-
-    def save_to_database(self, original_text, original_html, source, external_id):
-        """Save a job listing to the SQLite database."""
-        from datetime import datetime
-        
+        # 'html' pages through the thread, 'api' reads its comments from the HN item API
+        self.backend = backend
+        self.api_url = api_url.rstrip('/')
+        # How many items are requested at once from the item API
+        self.api_concurrency = api_concurrency
+        # How many pages are fetched ahead of the one being parsed
+        self.window = window
+        # Keep-alive connections shared by the page and item fetches
+        self.session = session or create_session(pool_size=max(window, api_concurrency if backend == 'api' else 0))
+        # Month of the "Who is hiring" thread ('2025-09') stored with its listings,
+        # read from the thread's title by the API backend when not given
+        self.thread_month = thread_month
+        # Where the time spent parsing is counted
+        self.metrics = metrics or ScrapeMetrics()
+        # Checked between pages, see cancellation.py
+        self.cancel_token = cancel_token or CancelToken()
+        # Where pages and items are parsed, in this thread unless it has workers
+        self.parse_pool = parse_pool or ParsePool(0)
+        # Ids of the HN comments already stored, and what the last scrape of
+        # the current thread saw, both loaded when scraping starts
+        self.known_ids = set()
+        self.thread_state = self.empty_thread_state()
+
+    @staticmethod
+    def empty_thread_state():
+        return {'page_count': 0, 'seen_ids': set(), 'validators': {}, 'last_fetched_at': None}
+
+    def load_thread_state(self, thread_id):
+        """Return what the last scrape of the thread saw (see migration 010)."""
         conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        c = conn.cursor()
-        
-        # Get current timestamp
-        scraped_at = datetime.now().isoformat()
-        
-        # Use INSERT OR IGNORE to skip existing records with the same external_id
-        c.execute("INSERT OR IGNORE INTO job_listings (original_text, original_html, source, external_id, scraped_at) VALUES (?, ?, ?, ?, ?)",
-                  (original_text, original_html, source, external_id, scraped_at))
-        conn.commit()
-        conn.close()
-        return c.rowcount > 0 # True if the listing was inserted
-
-    def scrape_hn_jobs(self, start_url, stdscr, update_func=None, done_event=None, result_queue=None):
-        """Scrape job listings from Hacker News and save them to the database."""
-        url = start_url
-        update_func(f"Scraping: {start_url}")
-        while url:
+        try:
+            row = conn.execute("SELECT page_count, seen_ids, validators, last_fetched_at FROM hn_threads WHERE thread_id = ?",
+                               (thread_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return self.empty_thread_state()
+        page_count, seen_ids, validators, last_fetched_at = row
+        return {'page_count': page_count, 'seen_ids': set(json.loads(seen_ids)),
+                'validators': json.loads(validators), 'last_fetched_at': last_fetched_at}
+
+    def save_thread_state(self, thread_id, state):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("INSERT OR REPLACE INTO hn_threads (thread_id, page_count, seen_ids, validators, last_fetched_at) VALUES (?, ?, ?, ?, ?)",
+                         (thread_id, state['page_count'], json.dumps(sorted(state['seen_ids'])),
+                          json.dumps(state['validators']), datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load_known_ids(self):
+        """Return the ids of every HN comment stored, from all threads, in one query."""
+        return {external_id[len(HN_ITEM_URL):] for external_id in load_known_external_ids(self.db_path, "Hacker News")
+                if external_id and external_id.startswith(HN_ITEM_URL)}
+
+    @staticmethod
+    def page_url(start_url, page):
+        """Return the URL of page {page} of the thread, HN paginates with &p=N."""
+        parts = urlsplit(start_url)
+        query = [(key, value) for key, value in parse_qsl(parts.query) if key != 'p']
+        query.append(('p', str(page)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    @staticmethod
+    def start_page(start_url):
+        page = dict(parse_qsl(urlsplit(start_url).query)).get('p', '1')
+        return int(page) if page.isdigit() else 1
+
+    @staticmethod
+    def make_listing(comment_id, original_text, original_html):
+        return {
+            'original_text': original_text,
+            'original_html': original_html,
+            'source': "Hacker News",
+            'external_id': f"{HN_ITEM_URL}{comment_id}",
+        }
+
+    def parse_page(self, html, known_ids=frozenset()):
+        """
+        Return the top-level comments of a thread page as listing dicts,
+        and whether the page links to a next one. Comments in {known_ids}
+        are skipped before their text is extracted. original_html is the
+        raw inner HTML of the comment's text.
+        """
+        parse = self.parse_page_lxml if self.parser == 'lxml' else self.parse_page_soup
+        return self.parse_pool.parse(parse, html, known_ids)
+
+    @staticmethod
+    def parse_page_soup(html, known_ids=frozenset()):
+        soup = BeautifulSoup(html, 'html.parser', parse_only=COMMENT_ROWS_STRAINER)
+        listings = []
+        comments = soup.find_all('tr', class_='athing comtr')
+        for comment in comments:
+            ind_cell = comment.find('td', class_='ind')
+            img = ind_cell.find('img') if ind_cell else None
+            if img and img.get('width') == "0":  # Top-level comment
+                # Extract the external_id from the comment element
+                comment_id = comment.get('id')
+                if comment_id in known_ids:
+                    continue
+                job_description = comment.find('div', class_='commtext c00')
+                if job_description:
+                    listings.append(HNScraper.make_listing(comment_id, job_description.text, job_description.decode_contents()))
+        has_more = soup.find('a', class_='morelink') is not None
+        return listings, has_more
+
+    @staticmethod
+    def parse_page_lxml(html, known_ids=frozenset()):
+        tree = lxml_html.fromstring(html)
+        listings = []
+        for comment in tree.xpath(TOP_LEVEL_COMMENTS_XPATH):
+            comment_id = comment.get('id')
+            if comment_id in known_ids:
+                continue
+            job_description = comment.xpath(".//div[@class='commtext c00']")
+            if job_description:
+                job_description = job_description[0]
+                inner_html = (job_description.text or '') + ''.join(
+                    lxml_html.tostring(child, encoding='unicode') for child in job_description)
+                listings.append(HNScraper.make_listing(comment_id, job_description.text_content(), inner_html))
+        has_more = bool(tree.xpath("//a[@class='morelink']"))
+        return listings, has_more
+
+    def conditional_get(self, url, validators=None):
+        """
+        GET {url}, revalidating with the ETag/Last-Modified seen last time.
+        Return the response (None when unchanged, 304) and its validators.
+        """
+        headers = {}
+        if validators and validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators and validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        response = self.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+        if response.status_code == 304:
+            return None, validators
+        response.raise_for_status()
+        new_validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        return response, new_validators if any(new_validators.values()) else None
+
+    def fetch_page(self, url, validators=None):
+        """Return the page's html (None when unchanged since the last scrape) and its validators."""
+        response, validators = self.conditional_get(url, validators)
+        return (response.text if response is not None else None), validators
+
+    def fetch_pages(self, start_url):
+        """
+        Yield (page number, html, validators) in order, forever, html is
+        None for pages unchanged since the last scrape. The next {window}
+        pages are fetched concurrently ahead of the one being parsed, the
+        caller stops at the page without a "More" link and closes the
+        generator, which drops whatever was requested past it.
+        """
+        page = self.start_page(start_url)
+        with ThreadPoolExecutor(max_workers=self.window) as executor:
+            pending = deque()
+            next_page = page
             try:
-                response = requests.get(url, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                comments = soup.find_all('tr', class_='athing comtr')
-                for comment in comments:
-                    ind_cell = comment.find('td', class_='ind')
-                    img = ind_cell.find('img') if ind_cell else None
-                    if img and img.get('width') == "0":  # Top-level comment
-                        job_description = comment.find('div', class_='commtext c00')
-                        if job_description:
-                            original_text = job_description.text
-                            original_html = job_description.prettify()
-                            # Extract the external_id from the comment element
-                            comment_id = comment.get('id')
-                            external_id = f"https://news.ycombinator.com/item?id={comment_id}"
-                            source = "Hacker News"
-                            inserted = self.save_to_database(original_text, original_html, source, external_id)
-
-                            if inserted:  # if the row was inserted
-                                self.new_entries_count += 1  # Increment the new entries count
-                                # Check for updates and interrupts
-                                if update_func:
-                                    update_func(original_text[:100])  # Call the update function with truncated text
-                            if update_func:
-                                update_func(f"Scraping: {source}")
-
-                more_link = soup.find('a', class_='morelink')
-                if more_link:
-                    url = 'https://news.ycombinator.com/' + more_link['href']
-                    if update_func:
-                        update_func(f"Page complete, loading next... {self.new_entries_count} listings added so far")
+                while True:
+                    while len(pending) < self.window:
+                        validators = self.thread_state['validators'].get(str(next_page))
+                        pending.append((next_page, executor.submit(
+                            self.fetch_page, self.page_url(start_url, next_page), validators)))
+                        next_page += 1
+                    page, future = pending.popleft()
+                    yield (page, *future.result())
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def iter_page_listings(self, start_url):
+        """Yield (progress label, listings) for each page of the thread, until the last one."""
+        state = self.thread_state
+        pages = self.fetch_pages(start_url)
+        try:
+            for page, html, validators in pages:
+                # The pages before this one are stored, this one is fetched again next time
+                self.cancel_token.check()
+                if html is None:
+                    # Unchanged since the last scrape, nothing new on it. Whether a page
+                    # follows is only known once a scrape reached the last page, an
+                    # interrupted one leaves page_count at 0 and the next pages are fetched
+                    listings, has_more = [], not state['page_count'] or page < state['page_count']
                 else:
-                    url = None
-
-            except requests.exceptions.Timeout as e:
-                if update_func:
-                    update_func("Request timed out. Try again later.")
-                break
-            
-            except requests.exceptions.RequestException as e:
-                if update_func:
-                    update_func(f"Request failed: {str(e)}")
-                break
-
-            # Handle user interrupts
-            except ScrapingInterrupt:
-                if update_func:
-                    update_func(f"Scraping interrupted by user. {self.new_entries_count} new listings added")
-                break
-
-        if update_func:
-            # Put the result into the queue
-            result_queue.put(self.new_entries_count)
-            if done_event:
-                done_event.set()  # Set the event to signal that scraping is done
-
-if __name__ == "__main__":
-    db_path = 'job_listings.db'
-    scraper = HNScraper(db_path)
-    start_url = 'https://news.ycombinator.com/item?id=45093192&p=1'
-    scraper.scrape_hn_jobs(start_url)
+                    # The <title> is at the top of the page, no need to parse it
+                    self.thread_month = self.thread_month or thread_month_from_title(html[:4096])
+                    with self.metrics.timer('parse'):
+                        listings, has_more = self.parse_page(html, self.known_ids)
+                yield f"Page {page}", listings
+                # Only once its listings are saved, an interrupted page is fetched again next time
+                if validators:
+                    state['validators'][str(page)] = validators
+                if not has_more:
+                    state['page_count'] = max(state['page_count'], page)
+                    break
+        finally:
+            pages.close()
+
+    @staticmethod
+    def thread_id(start_url):
+        return dict(parse_qsl(urlsplit(start_url).query))['id']
+
+    def fetch_item(self, item_id, validators=None):
+        response, validators = self.conditional_get(f"{self.api_url}/item/{item_id}.json", validators)
+        return response.json() if response is not None else None
+
+    @staticmethod
+    def listing_from_item(item):
+        """
+        Convert a comment from the item API to the shape parse_page returns,
+        the API's text is the same HTML as inside the comment's commtext div.
+        """
+        if not item or item.get('deleted') or item.get('dead') or not item.get('text'):
+            return None
+        job_description = BeautifulSoup(f'<div class="commtext c00">{item["text"]}</div>', 'html.parser').div
+        return HNScraper.make_listing(item['id'], job_description.text, job_description.decode_contents())
+
+    def iter_api_listings(self, start_url, batch_size=100):
+        """
+        Yield (progress label, listings) for the thread's top-level comments,
+        read from the item API {api_concurrency} at a time, in thread order.
+        Only the comments not stored yet are requested.
+        """
+        state = self.thread_state
+        response, validators = self.conditional_get(f"{self.api_url}/item/{self.thread_id(start_url)}.json",
+                                                     state['validators'].get('thread'))
+        if response is None:
+            return  # No new comments since the last scrape
+        if validators:
+            state['validators']['thread'] = validators
+        thread = response.json()
+        self.thread_month = self.thread_month or thread_month_from_title(thread.get('title'))
+        kids = [kid for kid in thread.get('kids') or [] if str(kid) not in self.known_ids]
+        with ThreadPoolExecutor(max_workers=self.api_concurrency) as executor:
+            for start in range(0, len(kids), batch_size):
+                self.cancel_token.check()
+                items = list(executor.map(self.fetch_item, kids[start:start + batch_size]))
+                with self.metrics.timer('parse'):
+                    listings = [listing for listing in self.parse_pool.map(self.listing_from_item, items) if listing]
+                yield f"{min(start + batch_size, len(kids))}/{len(kids)} comments", listings
+
+    def start_scrape(self, start_url):
+        """Load what's known of the thread from the last scrapes, and return its id."""
+        thread_id = self.thread_id(start_url)
+        self.thread_state = self.load_thread_state(thread_id)
+        self.known_ids = self.load_known_ids() | self.thread_state['seen_ids']
+        return thread_id
+
+    def iter_listings(self, start_url):
+        """Yield (progress label, listings) from the configured backend, each listing with its thread's month."""
+        if self.backend == 'api':
+            batches = self.iter_api_listings(start_url)
+        else:
+            batches = self.iter_page_listings(start_url)
+        try:
+            for label, listings in batches:
+                for listing in listings:
+                    listing['thread_month'] = self.thread_month
+                yield label, listings
+        finally:
+            batches.close()
+
+    def mark_saved(self, listings):
+        """Remember stored listings as seen, call it before asking for the next batch."""
+        for listing in listings:
+            comment_id = listing['external_id'][len(HN_ITEM_URL):]
+            self.thread_state['seen_ids'].add(comment_id)
+            self.known_ids.add(comment_id)
@@ -0,0 +1,189 @@
+"""
+An on-disk cache for the scrapers' HTTP requests, plugged into the
+requests sessions from http_client.create_session().
+
+Only successful (2xx) responses are stored, errors and rate limiting
+(429) always go back to the site. Modes:
+    cache   responses are reused for {ttl} seconds, then revalidated with
+            their ETag/Last-Modified, a 304 keeps the stored copy
+    record  every request goes to the network and its response is stored,
+            capturing a whole crawl into the directory
+    replay  every response comes from the directory, nothing goes to the
+            network and requests that weren't recorded fail with CacheMiss
+
+Entries are keyed by method, URL, body and the headers that change the
+answer (Accept, Accept-Language, Content-Type), and stored as two files:
+<key>.json (URL, status, headers, when it was stored) and <key>.body.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODES = ('cache', 'record', 'replay')
+KEY_HEADERS = ('Accept', 'Accept-Language', 'Content-Type')
+CACHED_METHODS = ('GET', 'POST')
+DEFAULT_TTL = 3600
+
+
+class CacheMiss(requests.exceptions.ConnectionError):
+    """A request that wasn't recorded, in replay mode."""
+
+
+class HttpCache:
+    def __init__(self, directory, mode='cache', ttl=DEFAULT_TTL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown HTTP cache mode {mode}, should be one of: {', '.join(MODES)}")
+        self.directory = directory
+        self.mode = mode
+        # Seconds a cached response is used without asking the site, None for forever
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(request):
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = '\n'.join(f"{name}:{request.headers.get(name, '')}" for name in KEY_HEADERS)
+        digest = hashlib.sha256(f"{request.method} {request.url}\n{headers}\n".encode('utf-8'))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def path(self, key, extension):
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def load(self, key):
+        """Return (metadata, body) of a stored response, or None."""
+        try:
+            with open(self.path(key, 'json'), encoding='utf-8') as f:
+                metadata = json.load(f)
+            with open(self.path(key, 'body'), 'rb') as f:
+                return metadata, f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_file(self, path, data):
+        # Written aside then renamed, so a reader never sees half a file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def store(self, key, response):
+        metadata = {'url': response.url, 'status': response.status_code, 'headers': dict(response.headers),
+                    'stored_at': time.time()}
+        self.write_file(self.path(key, 'body'), response.content)
+        self.write_file(self.path(key, 'json'), json.dumps(metadata).encode('utf-8'))
+
+    def touch(self, key, metadata):
+        """Mark a stored response as fresh again, after a 304."""
+        metadata['stored_at'] = time.time()
+        self.write_file(self.path(key, 'json'), json.dumps(metadata).encode('utf-8'))
+
+    def is_fresh(self, metadata):
+        return self.ttl is None or time.time() - metadata['stored_at'] < self.ttl
+
+
+def cached_response(request, metadata, body, status=None):
+    response = requests.Response()
+    response.status_code = status or metadata['status']
+    response.headers = CaseInsensitiveDict(metadata['headers'])
+    # The body is stored decoded, the headers must not ask for decoding it again
+    response.headers.pop('Content-Encoding', None)
+    response._content = b'' if response.status_code == 304 else body
+    response._content_consumed = True
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.reason = 'Not Modified' if response.status_code == 304 else 'OK (cached)'
+    response.elapsed = timedelta(0)
+    response.from_cache = True
+    return response
+
+
+def validators_match(request, metadata):
+    """Whether the caller's own If-None-Match/If-Modified-Since match the stored response."""
+    headers = CaseInsensitiveDict(metadata['headers'])
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return if_none_match == headers.get('ETag')
+    if_modified_since = request.headers.get('If-Modified-Since')
+    return bool(if_modified_since) and if_modified_since == headers.get('Last-Modified')
+
+
+class CachingAdapter(HTTPAdapter):
+    """A transport adapter answering from an HttpCache, see the modes above."""
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method not in CACHED_METHODS:
+            return super().send(request, **kwargs)
+        key = self.cache.key(request)
+        conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+
+        if self.cache.mode == 'record':
+            return self.send_and_store(key, request, **kwargs)
+
+        entry = self.cache.load(key)
+        if self.cache.mode == 'replay':
+            if entry is None:
+                raise CacheMiss(f"Not recorded: {request.method} {request.url}", request=request)
+            return self.answer(request, *entry)
+
+        if entry is not None and self.cache.is_fresh(entry[0]):
+            return self.answer(request, *entry)
+
+        if entry is not None and not conditional:
+            # Stale, ask the site whether it changed since
+            headers = CaseInsensitiveDict(entry[0]['headers'])
+            if headers.get('ETag'):
+                request.headers['If-None-Match'] = headers['ETag']
+            if headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+            response = super().send(request, **kwargs)
+            if response.status_code == 304:
+                response.close()
+                self.cache.touch(key, entry[0])
+                return cached_response(request, *entry)
+            return self.store(key, response)
+        return self.send_and_store(key, request, **kwargs)
+
+    def answer(self, request, metadata, body):
+        if validators_match(request, metadata):
+            return cached_response(request, metadata, body, status=304)
+        return cached_response(request, metadata, body)
+
+    def send_and_store(self, key, request, **kwargs):
+        return self.store(key, super().send(request, **kwargs))
+
+    def store(self, key, response):
+        # Only successful answers are kept: errors, 429 and 5xx above all, are
+        # worth asking again, the session's retries must reach the site
+        if 200 <= response.status_code < 300:
+            self.cache.store(key, response)
+        return response
+
+
+def http_cache_from_env():
+    """
+    Return the HttpCache configured in the env variables, or None:
+        COMMANDJOBS_HTTP_CACHE       cache, record or replay (no cache when empty)
+        COMMANDJOBS_HTTP_CACHE_DIR   where responses are stored, .http_cache by default
+        COMMANDJOBS_HTTP_CACHE_TTL   seconds a cached response is used before revalidating it (3600)
+    """
+    mode = os.getenv('COMMANDJOBS_HTTP_CACHE')
+    if not mode:
+        return None
+    ttl = os.getenv('COMMANDJOBS_HTTP_CACHE_TTL')
+    return HttpCache(os.getenv('COMMANDJOBS_HTTP_CACHE_DIR') or '.http_cache', mode,
+                     ttl=float(ttl) if ttl else DEFAULT_TTL)
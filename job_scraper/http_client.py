@@ -0,0 +1,185 @@
+import random
+import threading
+import time
+from contextlib import ExitStack
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from job_scraper.http_cache import CacheMiss, CachingAdapter, http_cache_from_env
+
+USER_AGENT = 'commandjobs (+https://github.com/nicobrenner/commandjobs)'
+DEFAULT_TIMEOUT = 10
+# Answers meaning the site is overloaded or briefly failing, worth retrying later
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# A response is fast while it takes at most twice the fastest one, plus this many seconds
+FAST_SLACK = 0.05
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait from a Retry-After header (seconds or an HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Exponential back-off with full jitter: anywhere up to base * 2^attempt seconds, at most {cap}."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class HostLimiter:
+    """
+    How many requests may be in flight to one host, adjusted as answers
+    come back (AIMD): the limit grows while responses stay fast, by one per
+    response until the first trouble then by one per {limit} responses, and
+    is halved on 429, 5xx, timeouts and connection errors, at most once a
+    second. A Retry-After pauses new requests to the host until it's over.
+    """
+    def __init__(self, max_limit, initial=4, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.slow_start = True
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.fastest = None
+        self.last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._condition.wait(pause if pause > 0 else None)
+            self.in_flight += 1
+
+    def release(self, latency=None, overloaded=False, retry_after=None):
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                self.slow_start = False
+                if now - self.last_decrease >= 1:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self.last_decrease = now
+            elif latency is not None:
+                self.fastest = latency if self.fastest is None else min(self.fastest, latency)
+                if latency <= 2 * self.fastest + FAST_SLACK:
+                    self.limit = min(self.max_limit, self.limit + (1 if self.slow_start else 1 / self.limit))
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            self._condition.notify_all()
+
+
+class LimitedSession(requests.Session):
+    """
+    A requests.Session shared by the scrapers' threads, which lets at most
+    {max_concurrency} requests run at once, and adapts how many go to the
+    same host (see HostLimiter, up to {max_per_host}). Requests past the
+    limits wait for a free slot. Timeouts, connection errors, 429 and 5xx
+    answers are retried {retries} times, after the Retry-After the site
+    asked for or an exponential back-off with jitter. Every request gets
+    a {timeout} unless it has its own. Responses, their latency and the
+    failed attempts are counted in {metrics}, a metrics.ScrapeMetrics.
+    """
+    def __init__(self, max_concurrency=None, max_per_host=10, retries=3, backoff=0.5, max_backoff=30.0,
+                 max_retry_after=60.0, timeout=DEFAULT_TIMEOUT, metrics=None):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.metrics = metrics
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._host_limiters = {}
+        self._lock = threading.Lock()
+
+    def host_limiter(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limiters:
+                self._host_limiters[host] = HostLimiter(self.max_per_host)
+            return self._host_limiters[host]
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        limiter = self.host_limiter(url)
+        for attempt in range(self.retries + 1):
+            response, error, retry_after = None, None, None
+            with ExitStack() as slots:
+                # The host's slot first, so a request waiting on a busy host
+                # doesn't hold one of the global slots other hosts could use
+                limiter.acquire()
+                if self._semaphore:
+                    slots.enter_context(self._semaphore)
+                started = time.monotonic()
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                except CacheMiss:
+                    limiter.release()
+                    raise  # Replaying a recorded crawl, trying again won't help
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    limiter.release(overloaded=True)
+                    if self.metrics is not None:
+                        self.metrics.count('http_errors')
+                    error = e
+                except BaseException:
+                    limiter.release()
+                    raise
+                else:
+                    overloaded = response.status_code in RETRY_STATUSES
+                    if overloaded:
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        if retry_after is not None:
+                            retry_after = min(retry_after, self.max_retry_after)
+                    latency = time.monotonic() - started
+                    limiter.release(latency, overloaded, retry_after)
+                    if self.metrics is not None:
+                        self.metrics.record_response(response, latency)
+                        if overloaded:
+                            self.metrics.count('http_errors')
+                    if not overloaded:
+                        return response
+            if attempt == self.retries:
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            time.sleep(retry_after if retry_after is not None else backoff_delay(attempt, self.backoff, self.max_backoff))
+
+
+def create_session(pool_size=10, max_concurrency=None, max_per_host=None, cache=None):
+    """
+    Return a LimitedSession that keeps connections alive between
+    requests, with room for {pool_size} connections per host so several
+    threads can share it while fetching pages concurrently. At most
+    {max_concurrency} requests run at once, and at most {max_per_host}
+    ({pool_size} by default) to the same host, transient errors are
+    retried. Responses go through {cache}, an http_cache.HttpCache, by
+    default the one set in the COMMANDJOBS_HTTP_CACHE* env variables if any.
+    """
+    session = LimitedSession(max_concurrency, max_per_host or pool_size)
+    cache = cache or http_cache_from_env()
+    if cache:
+        adapter = CachingAdapter(cache, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
@@ -0,0 +1,118 @@
+"""
+Counters and timers of a scrape, to tell whether a slow one is waiting on
+the network, on parsing or on SQLite:
+
+    pages, bytes    responses received (cache_hits of them from the HTTP cache)
+    http_errors     failed attempts: connection errors, timeouts, 429 and 5xx
+    errors          sources that stopped on an error
+    listings        listings parsed and written, new or duplicates of stored ones
+    http            seconds waiting for responses
+    parse           seconds parsing pages into listings
+    db_write        seconds writing listings to SQLite
+
+Timers add up the seconds of every thread, so with several pages fetched at
+once "http" can be larger than the wall time of the scrape.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+COUNTERS = ('pages', 'bytes', 'cache_hits', 'http_errors', 'errors', 'listings', 'new', 'duplicates')
+TIMERS = ('http', 'parse', 'db_write')
+
+
+class ScrapeMetrics:
+    """A registry of the counters and timers above, shared by every thread of a scrape."""
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # {name: [calls, total seconds, longest call]}
+        self.timers = {name: [0, 0.0, 0.0] for name in TIMERS}
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def record_response(self, response, seconds):
+        """Count a response of the session, and the time it took."""
+        if response._content is False:
+            # Streamed, the body isn't read yet
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response._content or b'')
+        with self._lock:
+            self.counters['pages'] += 1
+            self.counters['bytes'] += size
+            if getattr(response, 'from_cache', False):
+                self.counters['cache_hits'] += 1
+        self.observe('http', seconds)
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    def snapshot(self):
+        """The counters and timers as a dict, with the rates worked out, ready for json.dumps()."""
+        with self._lock:
+            counters = dict(self.counters)
+            timers = {name: list(timer) for name, timer in self.timers.items()}
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            'seconds': round(elapsed, 3),
+            **counters,
+            'pages_per_second': round(counters['pages'] / elapsed, 2) if elapsed else 0.0,
+            'listings_per_second': round(counters['listings'] / elapsed, 2) if elapsed else 0.0,
+            'timers': {name: {'calls': calls, 'seconds': round(total, 4),
+                              'average': round(total / calls, 4) if calls else 0.0, 'max': round(longest, 4)}
+                       for name, (calls, total, longest) in timers.items()},
+        }
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+            f.write('\n')
+
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def format_metrics(snapshot):
+    """The lines of the live stats panel, from a ScrapeMetrics.snapshot()."""
+    timers = snapshot['timers']
+
+    def timer_line(label, name):
+        timer = timers.get(name, {'calls': 0, 'seconds': 0.0, 'average': 0.0})
+        return f"{label:<9}{timer['seconds']:8.2f}s in {timer['calls']} calls, {timer['average'] * 1000:.0f} ms each"
+
+    return [
+        f"Elapsed  {snapshot['seconds']:8.1f}s",
+        f"Pages    {snapshot['pages']:8} ({snapshot['pages_per_second']}/s, {snapshot['cache_hits']} cached), "
+        f"{format_bytes(snapshot['bytes'])}",
+        f"Listings {snapshot['listings']:8} ({snapshot['new']} new, {snapshot['duplicates']} duplicates)",
+        f"Errors   {snapshot['errors']:8} ({snapshot['http_errors']} failed HTTP attempts)",
+        timer_line("HTTP", 'http'),
+        timer_line("Parse", 'parse'),
+        timer_line("DB write", 'db_write'),
+    ]
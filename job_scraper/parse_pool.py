@@ -0,0 +1,61 @@
+"""
+Processes parsing pages for the scrapers, so parsing scales with the
+cores instead of sharing the GIL with the threads fetching pages.
+
+Fetcher threads hand the raw page to parse(), which runs a module level
+(or static) parse function in one of the {workers} processes and returns
+what it returns: plain listing dicts and links, the only things sent back.
+The fetcher's thread waits without holding the GIL meanwhile, so the other
+fetches go on. With 0 workers, the default, pages are parsed in the calling
+thread, which is cheaper for a small scrape than starting the processes.
+
+    COMMANDJOBS_PARSE_WORKERS   processes parsing pages, 0 to parse in the scraping threads
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+def parse_workers_from_env():
+    return int(os.getenv('COMMANDJOBS_PARSE_WORKERS') or 0)
+
+
+class ParsePool:
+    def __init__(self, workers=None):
+        self.workers = parse_workers_from_env() if workers is None else workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        # Started on the first page, a scrape that fetches nothing starts no process
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked, forking while the fetcher threads hold locks can deadlock the child
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def parse(self, func, *args):
+        """Return func(*args), computed by a worker process."""
+        if not self.workers:
+            return func(*args)
+        return self.executor().submit(func, *args).result()
+
+    def map(self, func, items, chunksize=8):
+        """Return [func(item) for item in items], the items split among the workers {chunksize} at a time."""
+        if not self.workers:
+            return [func(item) for item in items]
+        return list(self.executor().map(func, items, chunksize=chunksize))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from job_scraper.cancellation import CancelToken, ScrapingInterrupt
+from job_scraper.http_client import create_session
+from job_scraper.metrics import ScrapeMetrics
+from job_scraper.parse_pool import ParsePool
+from job_scraper.sources import SOURCES, create_source
+from job_scraper.storage import insert_listings
+
+
+class StorageSink:
+    """
+    Where every source's listings are written. Writes are done one at a
+    time, so sources running together never wait on SQLite's write lock,
+    and the new listings are counted per source. The writes' time, and
+    the listings new or already stored, are counted in {metrics}.
+    """
+    def __init__(self, db_path, metrics=None):
+        self.db_path = db_path
+        self.new_counts = {}
+        self.metrics = metrics or ScrapeMetrics()
+        self._lock = threading.Lock()
+
+    def write(self, source_name, listings):
+        with self._lock:
+            with self.metrics.timer('db_write'):
+                inserted = insert_listings(self.db_path, listings)
+            self.new_counts[source_name] = self.new_counts.get(source_name, 0) + inserted
+        self.metrics.count('listings', len(listings))
+        self.metrics.count('new', inserted)
+        self.metrics.count('duplicates', len(listings) - inserted)
+        return inserted
+
+
+class ScrapeScheduler:
+    """
+    Scrape several sources at once, each in its own thread, sharing one
+    keep-alive session that lets at most {max_per_host} requests go to the
+    same host at once, and one StorageSink. What they fetch, parse and
+    write is counted in {metrics}, a metrics.ScrapeMetrics, dumped as JSON
+    to {metrics_path} at the end of the run when it's set. cancel() stops
+    the run from another thread, once the sources stored what they parsed.
+    Pages are parsed by {parse_workers} processes shared by the sources
+    (COMMANDJOBS_PARSE_WORKERS by default, 0 parses them in the fetching threads).
+    """
+    def __init__(self, db_path, source_names=None, max_per_host=4, update_func=None, session=None, source_options=None,
+                 metrics=None, metrics_path=None, parse_workers=None):
+        self.db_path = db_path
+        self.source_names = list(source_names or SOURCES)
+        for name in self.source_names:
+            if name not in SOURCES:
+                raise ValueError(f"Unknown source {name}, should be one of: {', '.join(SOURCES)}")
+        self.metrics = metrics or ScrapeMetrics()
+        self.metrics_path = metrics_path
+        self.cancel_token = CancelToken()
+        self.parse_workers = parse_workers
+        self.session = session or create_session(pool_size=max_per_host, max_per_host=max_per_host)
+        self.session.metrics = self.metrics
+        self.update_func = update_func or (lambda message: None)
+        # {source name: {option: value}} passed to the sources, eg. {'hn': {'backend': 'api'}}
+        self.source_options = source_options or {}
+        self.sink = StorageSink(db_path, self.metrics)
+
+    def run(self):
+        """
+        Scrape every source and return {source name: result}, where result
+        has the listings parsed and stored as new, the seconds it took, the
+        error that stopped it (None when it finished) and whether it was
+        cancelled. A failing source doesn't stop the others.
+        """
+        try:
+            with ParsePool(self.parse_workers) as parse_pool, \
+                    ThreadPoolExecutor(max_workers=len(self.source_names) or 1) as executor:
+                results = dict(zip(self.source_names, executor.map(lambda name: self.run_source(name, parse_pool),
+                                                                   self.source_names)))
+        finally:
+            self.metrics.finish()
+            if self.metrics_path:
+                self.metrics.dump(self.metrics_path)
+        return results
+
+    def run_source(self, name, parse_pool=None, **options):
+        """
+        Scrape the {name} source alone and return its result (see run()).
+        {options} are passed to the source over its source_options, eg. to
+        scrape another HN thread: run_source('hn', start_url=...).
+        """
+        result = {'listings': 0, 'new': 0, 'seconds': 0.0, 'error': None, 'cancelled': False}
+        started_at = time.monotonic()
+
+        def update_func(message):
+            self.update_func(f"[{name}] {message}")
+
+        source = None
+        try:
+            self.cancel_token.check()
+            source = create_source(name, self.db_path, session=self.session, update_func=update_func,
+                                   metrics=self.metrics, cancel_token=self.cancel_token, parse_pool=parse_pool,
+                                   **{**self.source_options.get(name, {}), **options})
+            source.open()
+            for listings in source.iter_batches():
+                result['new'] += self.sink.write(name, listings)
+                result['listings'] += len(listings)
+                source.saved(listings)
+        except ScrapingInterrupt:
+            result['cancelled'] = True
+        except Exception as e:
+            result['error'] = str(e) or e.__class__.__name__
+            self.metrics.count('errors')
+            update_func(f"Failed: {result['error']}")
+        finally:
+            if source is not None:
+                source.close()
+            result['seconds'] = round(time.monotonic() - started_at, 2)
+        update_func(f"{'Cancelled' if result['cancelled'] else 'Done'}, {result['new']} new listings")
+        return result
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+
+def format_results(results):
+    """One line summary of ScrapeScheduler.run()'s results, eg. "hn: 12 new, waas: failed (timeout)"."""
+    parts = []
+    for name, result in results.items():
+        if result['error']:
+            parts.append(f"{name}: {result['new']} new, failed ({result['error']})")
+        elif result.get('cancelled'):
+            parts.append(f"{name}: {result['new']} new, cancelled")
+        else:
+            parts.append(f"{name}: {result['new']} new")
+    return ", ".join(parts)
@@ -0,0 +1,178 @@
+"""
+Every job board behind the same interface, so they can be scraped the same
+way, one at a time or all together (see scheduler.py).
+
+A source fetches its pages, parses them and yields the listings in batches
+as soon as they're parsed, it never writes them itself: whoever iterates
+stores each batch, then calls saved() so the source can remember it (seen
+ids, page hashes...) before the next batch is asked for, and close() at the
+end. Listings are dicts with original_text, original_html, source and
+external_id (and thread_month for HN). The time spent parsing is counted in
+{metrics}, a metrics.ScrapeMetrics shared with the session and the storage.
+
+A scrape is stopped with its {cancel_token} (see cancellation.py): sources
+check it between pages or jobs, yield what they already parsed, then raise
+ScrapingInterrupt. HTML pages are parsed in {parse_pool}'s processes when it
+has workers (see parse_pool.py), Workday's JSON is read in the fetching threads.
+
+New sources are added with @register_source and a unique name.
+"""
+import os
+
+from job_scraper.cancellation import CancelToken, ScrapingInterrupt
+from job_scraper.hacker_news.scraper import HNScraper
+from job_scraper.metrics import ScrapeMetrics
+from job_scraper.parse_pool import ParsePool
+from job_scraper.waas.work_startup_scraper import WorkStartupScraper
+from job_scraper.workday.api_client import WorkdayApiClient
+from job_scraper.workday.scraper import WorkdayScraper
+
+SOURCES = {}
+
+
+def register_source(source_class):
+    SOURCES[source_class.name] = source_class
+    return source_class
+
+
+def create_source(name, db_path, session=None, update_func=None, metrics=None, cancel_token=None, parse_pool=None,
+                  **options):
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source {name}, should be one of: {', '.join(SOURCES)}")
+    return SOURCES[name](db_path, session=session, update_func=update_func, metrics=metrics,
+                         cancel_token=cancel_token, parse_pool=parse_pool, **options)
+
+
+class ScraperSource:
+    name = 'base'
+    title = 'Base'
+
+    def __init__(self, db_path, session=None, update_func=None, metrics=None, cancel_token=None, parse_pool=None):
+        self.db_path = db_path
+        # A shared session, eg. one limiting the requests per host, or None for the scraper's own
+        self.session = session
+        self.update_func = update_func or (lambda message: None)
+        self.metrics = metrics or ScrapeMetrics()
+        self.cancel_token = cancel_token or CancelToken()
+        self.parse_pool = parse_pool or ParsePool(0)
+
+    def open(self):
+        """Load what the last scrapes saw, called before iter_batches()."""
+
+    def iter_batches(self):
+        """Yield lists of parsed listings, until done or the cancel token is set."""
+        raise NotImplementedError
+
+    def saved(self, listings):
+        """Called once a batch from iter_batches() is stored."""
+
+    def close(self):
+        """Called when done, after the last batch is stored, or after an error."""
+
+
+@register_source
+class HackerNewsSource(ScraperSource):
+    name = 'hn'
+    title = "Ask HN: Who's hiring?"
+
+    def __init__(self, db_path, session=None, update_func=None, metrics=None, cancel_token=None, parse_pool=None,
+                 start_url=None, backend=None, **scraper_options):
+        super().__init__(db_path, session, update_func, metrics, cancel_token, parse_pool)
+        self.start_url = start_url or os.getenv('HN_START_URL')
+        if not self.start_url:
+            raise ValueError("Set HN_START_URL to the \"Who is hiring\" thread to scrape")
+        # {scraper_options} go to HNScraper, eg. window, parser, api_url or thread_month
+        self.scraper = HNScraper(db_path, session=session, backend=backend or os.getenv('HN_SCRAPE_BACKEND') or 'html',
+                                 metrics=self.metrics, cancel_token=self.cancel_token, parse_pool=self.parse_pool,
+                                 **scraper_options)
+        self.thread_id = None
+
+    def open(self):
+        self.update_func(f"Scraping: {self.start_url}")
+        self.thread_id = self.scraper.start_scrape(self.start_url)
+
+    def iter_batches(self):
+        for label, listings in self.scraper.iter_listings(self.start_url):
+            self.update_func(f"{label}: {len(listings)} listings")
+            yield listings
+
+    def saved(self, listings):
+        self.scraper.mark_saved(listings)
+
+    def close(self):
+        if self.thread_id:
+            self.scraper.save_thread_state(self.thread_id, self.scraper.thread_state)
+
+
+@register_source
+class WorkAtAStartupSource(ScraperSource):
+    name = 'waas'
+    title = "Work at a Startup"
+
+    def __init__(self, db_path, session=None, update_func=None, metrics=None, cancel_token=None, parse_pool=None,
+                 base_url=None, batch_size=20, workers=8):
+        super().__init__(db_path, session, update_func, metrics, cancel_token, parse_pool)
+        self.scraper = WorkStartupScraper(db_path, session=session, workers=workers, metrics=self.metrics,
+                                          cancel_token=self.cancel_token, parse_pool=self.parse_pool)
+        self.scraper.base_url = base_url or self.scraper.base_url
+        self.batch_size = batch_size
+
+    def open(self):
+        self.update_func(f"Scraping: {self.scraper.base_url}")
+        self.scraper.start_scrape()
+
+    def iter_batches(self):
+        batch = []
+        try:
+            for job in self.scraper.fetch_jobs(self.scraper.get_company_links(), self.update_func):
+                batch.append(job)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        except ScrapingInterrupt:
+            # Cancelled, the jobs parsed so far are stored before stopping
+            if batch:
+                yield batch
+            raise
+        if batch:
+            yield batch
+
+    def saved(self, listings):
+        self.scraper.save_completed_hashes()
+
+
+@register_source
+class WorkdaySource(ScraperSource):
+    name = 'workday'
+    title = "Workday"
+
+    def __init__(self, db_path, session=None, update_func=None, metrics=None, cancel_token=None, parse_pool=None,
+                 backend=None, companies=None, browser_pool=None):
+        super().__init__(db_path, session, update_func, metrics, cancel_token, parse_pool)
+        self.scraper = WorkdayScraper(db_path, self.update_func, backend=backend or os.getenv('WORKDAY_SCRAPE_BACKEND') or 'api',
+                                      api_client=WorkdayApiClient(session, metrics=self.metrics),
+                                      browser_pool=browser_pool, cancel_token=self.cancel_token)
+        if companies is not None:
+            # {company name: career site URL} instead of the registry's companies
+            self.scraper.companies = {name: {'url': url} for name, url in companies.items()}
+            self.scraper.company_urls = dict(companies)
+        self.completed = False
+
+    def open(self):
+        self.update_func(f"Scraping Workday companies: {', '.join(self.scraper.company_urls)}")
+
+    def iter_batches(self):
+        for company_name, listings in self.scraper.iter_company_listings():
+            self.update_func(f"{company_name}: {len(listings)} listings")
+            yield listings
+        self.completed = True
+        failed = self.scraper.failed_companies
+        if failed:
+            # Reported in the result, the other companies' watermarks still move
+            raise RuntimeError("Scraping failed for " + ", ".join(f"{name} ({error})" for name, error in failed.items()))
+
+    def close(self):
+        # The watermarks only move once every company's listings are stored,
+        # the failed companies have none
+        if self.completed:
+            self.scraper.save_watermarks()
@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import datetime
+
+
+def load_known_external_ids(db_path, source=None):
+    """
+    Return the external_id of every listing already stored (of {source} if
+    given) as a set, in one query, so scrapers can skip known listings
+    before parsing them instead of relying on INSERT OR IGNORE.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if source:
+            rows = conn.execute("SELECT external_id FROM job_listings WHERE source = ?", (source,))
+        else:
+            rows = conn.execute("SELECT external_id FROM job_listings")
+        return {external_id for (external_id,) in rows}
+    finally:
+        conn.close()
+
+
+def load_page_hashes(db_path, source):
+    """Return {url: content hash} of the pages of {source} seen by the last scrapes (see migration 012)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT url, content_hash FROM page_hashes WHERE source = ?", (source,))
+        return dict(rows.fetchall())
+    finally:
+        conn.close()
+
+
+def save_page_hashes(db_path, source, page_hashes):
+    """Store {url: content hash} for pages of {source} whose jobs have all been scraped."""
+    if not page_hashes:
+        return
+    checked_at = datetime.now().isoformat()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("INSERT OR REPLACE INTO page_hashes (url, source, content_hash, checked_at) VALUES (?, ?, ?, ?)",
+                         [(url, source, content_hash, checked_at) for url, content_hash in page_hashes.items()])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def insert_listings(db_path, listings):
+    """
+    Save a batch of listing dicts (original_text, original_html, source,
+    external_id, and thread_month for HN listings) in one transaction,
+    skipping the external_ids already stored. Returns how many were inserted.
+    """
+    if not listings:
+        return 0
+    scraped_at = datetime.now().isoformat()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        changes_before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO job_listings (original_text, original_html, source, external_id, scraped_at, thread_month) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(listing['original_text'], listing['original_html'], listing['source'], listing['external_id'],
+                           scraped_at, listing.get('thread_month')) for listing in listings])
+        conn.commit()
+        return conn.total_changes - changes_before
+    finally:
+        conn.close()
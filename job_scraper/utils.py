@@ -1,13 +1,45 @@
+import json
+import os
+import re
+from datetime import date, timedelta
+
+# The Workday companies to scrape, override with the WORKDAY_COMPANIES_FILE env variable
+WORKDAY_COMPANIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'config', 'workday_companies.json')
+
+# How far back the first scrape of a Workday company goes
+WORKDAY_RECENT_DAYS = 7
+
+
+def load_workday_companies(path=None) -> dict:
+    """
+    Return {company name: settings} from the companies file, a JSON object like
+        {"NVIDIA": {"url": "https://nvidia.wd5.myworkdayjobs.com/NVIDIAExternalCareerSite"}}
+    where settings can also have "tenant" and "site" (when they can't be
+    read from the URL) and "enabled": false to skip the company.
+    """
+    path = path or os.getenv('WORKDAY_COMPANIES_FILE') or WORKDAY_COMPANIES_FILE
+    with open(path, encoding='utf-8') as f:
+        companies = json.load(f)
+    return {name: settings for name, settings in companies.items() if settings.get('enabled', True)}
+
+
 def get_workday_company_urls() -> dict:
-    urls = {
-        'NVIDIA': 'https://nvidia.wd5.myworkdayjobs.com/NVIDIAExternalCareerSite?jobFamilyGroup=0c40f6bd1d8f10ae43ffaefd46dc7e78',
-        'SALESFORCE': 'https://salesforce.wd12.myworkdayjobs.com/en-US/External_Career_Site/details/Lead-Marketing-Cloud-Solution-Engineer_JR268932?jobFamilyGroup=14fa3452ec7c1011f90d0002a2100000',
-        'RED_HAT': 'https://redhat.wd5.myworkdayjobs.com/Jobs',
-        'CROWDSTRIKE': 'https://crowdstrike.wd5.myworkdayjobs.com/crowdstrikecareers'
-    }
-    return urls
-
-def get_workday_post_time_range() -> list[str]:
-    return ['posted today', 'posted yesterday', 'posted 2 days ago', 'posted 3 days ago',
-     'posted 4 days ago', 'posted 5 days ago', 'posted 6 days ago', 'posted 7 days ago']
+    return {name: settings['url'] for name, settings in load_workday_companies().items()}
+
 
+def parse_workday_posted_on(posted_on, today=None):
+    """
+    Return the date of a Workday "posted on" text: "Posted Today",
+    "Posted Yesterday", "Posted 3 Days Ago", "Posted 30+ Days Ago" (at
+    least 30 days ago). None when the text isn't recognized.
+    """
+    today = today or date.today()
+    text = (posted_on or '').strip().lower()
+    if text.endswith('today'):
+        return today
+    if text.endswith('yesterday'):
+        return today - timedelta(days=1)
+    match = re.search(r'(\d+)\+? days? ago', text)
+    if match:
+        return today - timedelta(days=int(match.group(1)))
+    return None
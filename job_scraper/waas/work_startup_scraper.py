@@ -1,22 +1,55 @@
-import sqlite3
+import hashlib
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-class ScrapingInterrupt(Exception):
-    pass
+from job_scraper.cancellation import CancelToken
+from job_scraper.http_client import DEFAULT_TIMEOUT, create_session
+from job_scraper.metrics import ScrapeMetrics
+from job_scraper.parse_pool import ParsePool
+from job_scraper.storage import load_known_external_ids, load_page_hashes, save_page_hashes
+
+SOURCE = "Work at a startup"
 
 class WorkStartupScraper:
 
-    def __init__(self, db_path='job_listings.db'):
+    def __init__(self, db_path='job_listings.db', session=None, workers=8, max_per_host=4, metrics=None,
+                 cancel_token=None, parse_pool=None):
         self.db_path = db_path
         # Define the base URL for Ask HN: Who's hiring
         self.base_url = 'https://www.workatastartup.com/jobs'
-        self.new_entries_count = 0  # Initialize counter for new entries
+        # Company and job pages are fetched by {workers} threads sharing one
+        # keep-alive session, with at most {max_per_host} requests to the site at once
+        self.workers = workers
+        self.session = session or create_session(pool_size=max_per_host, max_per_host=max_per_host)
+        # Loaded when scraping starts: the job URLs already stored, and the
+        # hash of each company's jobs data as of the last complete scrape
+        self.known_ids = set()
+        self.company_hashes = {}
+        # Companies whose jobs have all been fetched during this scrape, and those already saved
+        self.completed_company_hashes = {}
+        self.saved_company_hashes = {}
+        # Where the time spent parsing is counted
+        self.metrics = metrics or ScrapeMetrics()
+        # Checked between jobs, see cancellation.py
+        self.cancel_token = cancel_token or CancelToken()
+        # Where the fetched pages are parsed, in the fetching thread unless it has workers
+        self.parse_pool = parse_pool or ParsePool(0)
+
+    def get(self, url):
+        response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response
 
     def get_company_links(self):
-        response = requests.get(self.base_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        html = self.get(self.base_url).content
+        with self.metrics.timer('parse'):
+            return self.parse_pool.parse(self.parse_company_links, html)
+
+    @staticmethod
+    def parse_company_links(html):
+        soup = BeautifulSoup(html, 'html.parser')
         company_links_set = set()
         company_links = []
         
@@ -30,23 +63,36 @@ class WorkStartupScraper:
 
 
     def get_job_links(self, company_url):
-        
-        # Fetch the HTML content from the URL
-        response = requests.get(company_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        return self.get_company_jobs(company_url)[0]
+
+    def get_company_jobs(self, company_url):
+        """
+        Return the company's job links, and a hash of its jobs data, which
+        stays the same as long as the company's jobs don't change.
+        """
+        html = self.get(company_url).content
+        with self.metrics.timer('parse'):
+            return self.parse_pool.parse(self.parse_company_jobs, html)
+
+    @staticmethod
+    def parse_company_jobs(html):
+        """Return the job links in a company page, and the hash of its jobs data."""
+        soup = BeautifulSoup(html, 'html.parser')
 
         # Find all elements with a data-page attribute
         data_page_elements = soup.find_all(attrs={"data-page": True})
 
         # Initialize a list to store matching links
         job_links = []
+        content_hash = None
 
         # Find the div with the data-page attribute
         div = soup.find('div', {'data-page': True})
         if div:
             # Extract the JSON-like content from the data-page attribute
             data_page_content = div['data-page']
-            
+            content_hash = hashlib.sha256(data_page_content.encode('utf-8')).hexdigest()
+
             # Parse the JSON content
             data = json.loads(data_page_content)
             
@@ -55,12 +101,17 @@ class WorkStartupScraper:
                 job_link = job['show_path']
                 job_links.append(job_link)
         
-        return job_links
+        return job_links, content_hash
 
 
     def get_job_details(self, job_url):
-        response = requests.get(job_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        html = self.get(job_url).content
+        with self.metrics.timer('parse'):
+            return self.parse_pool.parse(self.parse_job_details, job_url, html)
+
+    @staticmethod
+    def parse_job_details(job_url, html):
+        soup = BeautifulSoup(html, 'html.parser')
 
         # Find the "About the role" section and extract content until "How you'll contribute"
         about_section = soup.find(string="About the role")
@@ -73,18 +124,20 @@ class WorkStartupScraper:
                 for sibling in about_div.next_siblings:
                     if sibling.name == 'div' and sibling.find(string="How you'll contribute"):
                         break
-                    extracted_content.append(str(sibling))
+                    extracted_content.append(sibling)
 
                 # Join the extracted content
-                extracted_content_str = ''.join(extracted_content).strip()
+                extracted_content_str = ''.join(str(sibling) for sibling in extracted_content).strip()
 
-                # Get original text and HTML
-                original_text = BeautifulSoup(extracted_content_str, 'html.parser').get_text(strip=True)
+                # Get original text and HTML, the text from the parsed siblings
+                # rather than by parsing their HTML again
+                original_text = ''.join(sibling.get_text(strip=True) if isinstance(sibling, Tag) else sibling.strip()
+                                        for sibling in extracted_content)
                 original_html = extracted_content_str
 
                 # Extract external ID from job URL
                 external_id = job_url
-                source = "Work at a startup"
+                source = SOURCE
 
                 return {
                     'original_text': original_text,
@@ -98,74 +151,85 @@ class WorkStartupScraper:
             print(f"'About the role' section not found in {job_url}")
         return None
 
-    def scrape_jobs(self, stdscr, update_func=None, done_event=None, result_queue=None):
-        """Scrape job listings from Work at a Startup and save them to the database."""
-        jobs_list = []
-        update_func(f"Scraping: {self.base_url}")
-        try: 
-            company_links = self.get_company_links()
-            count = 0
-            flag1 = False
-            flag2 = False
-            flag3 = False
-            for company_link in company_links:
-                count += 1
-                job_links = self.get_job_links(company_link)
-                for job_link in job_links:
-                    job_details = self.get_job_details(job_link)
-                    if job_details:
-                        jobs_list.append(job_details)
-                if update_func:
-                    update_func(f"Scraping: {company_link}")
-                # Updates the progress of the scraping
-                if  count / len(company_links)>= 0.25 and not flag1:
-                    update_func("Scraping: 25% of companies completed")
-                    flag1 = True
-                elif count / len(company_links)>= 0.5 and not flag2:
-                    update_func("Scraping: 50% of companies completed")
-                    flag2 = True
-                elif count / len(company_links)>= 0.75:
-                    update_func("Scraping: 75% of companies completed")
-                    flag3 = True
-            
-            for job in jobs_list:
-                inserted= self.save_to_database(job['original_text'], job['original_html'], job['source'], job['external_id'])
-                if inserted:
-                    self.new_entries_count += 1
-                
-                if job==jobs_list[-1]:
-                    if done_event:
-                        result_queue.put(self.new_entries_count)
-                        done_event.set()  # Set the event to signal that scraping is done
-            
-        except requests.exceptions.Timeout as e:
-            if update_func:
-                update_func("Request timed out. Try again later.")
-            
-        except requests.exceptions.RequestException as e:
-            if update_func:
-                update_func(f"Request failed: {str(e)}")
-
-        # Handle user interrupts
-        except ScrapingInterrupt:
-            if update_func:
-                update_func(f"Scraping interrupted by user. {self.new_entries_count} new listings added")
-
-
-    def save_to_database(self, original_text, original_html, source, external_id):
-            """Save a job listing to the SQLite database."""
-            from datetime import datetime
-            
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA journal_mode=WAL;")
-            c = conn.cursor()
-            
-            # Get current timestamp
-            scraped_at = datetime.now().isoformat()
-            
-            # Use INSERT OR IGNORE to skip existing records with the same external_id
-            c.execute("INSERT OR IGNORE INTO job_listings (original_text, original_html, source, external_id, scraped_at) VALUES (?, ?, ?, ?, ?)",
-                    (original_text, original_html, source, external_id, scraped_at))
-            conn.commit()
-            conn.close()
-            return c.rowcount > 0 # True if the listing was inserted
+    def fetch_jobs(self, company_links, update_func=None):
+        """
+        Yield the details of the jobs of every company, in the order they're
+        fetched. Company pages and job pages go through the same pool, the
+        job pages of a company are requested as soon as its page arrives.
+        Companies whose jobs data didn't change since the last complete
+        scrape are skipped, and so are the jobs already stored. Once the
+        cancel token is set, the jobs fetched so far are yielded and the
+        rest dropped, then ScrapingInterrupt is raised.
+        """
+        companies_done = jobs_done = jobs_total = 0
+        # Job pages still being fetched per company, and the company and link of each job future
+        remaining_jobs, job_companies, company_hashes = {}, {}, {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            company_futures = {executor.submit(self.get_company_jobs, company_link): company_link
+                               for company_link in company_links}
+            pending = set(company_futures)
+            while pending:
+                self.cancel_token.check()
+                # Not waiting for long, so a cancel doesn't wait for a slow page
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in company_futures:
+                        companies_done += 1
+                        company_link = company_futures[future]
+                        try:
+                            job_links, content_hash = future.result()
+                        except requests.exceptions.RequestException as e:
+                            # Still failing after the session's retries, the others go on
+                            if update_func:
+                                update_func(f"Skipped {company_link}: {e}")
+                            continue
+                        if content_hash and self.company_hashes.get(company_link) == content_hash:
+                            continue  # Unchanged since the last scrape
+                        job_links = [job_link for job_link in job_links if job_link not in self.known_ids]
+                        jobs_total += len(job_links)
+                        company_hashes[company_link] = content_hash
+                        remaining_jobs[company_link] = len(job_links)
+                        for job_link in job_links:
+                            job_future = executor.submit(self.get_job_details, job_link)
+                            job_companies[job_future] = company_link, job_link
+                            pending.add(job_future)
+                    else:
+                        jobs_done += 1
+                        company_link, job_link = job_companies.pop(future)
+                        remaining_jobs[company_link] -= 1
+                        try:
+                            job_details = future.result()
+                        except requests.exceptions.RequestException as e:
+                            if update_func:
+                                update_func(f"Skipped {job_link}: {e}")
+                            # Not complete, so the company is scraped again next time
+                            company_hashes[company_link] = None
+                            job_details = None
+                        if job_details:
+                            yield job_details
+                    # Every job of the company went through, it can be skipped
+                    # next time as long as its jobs data stays the same
+                    if remaining_jobs.get(company_link) == 0:
+                        del remaining_jobs[company_link]
+                        if company_hashes[company_link]:
+                            self.completed_company_hashes[company_link] = company_hashes[company_link]
+                if update_func and done:
+                    update_func(f"Scraping: {companies_done}/{len(company_links)} companies, {jobs_done}/{jobs_total} jobs")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def start_scrape(self):
+        """Load the jobs already stored and the company hashes of the last scrapes."""
+        self.known_ids = load_known_external_ids(self.db_path, SOURCE)
+        self.company_hashes = load_page_hashes(self.db_path, SOURCE)
+        self.completed_company_hashes = {}
+        self.saved_company_hashes = {}
+
+    def save_completed_hashes(self):
+        # fetch_jobs only marks a company complete after yielding its last
+        # job, so every job of these companies is in this batch or an earlier one
+        saved_hashes = {url: content_hash for url, content_hash in self.completed_company_hashes.items()
+                        if self.saved_company_hashes.get(url) != content_hash}
+        save_page_hashes(self.db_path, SOURCE, saved_hashes)
+        self.saved_company_hashes.update(saved_hashes)
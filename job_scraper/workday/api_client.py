@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+
+from job_scraper.http_client import DEFAULT_TIMEOUT, create_session
+from job_scraper.metrics import ScrapeMetrics
+
+PAGE_SIZE = 20
+
+
+def parse_workday_url(company_url):
+    """
+    Return (base URL, tenant, site, applied facets) of a Workday career site
+    URL, eg. https://nvidia.wd5.myworkdayjobs.com/en-US/NVIDIAExternalCareerSite?jobFamilyGroup=0c40
+    is ('https://nvidia.wd5.myworkdayjobs.com', 'nvidia', 'NVIDIAExternalCareerSite', {'jobFamilyGroup': ['0c40']}).
+    """
+    parts = urlsplit(company_url)
+    tenant = parts.hostname.split('.')[0]
+    segments = [segment for segment in parts.path.split('/') if segment]
+    # A locale like en-US can come before the site name
+    if segments and len(segments[0]) == 5 and segments[0][2] == '-':
+        segments = segments[1:]
+    if not segments:
+        raise ValueError(f"No Workday site name in {company_url}")
+    return f"{parts.scheme}://{parts.netloc}", tenant, segments[0], parse_qs(parts.query)
+
+
+class WorkdayApiClient:
+    """
+    Reads the jobs of a Workday career site from the JSON endpoints behind
+    its pages: POST /wday/cxs/<tenant>/<site>/jobs to search, then GET
+    /wday/cxs/<tenant>/<site><externalPath> for each job's details.
+    Pages and job details are fetched {workers} at a time.
+    """
+    def __init__(self, session=None, workers=8, metrics=None):
+        self.workers = workers
+        self.session = session or create_session(pool_size=workers)
+        # Where the time spent parsing is counted
+        self.metrics = metrics or ScrapeMetrics()
+
+    def api_url(self, company_url, tenant=None, site=None):
+        base_url, url_tenant, url_site, _ = parse_workday_url(company_url)
+        return f"{base_url}/wday/cxs/{tenant or url_tenant}/{site or url_site}"
+
+    def fetch_page(self, api_url, facets, offset):
+        response = self.session.post(f"{api_url}/jobs", timeout=DEFAULT_TIMEOUT, json={
+            'appliedFacets': facets, 'limit': PAGE_SIZE, 'offset': offset, 'searchText': '',
+        })
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_postings(self, company_url, is_recent, is_known=None, tenant=None, site=None):
+        """
+        Return the job postings of the site for which is_recent(posting) is
+        true, without the ones for which is_known(posting) is. Results come
+        newest first, so paging stops after the first batch of pages where
+        some page has a posting that isn't recent.
+        """
+        api_url = self.api_url(company_url, tenant, site)
+        facets = parse_workday_url(company_url)[3]
+        first_page = self.fetch_page(api_url, facets, 0)
+        postings = first_page.get('jobPostings') or []
+        recent = [posting for posting in postings if is_recent(posting)]
+        if len(recent) < len(postings):
+            return [posting for posting in recent if not (is_known and is_known(posting))]
+
+        offsets = list(range(PAGE_SIZE, first_page.get('total') or 0, PAGE_SIZE))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(offsets), self.workers):
+                pages = executor.map(lambda offset: self.fetch_page(api_url, facets, offset),
+                                     offsets[start:start + self.workers])
+                reached_older = False
+                for page in pages:
+                    postings = page.get('jobPostings') or []
+                    page_recent = [posting for posting in postings if is_recent(posting)]
+                    recent.extend(page_recent)
+                    reached_older = reached_older or len(page_recent) < len(postings) or not postings
+                if reached_older:
+                    break
+        return [posting for posting in recent if not (is_known and is_known(posting))]
+
+    def fetch_job(self, api_url, external_path):
+        response = self.session.get(f"{api_url}{external_path}", timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.json().get('jobPostingInfo') or {}
+
+    @staticmethod
+    def posting_job_id(posting):
+        bullet_fields = posting.get('bulletFields') or []
+        return bullet_fields[0] if bullet_fields else None
+
+    @staticmethod
+    def listing_from_job(job, posting):
+        """
+        Map a job's details to the listing shape the browser scraper saves,
+        plus the posting's "posted on" text.
+        """
+        job_description_html = job.get('jobDescription')
+        if not job_description_html:
+            return None
+        job_id = job.get('jobReqId') or WorkdayApiClient.posting_job_id(posting)
+        return {
+            'original_text': BeautifulSoup(job_description_html, 'html.parser').get_text('\n', strip=True),
+            'original_html': job_description_html,
+            'source': job.get('externalUrl'),
+            'external_id': job_id,
+            'posted_on': posting.get('postedOn'),
+        }
+
+    def fetch_listings(self, company_url, is_recent, is_known=None, tenant=None, site=None):
+        """Return the listings of the site's recent postings, except the known ones."""
+        api_url = self.api_url(company_url, tenant, site)
+        postings = self.fetch_postings(company_url, is_recent, is_known, tenant, site)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            jobs = list(executor.map(lambda posting: self.fetch_job(api_url, posting['externalPath']), postings))
+        with self.metrics.timer('parse'):
+            listings = [self.listing_from_job(job, posting) for job, posting in zip(jobs, postings)]
+        return [listing for listing in listings if listing and listing['source'] and listing['external_id']]
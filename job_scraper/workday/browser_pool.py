@@ -0,0 +1,153 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
+import urllib3
+from selenium import webdriver
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        NoSuchElementException, StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Requests for these are dropped, the scrapers only need the DOM
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+                '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.css']
+
+# Raised about the page (slow, changed), the browser itself is fine and goes back to the pool
+PAGE_ERRORS = (TimeoutException, NoSuchElementException, StaleElementReferenceException,
+               ElementClickInterceptedException, ElementNotInteractableException)
+
+
+def get_chrome_options(block_resources=True) -> Options:
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    if block_resources:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+    return chrome_options
+
+
+class BrowserPool:
+    """
+    Up to {size} headless Chrome drivers, started when first needed and
+    reused by every scrape until close() (called at exit for the shared
+    pool), so Chrome and ChromeDriverManager().install() don't run per
+    company or per run. A driver whose browser crashed or lost its session
+    is quit, and the next borrower starts a new one.
+    """
+    def __init__(self, size=2, block_resources=True):
+        self.size = size
+        self.block_resources = block_resources
+        self.created = 0
+        # Free drivers, the last one returned is handed out first
+        self._idle = []
+        self._drivers = []
+        self._lock = threading.Lock()
+        # Notified whenever a driver is returned or discarded, and on close()
+        self._available = threading.Condition(self._lock)
+        self._driver_path = None
+        self._closed = False
+
+    def create_driver(self):
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+        driver = webdriver.Chrome(service=Service(self._driver_path), options=get_chrome_options(self.block_resources))
+        if self.block_resources:
+            # Fonts and stylesheets aren't covered by every Chrome version's prefs
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        return driver
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, waiting for one to be free when all {size} are in use."""
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The browser pool is closed")
+                if self._idle:
+                    driver, create = self._idle.pop(), False
+                    break
+                if self.created < self.size:
+                    # Room for another one, discarded drivers included
+                    self.created += 1
+                    driver, create = None, True
+                    break
+                self._available.wait()
+        if create:
+            try:
+                driver = self.create_driver()
+            except Exception:
+                with self._available:
+                    self.created -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                self._drivers.append(driver)
+
+        healthy = True
+        try:
+            yield driver
+        except PAGE_ERRORS:
+            raise
+        except (WebDriverException, urllib3.exceptions.HTTPError):
+            # The browser crashed, or chromedriver is gone, don't hand it out again
+            healthy = False
+            raise
+        finally:
+            with self._available:
+                if healthy and not self._closed:
+                    self._idle.append(driver)
+                    self._available.notify()
+                    driver = None
+            if driver is not None:
+                self.discard(driver)
+
+    def discard(self, driver):
+        with self._available:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self.created -= 1
+            # A borrower waiting for a free driver can start one instead
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every driver, the ones in use included."""
+        with self._available:
+            self._closed = True
+            drivers, self._drivers = self._drivers, []
+            self._idle = []
+            self.created = 0
+            self._available.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size=2):
+    """Return the pool shared by every Workday scrape of this process, closed at exit."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = BrowserPool(size)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -1,56 +1,52 @@
+import json
 import sqlite3
 import time
-from selenium import webdriver
+import requests
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from job_scraper.cancellation import CancelToken, ScrapingInterrupt
 from job_scraper.scraper_selectors.workday_selectors import WorkDaySelectors
-from job_scraper.utils import get_workday_post_time_range, get_workday_company_urls
+from job_scraper.utils import WORKDAY_RECENT_DAYS, load_workday_companies, parse_workday_posted_on
+from job_scraper.workday.api_client import WorkdayApiClient
+from job_scraper.workday.browser_pool import get_browser_pool
+
+BACKENDS = ('api', 'browser')
 
 
 class WorkdayScraper:
-    def __init__(self, db_path='job_listings.db', update_func=None, done_event=None, result_queue=None):
+    def __init__(self, db_path='job_listings.db', update_func=None, backend='api', api_client=None, browser_pool=None, workers=4, cancel_token=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Workday backend {backend}, should be one of: {', '.join(BACKENDS)}")
         self.db_path = db_path
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.get_selenium_configs())
-        self.one_week_span_text = get_workday_post_time_range()
-        self.company_urls = get_workday_company_urls()
-        self.new_entries_count = 0
-        self.done_event = done_event
-        self.result_queue = result_queue
+        # 'api' reads the career sites' JSON endpoints, and falls back to
+        # the browser for the companies where that fails
+        self.backend = backend
+        self.api_client = api_client or WorkdayApiClient()
+        # Companies are scraped {workers} at a time, the ones that need a
+        # browser borrow one of the pool's drivers, which outlive the scrape
+        self.browser_pool = browser_pool or get_browser_pool()
+        self.workers = workers
+        # Checked between companies, see cancellation.py
+        self.cancel_token = cancel_token or CancelToken()
+        # The registry (config/workday_companies.json), tenant and site can be set there
+        self.companies = load_workday_companies()
+        self.company_urls = {name: settings['url'] for name, settings in self.companies.items()}
+        # Per company: newest posting date and the ids posted that day at the last
+        # scrape, loaded when scraping starts, and the (date, job id) seen by this one
+        self.watermarks = {}
+        self.company_postings = {}
+        # {company name: error} of the companies that failed during this scrape
+        self.failed_companies = {}
         self.update_func = update_func
-        self.job_listings = []
-
-    @staticmethod
-    def get_selenium_configs() -> Options:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        return chrome_options
-
-    def save_to_database(self, original_text, original_html, source, external_id):
-        from datetime import datetime
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        c = conn.cursor()
-        
-        # Get current timestamp
-        scraped_at = datetime.now().isoformat()
-        
-        c.execute("INSERT OR IGNORE INTO job_listings (original_text, original_html, source, external_id, scraped_at) VALUES (?, ?, ?, ?, ?)",
-                  (original_text, original_html, source, external_id, scraped_at))
-        conn.commit()
-        conn.close()
-        return c.rowcount > 0
-
-    def save_new_job_listing(self, job_description, job_description_html, job_url, job_id):
+        # Listings parsed by this scrape, per company
+        self.job_listings = {}
+
+    def save_new_job_listing(self, company_name, job_description, job_description_html, job_url, job_id):
         if not job_description:
             return
         if not job_description_html:
@@ -59,78 +55,179 @@ class WorkdayScraper:
             return
         if not job_id:
             return
-        self.job_listings.append({
+        self.job_listings[company_name].append({
             'original_text': job_description,
             'original_html': job_description_html,
             'source': job_url,
             'external_id': job_id
         })
 
-    def save_job_listings_to_db(self):
-        for job in self.job_listings:
-            inserted = self.save_to_database(
-                job['original_text'],
-                job['original_html'],
-                job['source'],
-                job['external_id']
-            )
-            if inserted:
-                self.new_entries_count += 1
-        if self.done_event:
-            self.result_queue.put(self.new_entries_count)
-            self.done_event.set()
-
-    def scrape(self):
-        self.update_func(f"Scraping Workday companies:\t{", ".join(self.company_urls.keys())}")
-
-        for company_name, company_url in self.company_urls.items():
-            self.driver.get(company_url)
-            wait = WebDriverWait(self.driver, 10)
-
-            posted_this_week = True
-            while posted_this_week:
+    def load_watermarks(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT company, newest_posted_on, seen_ids FROM workday_watermarks").fetchall()
+        finally:
+            conn.close()
+        return {company: {'newest_posted_on': date.fromisoformat(newest_posted_on), 'seen_ids': set(json.loads(seen_ids))}
+                for company, newest_posted_on, seen_ids in rows}
+
+    def save_watermarks(self):
+        """Move each company's watermark to the newest postings seen by this scrape."""
+        rows = []
+        for company, postings in self.company_postings.items():
+            if not postings:
+                continue
+            newest = max(posted for posted, _ in postings)
+            seen_ids = {job_id for posted, job_id in postings if posted == newest}
+            watermark = self.watermarks.get(company)
+            if watermark and watermark['newest_posted_on'] > newest:
+                continue
+            if watermark and watermark['newest_posted_on'] == newest:
+                seen_ids |= watermark['seen_ids']
+            rows.append((company, newest.isoformat(), json.dumps(sorted(seen_ids)), datetime.now().isoformat()))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany("INSERT OR REPLACE INTO workday_watermarks (company, newest_posted_on, seen_ids, updated_at) VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_cutoff(self, company_name):
+        """Postings older than this date are known, or too old for a first scrape."""
+        cutoff = date.today() - timedelta(days=WORKDAY_RECENT_DAYS)
+        watermark = self.watermarks.get(company_name)
+        return max(cutoff, watermark['newest_posted_on']) if watermark else cutoff
+
+    def is_known(self, company_name, job_id):
+        watermark = self.watermarks.get(company_name)
+        return bool(watermark) and job_id in watermark['seen_ids']
+
+    def scrape_company_with_api(self, company_name, company_url):
+        self.update_func(f"Scraping {company_name}: {company_url}")
+        settings = self.companies.get(company_name, {})
+        cutoff = self.get_cutoff(company_name)
+
+        def is_recent(posting):
+            posted = parse_workday_posted_on(posting.get('postedOn'))
+            return posted is not None and posted >= cutoff
+
+        def is_known(posting):
+            return self.is_known(company_name, self.api_client.posting_job_id(posting))
+
+        listings = self.api_client.fetch_listings(company_url, is_recent, is_known,
+                                                  tenant=settings.get('tenant'), site=settings.get('site'))
+        for listing in listings:
+            self.company_postings[company_name].append((parse_workday_posted_on(listing['posted_on']), listing['external_id']))
+            self.save_new_job_listing(company_name, listing['original_text'], listing['original_html'],
+                                      listing['source'], listing['external_id'])
+
+    def scrape_company(self, company_name, company_url):
+        """Return the listings of the company's recent postings."""
+        self.cancel_token.check()
+        self.company_postings[company_name] = []
+        self.job_listings[company_name] = []
+        if self.backend == 'api':
+            try:
+                self.scrape_company_with_api(company_name, company_url)
+                return self.job_listings[company_name]
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                self.update_func(f"Workday API failed for {company_name} ({e}), using the browser")
+                self.company_postings[company_name] = []
+                self.job_listings[company_name] = []
+        with self.browser_pool.driver() as driver:
+            self.scrape_company_with_browser(driver, company_name, company_url)
+        return self.job_listings[company_name]
+
+    def iter_company_listings(self):
+        """
+        Yield (company name, listings) as each company is scraped, {workers}
+        at a time. The watermarks are only moved by save_watermarks(), call
+        it once the listings are stored. Once the cancel token is set, no
+        other company is started, the ones being scraped are still yielded,
+        then ScrapingInterrupt is raised. A company that fails is left out
+        of the watermarks and added to failed_companies.
+        """
+        self.watermarks = self.load_watermarks()
+        self.company_postings = {}
+        self.failed_companies = {}
+        self.job_listings = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.scrape_company, company_name, company_url): company_name
+                       for company_name, company_url in self.company_urls.items()}
+            for future in as_completed(futures):
+                if self.cancel_token.is_cancelled():
+                    for queued in futures:
+                        queued.cancel()
+                if future.cancelled():
+                    continue
+                company_name = futures[future]
                 try:
-                    wait.until(EC.presence_of_element_located((By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)))
-                except TimeoutException:
-                    self.update_func("Job Listing Element not found. Try again later")
-                    break
-
-                job_elements = self.driver.find_elements(By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)
-                for job_element in job_elements:
-                    try:
-                        self.update_func(f"Scraping {company_name}: {self.driver.current_url}")
-                        job_title_element = job_element.find_element(By.XPATH, WorkDaySelectors.JOB_TITLE_XPATH)
-                        job_id_element = job_element.find_element(By.XPATH, WorkDaySelectors.JOB_ID_XPATH)
-                        job_id = job_id_element.text
-                        posted_on_element = job_element.find_element(By.XPATH, WorkDaySelectors.POSTED_ON_XAPTH)
-                        posted_on = posted_on_element.text
-
-                        if posted_on.lower() in self.one_week_span_text:
-                            job_url = job_title_element.get_attribute('href')
-                            job_title_element.click()
-                            job_description_element = wait.until(
-                                EC.presence_of_element_located((By.XPATH, WorkDaySelectors.JOB_DESCRIPTION_XPATH))
-                            )
-                            job_description = job_description_element.text
-                            job_description_html = job_description_element.get_attribute("innerHTML")
-                            self.save_new_job_listing(job_description, job_description_html, job_url, job_id)
-                        else:
-                            posted_this_week = False
-                            break
-                    except StaleElementReferenceException:
-                        continue
-
-                if not posted_this_week:
-                    break
+                    listings = future.result()
+                except ScrapingInterrupt:
+                    self.forget_company(company_name)
+                    continue
+                except Exception as e:
+                    # What it saw before failing isn't stored, its watermark must not move past it
+                    self.forget_company(company_name)
+                    self.failed_companies[company_name] = str(e) or e.__class__.__name__
+                    self.update_func(f"Scraping {company_name} failed: {e}")
+                    continue
+                yield company_name, listings
+        self.cancel_token.check()
+
+    def forget_company(self, company_name):
+        self.company_postings.pop(company_name, None)
+        self.job_listings.pop(company_name, None)
 
+    def scrape_company_with_browser(self, driver, company_name, company_url):
+        driver.get(company_url)
+        wait = WebDriverWait(driver, 10)
+        cutoff = self.get_cutoff(company_name)
+
+        posted_this_week = True
+        while posted_this_week:
+            try:
+                wait.until(EC.presence_of_element_located((By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)))
+            except TimeoutException:
+                self.update_func("Job Listing Element not found. Try again later")
+                break
+
+            job_elements = driver.find_elements(By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)
+            for job_element in job_elements:
                 try:
-                    next_page_button = wait.until(
-                        EC.element_to_be_clickable((By.XPATH, WorkDaySelectors.NEXT_PAGE_XPATH))
-                    )
-                    next_page_button.click()
-                except TimeoutException:
-                    self.update_func("TimeoutException. Please try again later!")
-                    break
-
-        self.save_job_listings_to_db()
-        self.update_func("Scraping completed for all companies.")
+                    self.update_func(f"Scraping {company_name}: {driver.current_url}")
+                    job_title_element = job_element.find_element(By.XPATH, WorkDaySelectors.JOB_TITLE_XPATH)
+                    job_id_element = job_element.find_element(By.XPATH, WorkDaySelectors.JOB_ID_XPATH)
+                    job_id = job_id_element.text
+                    posted_on_element = job_element.find_element(By.XPATH, WorkDaySelectors.POSTED_ON_XAPTH)
+                    posted = parse_workday_posted_on(posted_on_element.text)
+
+                    if posted is not None and posted >= cutoff:
+                        if self.is_known(company_name, job_id):
+                            continue  # Already scraped, no need to open it
+                        job_url = job_title_element.get_attribute('href')
+                        job_title_element.click()
+                        job_description_element = wait.until(
+                            EC.presence_of_element_located((By.XPATH, WorkDaySelectors.JOB_DESCRIPTION_XPATH))
+                        )
+                        job_description = job_description_element.text
+                        job_description_html = job_description_element.get_attribute("innerHTML")
+                        self.company_postings[company_name].append((posted, job_id))
+                        self.save_new_job_listing(company_name, job_description, job_description_html, job_url, job_id)
+                    else:
+                        posted_this_week = False
+                        break
+                except StaleElementReferenceException:
+                    continue
+
+            if not posted_this_week:
+                break
+
+            try:
+                next_page_button = wait.until(
+                    EC.element_to_be_clickable((By.XPATH, WorkDaySelectors.NEXT_PAGE_XPATH))
+                )
+                next_page_button.click()
+            except TimeoutException:
+                self.update_func("TimeoutException. Please try again later!")
+                break
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class StatusUpdates:
+    """
+    Status messages posted from any thread, for the UI thread to draw.
+    post() never touches curses nor waits, and only the newest message is
+    kept: the UI thread takes it with latest() once per frame, the ones
+    posted in between were never going to be seen anyway.
+    """
+    def __init__(self):
+        # deque's append and pop are atomic, no lock needed
+        self._pending = deque(maxlen=1)
+
+    def post(self, text):
+        self._pending.append(text)
+
+    def latest(self):
+        """Return the newest message posted since the last call, or None."""
+        try:
+            return self._pending.pop()
+        except IndexError:
+            return None
+
+
+class BackgroundJob:
+    """
+    Run a coroutine in its own thread and event loop, so the curses UI keeps
+    drawing and reading keys while it runs.
+
+    target is an async function called with the job itself, which it can use
+    to report progress (set_total, advance, set_message) and to honor pause
+    and cancel requests by awaiting checkpoint() between units of work.
+    Everything the UI reads (progress, message, result, error) is plain
+    attributes guarded by a lock, the UI thread never calls into the loop.
+    """
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+        self.logger = logging.getLogger('background_jobs')
+        self._lock = threading.Lock()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self.total = 0
+        self.done = 0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._thread_main, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _thread_main(self):
+        try:
+            self.result = asyncio.run(self._main())
+        except (JobCancelled, asyncio.CancelledError):
+            self.result = None
+        except Exception as e:
+            self.logger.exception("Background job %s failed", self.name)
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+            self._done_event.set()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        return await self.target(self)
+
+    # --- called from the job ----------------------------------------------
+
+    async def checkpoint(self):
+        """Wait while the job is paused, raise JobCancelled once it's been cancelled."""
+        while not self._resume_event.is_set() and not self._cancel_event.is_set():
+            await asyncio.sleep(0.1)
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+            self.done = 0
+
+    def advance(self, count=1):
+        with self._lock:
+            self.done += count
+
+    def set_message(self, message):
+        with self._lock:
+            self.message = message
+
+    # --- called from the UI ---------------------------------------------
+
+    def pause(self):
+        self._resume_event.clear()
+
+    def resume(self):
+        self._resume_event.set()
+
+    def toggle_pause(self):
+        if self.is_paused():
+            self.resume()
+        else:
+            self.pause()
+
+    def cancel(self):
+        """
+        Stop the job: nothing new is started, and requests in flight are
+        cancelled. Work that already finished (saved answers) is kept.
+        """
+        self._cancel_event.set()
+        self._resume_event.set()
+        if self._loop is not None and self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass  # the loop already finished
+
+    def wait(self, timeout=None):
+        return self._done_event.wait(timeout)
+
+    def is_running(self):
+        return self._thread is not None and not self._done_event.is_set()
+
+    def is_paused(self):
+        return not self._resume_event.is_set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def snapshot(self):
+        """Return (done, total, message) consistently for drawing."""
+        with self._lock:
+            return self.done, self.total, self.message
@@ -0,0 +1,178 @@
+"""
+Scrape and process listings without the menu, eg. under cron or systemd.
+
+    python src/cli.py run --scrape hn,waas --process --max-listings 500
+    python src/cli.py daemon --interval 3600 --scrape all --process
+
+"run" does it once, "daemon" again every --interval seconds until it's
+stopped (SIGINT or SIGTERM, it finishes the current run first). Every run
+prints its stats as one line of JSON on stdout (with the scrape's counters
+and timers, see job_scraper/metrics.py), progress goes to stderr
+(unless --quiet) and to the log file. The exit code is 1 when a source or
+the processing failed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from database_manager import DatabaseManager
+from gpt_processor import GPTProcessor
+from log_setup import setup_logging
+from job_scraper.scheduler import ScrapeScheduler
+from job_scraper.sources import SOURCES
+
+DB_PATH = 'job_listings.db'
+
+logger = logging.getLogger('cli')
+
+
+def parse_sources(value):
+    if not value:
+        return []
+    if value == 'all':
+        return list(SOURCES)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown source {', '.join(unknown)}, should be one of: {', '.join(SOURCES)} or all")
+    return names
+
+
+def processed_count(db_manager, all_profiles):
+    if all_profiles:
+        return sum(db_manager.fetch_processed_listings_count(profile['id']) for profile in db_manager.fetch_profiles())
+    return db_manager.fetch_processed_listings_count(db_manager.fetch_active_profile()['id'])
+
+
+async def process_backlog(db_path, max_listings, all_profiles=False, batch_size=None, update_func=None):
+    """
+    Process the listings without an AI answer, {batch_size} at a time
+    (COMMANDJOBS_LISTINGS_PER_BATCH by default), until none are left or
+    {max_listings} were processed. Returns how many answers were saved.
+    """
+    update_func = update_func or (lambda message: None)
+    db_manager = DatabaseManager(db_path)
+    try:
+        gpt_processor = GPTProcessor(db_manager, os.getenv('OPENAI_API_KEY'))
+        batch_size = int(batch_size or gpt_processor.listings_per_batch)
+        profile = db_manager.fetch_active_profile()
+        processed_before = processed = processed_count(db_manager, all_profiles)
+        while max_listings is None or processed - processed_before < max_listings:
+            remaining = None if max_listings is None else max_listings - (processed - processed_before)
+            gpt_processor.listings_per_batch = min(batch_size, remaining) if remaining is not None else batch_size
+            if all_profiles:
+                await gpt_processor.process_job_listings_for_all_profiles(update_func)
+            else:
+                await gpt_processor.process_job_listings_with_gpt(GPTProcessor.get_profile_resume_path(profile),
+                                                                  update_func, profile=profile)
+            processed_now = processed_count(db_manager, all_profiles)
+            if processed_now == processed:
+                break  # Nothing left to process
+            processed = processed_now
+        return processed - processed_before
+    finally:
+        db_manager.close()
+
+
+def run_once(args, update_func):
+    """Scrape and process once, return the stats."""
+    stats = {'started_at': datetime.now().isoformat(timespec='seconds'), 'scrape': {}, 'process': None, 'ok': True}
+    started = time.monotonic()
+    if args.scrape:
+        scheduler = ScrapeScheduler(args.db, args.scrape, max_per_host=args.max_per_host, update_func=update_func,
+                                    parse_workers=args.parse_workers)
+        stats['scrape'] = scheduler.run()
+        stats['scrape_metrics'] = scheduler.metrics.snapshot()
+        stats['ok'] = not any(result['error'] for result in stats['scrape'].values())
+    if args.process:
+        process_started = time.monotonic()
+        stats['process'] = {'processed': 0, 'seconds': 0.0, 'error': None}
+        try:
+            stats['process']['processed'] = asyncio.run(
+                process_backlog(args.db, args.max_listings, args.all_profiles, update_func=update_func))
+        except Exception as e:
+            logger.exception("Processing failed")
+            stats['process']['error'] = str(e) or e.__class__.__name__
+            stats['ok'] = False
+        stats['process']['seconds'] = round(time.monotonic() - process_started, 2)
+    stats['new_listings'] = sum(result['new'] for result in stats['scrape'].values())
+    stats['seconds'] = round(time.monotonic() - started, 2)
+    return stats
+
+
+def daemon(args, update_func, stop_event):
+    """Run every {args.interval} seconds until stop_event is set, return whether the last run was ok."""
+    runs = 0
+    ok = True
+    while not stop_event.is_set():
+        stats = run_once(args, update_func)
+        ok = stats['ok']
+        print(json.dumps(stats), flush=True)
+        runs += 1
+        if args.runs and runs >= args.runs:
+            break
+        stop_event.wait(args.interval)
+    return ok
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape and process job listings without the menu")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('run', "scrape and process once"), ('daemon', "scrape and process every --interval seconds")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--scrape', type=parse_sources, default=[],
+                             help=f"sources to scrape, comma separated: {', '.join(SOURCES)} or all")
+        command.add_argument('--process', action='store_true', help="process the listings without an AI answer")
+        command.add_argument('--max-listings', type=int, default=None, help="process at most this many listings")
+        command.add_argument('--all-profiles', action='store_true', help="process for every profile, not only the active one")
+        command.add_argument('--max-per-host', type=int, default=4, help="requests at once to the same site")
+        command.add_argument('--parse-workers', type=int, default=None,
+                             help="processes parsing the scraped pages, COMMANDJOBS_PARSE_WORKERS by default")
+        command.add_argument('--db', default=DB_PATH)
+        command.add_argument('--quiet', action='store_true', help="no progress on stderr")
+        if name == 'daemon':
+            command.add_argument('--interval', type=float, default=3600, help="seconds to wait between two runs")
+            command.add_argument('--runs', type=int, default=None, help="stop after this many runs")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.scrape and not args.process:
+        print("Nothing to do, use --scrape and/or --process", file=sys.stderr)
+        return 2
+
+    def update_func(message):
+        logger.info(message)
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    if args.command == 'run':
+        stats = run_once(args, update_func)
+        print(json.dumps(stats), flush=True)
+        return 0 if stats['ok'] else 1
+
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        update_func("Stopping after the current run")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    return 0 if daemon(args, update_func, stop_event) else 1
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    setup_logging()
+    sys.exit(main())
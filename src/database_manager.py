@@ -1,5 +1,12 @@
 import sqlite3
 import asyncio
+from datetime import datetime, timedelta
+
+# The profile created by migration 009, its empty fields
+# fall back to the env variables
+DEFAULT_PROFILE_ID = 1
+
+PROFILE_COLUMNS = ('id', 'name', 'resume_path', 'roles', 'exclusions', 'ideal_job_questions', 'is_active')
 
 class DatabaseManager:
     def __init__(self, db_path):
@@ -24,12 +31,95 @@ class DatabaseManager:
                 id INTEGER PRIMARY KEY,
                 job_id INTEGER,
                 prompt TEXT,
-                answer TEXT
+                answer TEXT,
+                resume_hash TEXT,
+                prompt_hash TEXT,
+                created_at TEXT,
+                profile_id INTEGER
+            )
+        ''')
+        self.conn.commit()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                resume_path TEXT,
+                roles TEXT,
+                exclusions TEXT,
+                ideal_job_questions TEXT,
+                is_active INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL DEFAULT (datetime('now'))
             )
         ''')
+        self.cursor.execute("INSERT OR IGNORE INTO profiles (id, name, is_active) VALUES (?, 'default', 1)", (DEFAULT_PROFILE_ID,))
+        self.conn.commit()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hn_threads (
+                thread_id TEXT PRIMARY KEY,
+                page_count INTEGER NOT NULL DEFAULT 0,
+                seen_ids TEXT NOT NULL DEFAULT '[]',
+                validators TEXT NOT NULL DEFAULT '{}',
+                last_fetched_at TEXT
+            )
+        ''')
+        self.conn.commit()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS page_hashes (
+                url TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                checked_at TEXT
+            )
+        ''')
+        self.conn.commit()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workday_watermarks (
+                company TEXT PRIMARY KEY,
+                newest_posted_on TEXT NOT NULL,
+                seen_ids TEXT NOT NULL DEFAULT '[]',
+                updated_at TEXT
+            )
+        ''')
+        self.conn.commit()
+
+    def fetch_profiles(self):
+        """Return every profile as a dict, default profile first."""
+        self.cursor.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles ORDER BY id")
+        return [dict(zip(PROFILE_COLUMNS, row)) for row in self.cursor.fetchall()]
+
+    def fetch_active_profile(self):
+        self.cursor.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE is_active = 1 ORDER BY id LIMIT 1")
+        row = self.cursor.fetchone()
+        if row is None:
+            self.set_active_profile(DEFAULT_PROFILE_ID)
+            return self.fetch_active_profile()
+        return dict(zip(PROFILE_COLUMNS, row))
+
+    def set_active_profile(self, profile_id):
+        self.cursor.execute("UPDATE profiles SET is_active = CASE WHEN id = ? THEN 1 ELSE 0 END", (profile_id,))
+        self.conn.commit()
+
+    def create_profile(self, name, resume_path, roles=None, exclusions=None, ideal_job_questions=None):
+        """Create a profile and return its id, empty fields fall back to the env variables."""
+        self.cursor.execute(
+            "INSERT INTO profiles (name, resume_path, roles, exclusions, ideal_job_questions) VALUES (?, ?, ?, ?, ?)",
+            (name, resume_path, roles or None, exclusions or None, ideal_job_questions or None))
         self.conn.commit()
+        return self.cursor.lastrowid
 
-    def fetch_job_listings(self, listings_per_batch):
+    def delete_profile(self, profile_id):
+        """Delete a profile along with its AI answers, the default profile can't be deleted."""
+        if profile_id == DEFAULT_PROFILE_ID:
+            return False
+        self.cursor.execute("DELETE FROM gpt_interactions WHERE profile_id = ?", (profile_id,))
+        self.cursor.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        self.cursor.execute("SELECT COUNT(*) FROM profiles WHERE is_active = 1")
+        if self.cursor.fetchone()[0] == 0:
+            self.set_active_profile(DEFAULT_PROFILE_ID)
+        self.conn.commit()
+        return True
+
+    def fetch_job_listings(self, listings_per_batch, profile_id=DEFAULT_PROFILE_ID):
         # The LIMIT here is effectively throttling GPT usage
         # every time the AI processing runs,
         # it only checks {listings_per_batch} listings
@@ -38,15 +128,41 @@ class DatabaseManager:
         query = f"""
             SELECT jl.id, jl.original_text, jl.original_html
             FROM job_listings jl
-            LEFT JOIN gpt_interactions gi ON jl.id = gi.job_id
+            LEFT JOIN gpt_interactions gi ON jl.id = gi.job_id AND gi.profile_id = ?
             WHERE gi.job_id IS NULL LIMIT {listings_per_batch}
         """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (profile_id,))
         return self.cursor.fetchall()
-    
-    def fetch_processed_listings_count(self):
-        query = "SELECT COUNT(id) FROM gpt_interactions"
-        self.cursor.execute(query)
+
+    def fetch_job_listings_for_profiles(self, listings_per_batch, profile_ids):
+        """
+        Return [(id, original_text, original_html, [profile_id, ...]), ...] for
+        listings that are missing an AI answer for at least one of profile_ids,
+        along with the profiles that still need to evaluate them. Each listing
+        is read once no matter how many profiles are missing it.
+        """
+        listings_per_batch = listings_per_batch or 10
+        if not profile_ids:
+            return []
+        profiles_values = ', '.join('(?)' for _ in profile_ids)
+        query = f"""
+            WITH wanted(profile_id) AS (VALUES {profiles_values})
+            SELECT jl.id, jl.original_text, jl.original_html, group_concat(w.profile_id)
+            FROM job_listings jl
+            CROSS JOIN wanted w
+            LEFT JOIN gpt_interactions gi ON gi.job_id = jl.id AND gi.profile_id = w.profile_id
+            WHERE gi.job_id IS NULL
+            GROUP BY jl.id
+            ORDER BY jl.id
+            LIMIT {int(listings_per_batch)}
+        """
+        self.cursor.execute(query, list(profile_ids))
+        return [(job_id, text, html, [int(pid) for pid in missing.split(',')])
+                for job_id, text, html, missing in self.cursor.fetchall()]
+
+    def fetch_processed_listings_count(self, profile_id=DEFAULT_PROFILE_ID):
+        query = "SELECT COUNT(id) FROM gpt_interactions WHERE profile_id = ?"
+        self.cursor.execute(query, (profile_id,))
         result = self.cursor.fetchone()  # Fetch the first row of the result set
         if result:
             return result[0]  # Return the first element of the tuple, which is the count
@@ -61,8 +177,55 @@ class DatabaseManager:
         return result[0] if result else 0
 
 
-    def save_gpt_interaction(self, job_id, prompt, answer):
-        self.cursor.execute("INSERT INTO gpt_interactions (job_id, prompt, answer) VALUES (?, ?, ?)", (job_id, prompt, answer))
+    def fetch_stale_interactions_count(self, resume_hash, prompt_hash, profile_id=DEFAULT_PROFILE_ID):
+        """Return how many AI answers were computed against a different resume or prompt config."""
+        query = """
+            SELECT COUNT(id) FROM gpt_interactions
+            WHERE profile_id = ? AND (resume_hash IS NOT ? OR prompt_hash IS NOT ?)
+        """
+        self.cursor.execute(query, (profile_id, resume_hash, prompt_hash))
+        result = self.cursor.fetchone()
+        return result[0] if result else 0
+
+    def fetch_stale_job_listings(self, resume_hash, prompt_hash, mode='all', recent_days=14, profile_id=DEFAULT_PROFILE_ID):
+        """
+        Return [(id, original_text, original_html), ...] for listings whose
+        AI answer is out of date, narrowed down by mode:
+            'all'     every stale listing
+            'recent'  listings scraped in the last {recent_days} days
+            'matches' listings the AI previously said were a good fit
+        Discarded and applied listings are never re-evaluated.
+        """
+        query = """
+            SELECT jl.id, jl.original_text, jl.original_html
+            FROM job_listings jl
+            JOIN gpt_interactions gi ON jl.id = gi.job_id AND gi.profile_id = ?
+            WHERE (gi.resume_hash IS NOT ? OR gi.prompt_hash IS NOT ?)
+              AND (jl.discarded IS NULL OR jl.discarded = 0)
+              AND (jl.applied IS NULL OR jl.applied = 0)
+        """
+        params = [profile_id, resume_hash, prompt_hash]
+        if mode == 'recent':
+            # scraped_at is stored as an ISO timestamp, so compare against one
+            query += " AND jl.scraped_at >= ?"
+            params.append((datetime.now() - timedelta(days=int(recent_days))).isoformat())
+        elif mode == 'matches':
+            query += """
+              AND json_valid(gi.answer) = 1
+              AND json_extract(gi.answer, '$.fit_for_resume') = 'Yes'
+            """
+        query += " GROUP BY jl.id ORDER BY jl.scraped_at DESC, jl.id DESC"
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+    def save_gpt_interaction(self, job_id, prompt, answer, resume_hash=None, prompt_hash=None, profile_id=DEFAULT_PROFILE_ID):
+        # A listing only keeps its latest answer per profile, so re-evaluating
+        # replaces the old one instead of showing up twice in the views
+        created_at = datetime.now().isoformat()
+        self.cursor.execute("DELETE FROM gpt_interactions WHERE job_id = ? AND profile_id = ?", (job_id, profile_id))
+        self.cursor.execute(
+            "INSERT INTO gpt_interactions (job_id, prompt, answer, resume_hash, prompt_hash, created_at, profile_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, prompt, answer, resume_hash, prompt_hash, created_at, profile_id))
         self.conn.commit()
 
     def close(self):
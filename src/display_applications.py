@@ -51,7 +51,10 @@ class ApplicationsDisplay:
                 ) AS last_activity
             FROM applications AS a
             JOIN gpt_interactions AS gi
-            ON gi.job_id = a.job_id
+            ON gi.id = (
+                -- a listing can have one answer per profile, use the latest
+                SELECT MAX(id) FROM gpt_interactions WHERE job_id = a.job_id
+            )
         """
         if not self.show_finalized_only:
             base_query += " WHERE a.status = 'Open'"
@@ -97,6 +100,8 @@ class ApplicationsDisplay:
             FROM gpt_interactions gi
             JOIN job_listings jl ON gi.job_id = jl.id
             WHERE jl.id = ?
+            ORDER BY gi.id DESC
+            LIMIT 1
             """, (job_id,)
         )
         row = cur.fetchone()
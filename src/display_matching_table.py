@@ -6,11 +6,16 @@ import logging
 import json
 from datetime import date, datetime
 from display_applications import ApplicationsDisplay
+from database_manager import DEFAULT_PROFILE_ID
+from log_setup import TRACE
 
 locale.setlocale(locale.LC_ALL, '')
 
+# How often the table checks for new matches while AI processing runs in the background
+LIVE_REFRESH_MS = 1000
+
 class MatchingTableDisplay:
-    def __init__(self, stdscr, db_path):
+    def __init__(self, stdscr, db_path, profile_id=DEFAULT_PROFILE_ID):
         self.stdscr = stdscr
         self.db_path = db_path
         self.highlighted_row_index = 0
@@ -18,20 +23,27 @@ class MatchingTableDisplay:
         self.total_pages = 0
         self.rows_per_page = 3
         self.search_term = ""
-        logging.basicConfig(filename='matching_table_display.log', level=logging.DEBUG)
-        
-        self.good_match_filters = '''
+        self.logger = logging.getLogger('display_matching_table')
+        self.set_profile(profile_id)
+
+    def set_profile(self, profile_id):
+        """Show the matches found for the given profile."""
+        self.profile_id = int(profile_id)
+        self.current_page = 1
+        self.highlighted_row_index = 0
+        self.good_match_filters = f'''
             json_valid(gi.answer) = 1
             AND json_extract(gi.answer, '$.fit_for_resume') = 'Yes'
             AND json_extract(gi.answer, '$.remote_positions') = 'Yes'
             AND json_extract(gi.answer, '$.hiring_in_us') <> 'No'
             AND (jl.discarded IS NULL OR jl.discarded = 0)
             AND (jl.applied IS NULL OR jl.applied = 0)
+            AND gi.profile_id = {self.profile_id}
         '''
 
-    def log(self, message):
-        """Log a message for debugging."""
-        logging.debug(message)
+    def log(self, message, level=logging.DEBUG):
+        """Log a message for debugging, it's queued and written off the UI thread."""
+        self.logger.log(level, message)
     
     def format_scraped_date(self, scraped_at):
         """Format scraped_at timestamp for display."""
@@ -138,10 +150,11 @@ class MatchingTableDisplay:
                 ORDER BY jl.scraped_at DESC, jl.id DESC
                 LIMIT 1 OFFSET {offset}
             """
-            self.log(f"Executing query: {query}")  # Log the query
+            # The full SQL on every page draw is only useful when tracing
+            if self.logger.isEnabledFor(TRACE):
+                self.log(f"Executing query: {query}", TRACE)
             cur.execute(query)
             data = cur.fetchone()
-            self.log(f"Fetched {len(data)} rows")  # Log the number of results
             conn.close()
             return data
         except (sqlite3.OperationalError, sqlite3.DatabaseError):
@@ -174,10 +187,12 @@ class MatchingTableDisplay:
                 ORDER BY jl.scraped_at DESC, jl.id DESC
                 LIMIT {self.rows_per_page} OFFSET {offset}
             """
-            self.log(f"Executing query: {query}")  # Log the query
+            # The full SQL on every page draw is only useful when tracing
+            if self.logger.isEnabledFor(TRACE):
+                self.log(f"Executing query: {query}", TRACE)
             cur.execute(query)
             data = cur.fetchall()
-            self.log(f"Fetched {len(data)} rows")  # Log the number of results
+            self.log(f"Fetched {len(data)} rows", TRACE)  # Log the number of results
             conn.close()
             return data
         except (sqlite3.OperationalError, sqlite3.DatabaseError):
@@ -286,14 +301,28 @@ class MatchingTableDisplay:
         self.stdscr.refresh()
 
 
-    def draw_table(self):
+    def draw_table(self, live=False):
+        """
+        Browse the matches. With live=True (AI processing is running in the
+        background) the table checks for new matches every second and
+        redraws when they land.
+        """
         self.total_entries = self.fetch_total_entries()
         self.total_pages = (self.total_entries + self.rows_per_page - 1) // self.rows_per_page
 
         self.draw_page(self.current_page)
 
         while True:
+            # show_job_detail switches back to blocking reads, so set it every time
+            self.stdscr.timeout(LIVE_REFRESH_MS if live else -1)
             key = self.stdscr.getch()
+            if key == -1:
+                total_entries = self.fetch_total_entries()
+                if total_entries != self.total_entries:
+                    self.total_entries = total_entries
+                    self.total_pages = (self.total_entries + self.rows_per_page - 1) // self.rows_per_page
+                    self.draw_page(self.current_page)
+                continue
             if key == curses.KEY_DOWN:
                 self.highlighted_row_index = min(self.highlighted_row_index + 1, self.rows_per_page - 1)
                 self.draw_page(self.current_page)
@@ -338,6 +367,7 @@ class MatchingTableDisplay:
                     self.total_pages = (self.total_entries + self.rows_per_page - 1) // self.rows_per_page
                     self.draw_page(self.current_page)
             elif key == ord('q'):
+                self.stdscr.timeout(-1)
                 break  # Exit the table view
             elif key == ord('a'):
                 # Apply to current job
@@ -348,6 +378,7 @@ class MatchingTableDisplay:
                     choice = self.show_post_apply_dialog()
                     if choice == 'a':
                         # Go to applications view
+                        self.stdscr.timeout(-1)
                         apps = ApplicationsDisplay(self.stdscr, self.db_path)
                         apps.draw_board()
                         return
@@ -366,7 +397,7 @@ class MatchingTableDisplay:
             conn.close()
             self.log(f"Discarded job {job_id}")
         except Exception as e:
-            self.log(f"Error discarding job {job_id}: {e}")
+            self.log(f"Error discarding job {job_id}: {e}", logging.ERROR)
 
     def apply_to_listing(self, job_id):
         try:
@@ -408,7 +439,7 @@ class MatchingTableDisplay:
 
             self.log(f"Applied to job {job_id} (and created application record)")
         except Exception as e:
-            self.log(f"Error marking job {job_id} as applied: {e}")
+            self.log(f"Error marking job {job_id} as applied: {e}", logging.ERROR)
 
 
     def show_job_detail(self, job_index):
@@ -431,7 +462,7 @@ class MatchingTableDisplay:
 
                 y_offset = 1  # Start from the second row for better visibility
                 for idx, detail in enumerate([job[0], job[1], job[4], job[5], job[9]]):
-                    self.log(f'{idx} {detail}')
+                    self.log(f'{idx} {detail}', TRACE)
                     header = ["Company", "Position", "Why it's a good fit", "How to Apply", "Job Description"][idx]
                     
                     if header == "Position":
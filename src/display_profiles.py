@@ -0,0 +1,112 @@
+import curses
+import re
+
+from database_manager import DEFAULT_PROFILE_ID
+
+class ProfilesDisplay:
+    """
+    List the candidate profiles (resume + role + exclusions) the listings are
+    evaluated against, and let the user switch, create or delete them.
+    """
+    def __init__(self, stdscr, db_manager):
+        self.stdscr = stdscr
+        self.db_manager = db_manager
+        self.cursor = 0
+        self.profiles = []
+        self.message = ''
+
+    def fetch_profiles(self):
+        self.profiles = self.db_manager.fetch_profiles()
+        self.cursor = max(0, min(self.cursor, len(self.profiles) - 1))
+
+    def prompt_text(self, label, max_length=200):
+        """Read a single line of text in a box at the bottom of the screen."""
+        max_y, max_x = self.stdscr.getmaxyx()
+        input_win = curses.newwin(3, max_x - 4, max_y - 5, 2)
+        input_win.box()
+        input_win.addstr(1, 2, label)
+        input_win.refresh()
+
+        curses.echo()
+        curses.curs_set(1)
+        try:
+            text = input_win.getstr(1, len(label) + 2, max_length).decode('utf-8').strip()
+        except curses.error:
+            text = ''
+        finally:
+            curses.noecho()
+            curses.curs_set(0)
+
+        input_win.clear()
+        input_win.refresh()
+        del input_win
+        return text
+
+    def create_profile(self):
+        name = self.prompt_text("Profile name (empty to cancel): ", 50)
+        if not name:
+            return
+        if any(profile['name'] == name for profile in self.profiles):
+            self.message = f"A profile named '{name}' already exists"
+            return
+        # Empty answers fall back to the env variables
+        roles = self.prompt_text("Roles (empty for COMMANDJOBS_ROLE): ")
+        exclusions = self.prompt_text("Exclusions (empty for COMMANDJOBS_EXCLUSIONS): ")
+        slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') or 'profile'
+        resume_path = f"base_resume_{slug}.txt"
+        self.db_manager.create_profile(name, resume_path, roles, exclusions)
+        self.message = f"Profile '{name}' created, activate it and edit its resume ({resume_path})"
+
+    def draw(self):
+        self.stdscr.clear()
+        h, w = self.stdscr.getmaxyx()
+        header = "Profiles (listings are shared, AI matches are per profile)"
+        self.stdscr.attron(curses.color_pair(4))
+        self.stdscr.addstr(0, 0, header.ljust(w)[:w - 1])
+        self.stdscr.attroff(curses.color_pair(4))
+
+        for idx, profile in enumerate(self.profiles):
+            y = 2 + idx * 2
+            if y >= h - 4:
+                break
+            active = "●" if profile['is_active'] else " "
+            label = f" {active} {profile['name']}  (resume: {profile['resume_path'] or 'BASE_RESUME_PATH'})"
+            details = f"     roles: {profile['roles'] or 'COMMANDJOBS_ROLE'} | exclusions: {profile['exclusions'] or 'COMMANDJOBS_EXCLUSIONS'}"
+            attr = curses.color_pair(3) if idx == self.cursor else curses.A_NORMAL
+            self.stdscr.addnstr(y, 0, label, w - 1, attr)
+            self.stdscr.addnstr(y + 1, 0, details, w - 1, curses.A_DIM)
+
+        if self.message:
+            self.stdscr.addnstr(h - 3, 0, self.message, w - 1, curses.color_pair(5))
+
+        controls = "[↑↓] Move  [Enter] Activate  [n] New profile  [d] Delete  [q] Back"
+        self.stdscr.attron(curses.color_pair(7))
+        self.stdscr.addstr(h - 2, max(0, (w - len(controls)) // 2), controls[:w - 1])
+        self.stdscr.attroff(curses.color_pair(7))
+        self.stdscr.refresh()
+
+    def draw_profiles(self):
+        while True:
+            self.fetch_profiles()
+            self.draw()
+            key = self.stdscr.getch()
+            self.message = ''
+            if key == curses.KEY_UP:
+                self.cursor = max(0, self.cursor - 1)
+            elif key == curses.KEY_DOWN:
+                self.cursor = min(len(self.profiles) - 1, self.cursor + 1)
+            elif key in [curses.KEY_ENTER, 10, 13]:
+                profile = self.profiles[self.cursor]
+                self.db_manager.set_active_profile(profile['id'])
+                self.message = f"Profile '{profile['name']}' is now active"
+            elif key == ord('n'):
+                self.create_profile()
+            elif key == ord('d'):
+                profile = self.profiles[self.cursor]
+                if profile['id'] == DEFAULT_PROFILE_ID:
+                    self.message = "The default profile can't be deleted"
+                else:
+                    self.db_manager.delete_profile(profile['id'])
+                    self.message = f"Profile '{profile['name']}' deleted"
+            elif key == ord('q'):
+                break
@@ -0,0 +1,143 @@
+"""
+A deterministic stand-in for an OpenAI-compatible chat completions server.
+
+Every prompt gets the same JSON answer each time (derived from a hash of the
+prompt), in the format expected by COMMANDJOBS_OUTPUT_FORMAT, so the AI
+pipeline can be tested and benchmarked offline, without API costs and
+independently of the remote service's speed.
+
+    python src/fake_llm_server.py --port 8765 --latency 0.2
+
+then point Command Jobs at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_answer(prompt):
+    """Return the JSON answer for a prompt, the same prompt always gets the same answer."""
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    value = int(digest[:8], 16)
+
+    def yes_no(bit):
+        return "Yes" if value >> bit & 1 else "No"
+
+    company = f"Company {digest[:6]}"
+    return json.dumps({
+        "small_summary": f"Listing {digest[:12]} summarized by the fake AI server",
+        "company_name": company,
+        "available_positions": [{"position": "Software Engineer", "link": f"https://example.com/jobs/{digest[:8]}"}],
+        "tech_stack_description": "Python, Ruby on Rails, Postgres",
+        "use_rails": yes_no(0),
+        "use_python": yes_no(1),
+        "remote_positions": yes_no(2),
+        "hiring_in_us": yes_no(3),
+        "how_to_apply": f"Email jobs@{digest[:6]}.example.com",
+        "back_ground_with_priority": None,
+        # about 1 in 4 listings is a good fit
+        "fit_for_resume": "Yes" if value % 4 == 0 else "No",
+        "fit_justification": "Decided by the fake AI server",
+    }, indent=1)
+
+
+class FakeLLMRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # keep test and benchmark output clean
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self.send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "commandjobs"}]})
+        else:
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self.send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        prompt = "\n".join(str(message.get('content', '')) for message in body.get('messages', []))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        answer = fake_answer(prompt)
+        with self.server.stats_lock:
+            self.server.requests_count += 1
+        self.send_json(200, {
+            "id": f"chatcmpl-fake-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get('model') or 'fake-model',
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                # rough 4 characters per token estimate
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(answer) // 4,
+                "total_tokens": (len(prompt) + len(answer)) // 4,
+            },
+        })
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        super().__init__((host, port), FakeLLMRequestHandler)
+        self.latency = latency
+        self.requests_count = 0
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start_in_thread(self):
+        """Serve from a daemon thread and return the server, call shutdown() to stop it."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake OpenAI-compatible server for tests and benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds to wait before each answer")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency)
+    print(f"Fake LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,198 @@
 import asyncio
+import hashlib
 import os
 import json
+import logging
+import re
 
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from database_manager import DEFAULT_PROFILE_ID
+from llm_backends import create_backend_from_env
+from log_setup import TRACE
+
+# Everything besides the resume and the profile settings that changes
+# what the AI answers, a change in any of these makes the stored answers out of date
+PROMPT_CONFIG_VARS = (
+    'OPENAI_GPT_MODEL',
+    'COMMANDJOBS_PROMPT',
+    'COMMANDJOBS_OUTPUT_FORMAT',
+)
+
+# Profile fields and the env variables they fall back to when empty
+PROFILE_SETTINGS_VARS = {
+    'roles': 'COMMANDJOBS_ROLE',
+    'exclusions': 'COMMANDJOBS_EXCLUSIONS',
+    'ideal_job_questions': 'COMMANDJOBS_IDEAL_JOB_QUESTIONS',
+}
 
 class GPTProcessor:
-    def __init__(self, db_manager, api_key):
+    def __init__(self, db_manager, api_key, backend=None, job=None):
         # Load environment variables
         load_dotenv()
         self.db_manager = db_manager
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.log_file = 'gpt_processor.log'  # Log file path
+        # OpenAI by default, or any OpenAI-compatible server set in OPENAI_BASE_URL
+        self.backend = backend or create_backend_from_env(api_key)
+        # When running as a BackgroundJob: progress reporting, pause and cancel
+        self.job = job
+        # Records go through the queue set up by log_setup, so logging
+        # from the event loop never waits on the log file
+        self.logger = logging.getLogger('gpt_processor')
         self.listings_per_batch = os.getenv('COMMANDJOBS_LISTINGS_PER_BATCH')
         if self.listings_per_batch  is None:
             raise ValueError(f"COMMANDJOBS_LISTINGS_PER_BATCH is not set; exiting.")
 
-    def log(self, message):
-        """Append a message to the log file."""
-        with open(self.log_file, 'a') as f:
-            f.write(f"{message}\n")
+    def get_resume_hash(self, resume):
+        return hashlib.sha256(resume.encode('utf-8')).hexdigest()[:16]
+
+    def get_prompt_hash(self, profile=None):
+        settings = self.get_profile_settings(profile)
+        model, prompt_template, output_format = (os.getenv(name) or '' for name in PROMPT_CONFIG_VARS)
+        config = [model, settings['roles'] or '', settings['ideal_job_questions'] or '',
+                  settings['exclusions'] or '', prompt_template, output_format]
+        return hashlib.sha256('\x00'.join(config).encode('utf-8')).hexdigest()[:16]
+
+    def get_current_versions(self, resume_path, profile=None):
+        """Return (resume_hash, prompt_hash) for the resume and prompt config in use right now."""
+        resume = self.read_resume_from_file(resume_path)
+        return self.get_resume_hash(resume), self.get_prompt_hash(profile)
+
+    @staticmethod
+    def get_profile_settings(profile=None):
+        """Return roles, exclusions and ideal_job_questions for a profile, falling back to the env variables."""
+        profile = profile or {}
+        return {field: profile.get(field) or os.getenv(env_var) for field, env_var in PROFILE_SETTINGS_VARS.items()}
+
+    @staticmethod
+    def get_profile_resume_path(profile=None):
+        return (profile or {}).get('resume_path') or os.getenv('BASE_RESUME_PATH')
+
+    @staticmethod
+    def normalize_listing_html(job_html):
+        # Scrapers store prettified html, collapsing the indentation
+        # keeps it readable for the AI with a lot less tokens
+        return re.sub(r'\s+', ' ', job_html or '').strip()
 
-    async def process_job_listings_with_gpt(self, resume_path, update_ui_callback):
+    async def process_job_listings_with_gpt(self, resume_path, update_ui_callback, profile=None):
         update_ui_callback(f"Getting job listings")
         resume = self.read_resume_from_file(resume_path)
-        job_listings = self.db_manager.fetch_job_listings(self.listings_per_batch)
+        profile_id = profile['id'] if profile else DEFAULT_PROFILE_ID
+        job_listings = self.db_manager.fetch_job_listings(self.listings_per_batch, profile_id)
         update_ui_callback(f"Processing {len(job_listings)} listings with AI. Please wait...")
-        self.log(f"Creating tasks for {len(job_listings)} job listings")
-        tasks = [self.process_single_listing(job_id, job_text, job_html, resume, update_ui_callback) for job_id, job_text, job_html in job_listings]
-        self.log(f"About to 'gather' {len(tasks)} tasks")
+        self.set_job_total(len(job_listings))
+        self.logger.info("Creating tasks for %d job listings", len(job_listings))
+        versions = (self.get_resume_hash(resume), self.get_prompt_hash(profile))
+        tasks = [self.process_single_listing(job_id, job_text, self.normalize_listing_html(job_html), resume, update_ui_callback, versions, profile)
+                 for job_id, job_text, job_html in job_listings]
+        self.logger.debug("About to 'gather' %d tasks", len(tasks))
         # Letting the exceptions bubble up to MenuApp
         await asyncio.gather(*tasks)
 
-    async def process_single_listing(self, job_id, job_text, job_html, resume, update_ui_callback):
-        prompt = self.generate_prompt(job_text, job_html, resume)
-        self.log(f"Prompt: {prompt}")  # Log the prompt
+    async def process_job_listings_for_all_profiles(self, update_ui_callback):
+        """
+        Evaluate a batch of listings against every profile at once.
+        Each listing is fetched and normalized a single time and shared by all
+        the profiles still missing an answer for it. The listing goes first in
+        the prompt (see COMMANDJOBS_PROMPT), so the requests for one listing
+        share a long common prefix: the first profile is sent alone and the
+        rest follow once it's back, which lets the API's prompt cache kick in.
+        Profiles whose resume file can't be read (eg. a new profile whose
+        resume wasn't written yet) are skipped.
+        Returns the number of listings processed.
+        """
+        update_ui_callback(f"Getting job listings for all profiles")
+        profiles = {}
+        resumes = {}
+        versions = {}
+        skipped = []
+        for profile in self.db_manager.fetch_profiles():
+            resume_path = self.get_profile_resume_path(profile)
+            try:
+                with open(resume_path, 'r') as file:
+                    resume = file.read()
+            except (OSError, TypeError) as e:
+                self.logger.warning("Skipping profile %s, its resume %s can't be read: %s", profile['name'], resume_path, e)
+                skipped.append(profile['name'])
+                continue
+            profiles[profile['id']] = profile
+            resumes[profile['id']] = resume
+            versions[profile['id']] = (self.get_resume_hash(resume), self.get_prompt_hash(profile))
+        if skipped:
+            update_ui_callback(f"Skipping profiles without a resume file: {', '.join(skipped)}")
+        if not profiles:
+            return 0
+
+        job_listings = self.db_manager.fetch_job_listings_for_profiles(self.listings_per_batch, list(profiles))
+        update_ui_callback(f"Processing {len(job_listings)} listings for {len(profiles)} profiles with AI. Please wait...")
+        self.set_job_total(sum(len(listing[3]) for listing in job_listings))
+
+        async def process_listing(job_id, job_text, job_html, missing_profile_ids):
+            job_html = self.normalize_listing_html(job_html)
+
+            def request(profile_id):
+                return self.process_single_listing(job_id, job_text, job_html, resumes[profile_id], update_ui_callback,
+                                                   versions[profile_id], profiles[profile_id])
+
+            # Created as they're awaited, when the first one fails the others are never started
+            first_profile_id, *other_profile_ids = missing_profile_ids
+            await request(first_profile_id)
+            await asyncio.gather(*(request(profile_id) for profile_id in other_profile_ids))
+
+        await asyncio.gather(*(process_listing(*listing) for listing in job_listings))
+        return len(job_listings)
+
+    async def reevaluate_job_listings(self, resume_path, mode, update_ui_callback, recent_days=14, similarity_threshold=0.2, profile=None):
+        """
+        Re-run the AI on listings whose answer was computed against an older
+        resume or prompt config. mode is one of 'all', 'recent', 'matches'
+        (see DatabaseManager.fetch_stale_job_listings) or 'similar', which
+        keeps only the listings sharing at least {similarity_threshold} of
+        their words with the current resume.
+        Listings are sent in chunks of COMMANDJOBS_LISTINGS_PER_BATCH so
+        progress can be reported as each chunk lands.
+        """
+        update_ui_callback(f"Looking for listings to re-evaluate")
+        resume = self.read_resume_from_file(resume_path)
+        versions = (self.get_resume_hash(resume), self.get_prompt_hash(profile))
+        db_mode = 'all' if mode == 'similar' else mode
+        profile_id = profile['id'] if profile else DEFAULT_PROFILE_ID
+        job_listings = self.db_manager.fetch_stale_job_listings(*versions, mode=db_mode, recent_days=recent_days, profile_id=profile_id)
+        if mode == 'similar':
+            job_listings = [listing for listing in job_listings
+                            if self.listing_similarity(resume, listing[1]) >= similarity_threshold]
+
+        total = len(job_listings)
+        self.set_job_total(total)
+        self.logger.info("Re-evaluating %d job listings (mode: %s)", total, mode)
+        chunk_size = max(int(self.listings_per_batch), 1)
+        for start in range(0, total, chunk_size):
+            chunk = job_listings[start:start + chunk_size]
+            update_ui_callback(f"Re-evaluating listings with AI: {start}/{total} done. Please wait...")
+            tasks = [self.process_single_listing(job_id, job_text, self.normalize_listing_html(job_html), resume, update_ui_callback, versions, profile)
+                     for job_id, job_text, job_html in chunk]
+            await asyncio.gather(*tasks)
+        return total
+
+    @staticmethod
+    def listing_similarity(resume, job_text):
+        """Share of the listing's distinct words (3+ letters) that also appear in the resume, 0.0 to 1.0"""
+        def words(text):
+            return set(re.findall(r'[a-z0-9+#]{3,}', (text or '').lower()))
+        job_words = words(job_text)
+        if not job_words:
+            return 0.0
+        return len(job_words & words(resume)) / len(job_words)
+
+    def set_job_total(self, total):
+        if self.job:
+            self.job.set_total(total)
+
+    async def process_single_listing(self, job_id, job_text, job_html, resume, update_ui_callback, versions=(None, None), profile=None):
+        if self.job:
+            # Waits here while paused, and stops here once cancelled
+            await self.job.checkpoint()
+        prompt = self.generate_prompt(job_text, job_html, resume, profile)
+        # Prompts are several kilobytes, only log them when tracing
+        self.logger.log(TRACE, "Prompt: %s", prompt)
         if not prompt:  # Check if prompt is None or empty
             raise ValueError("Prompt is None or empty, skipping GPT request.")
         
@@ -42,7 +200,10 @@ class GPTProcessor:
         # Letting bubble up the potential exceptions from
         # the two lines below, up to process_job_listings_with_gpt
         answer = await self.get_gpt_response(prompt)
-        self.db_manager.save_gpt_interaction(job_id, prompt, answer)  
+        profile_id = profile['id'] if profile else DEFAULT_PROFILE_ID
+        self.db_manager.save_gpt_interaction(job_id, prompt, answer, *versions, profile_id=profile_id)
+        if self.job:
+            self.job.advance()
             
         # Attempt to load the JSON string into a Python dictionary
         try:
@@ -50,9 +211,9 @@ class GPTProcessor:
             # Show a little preview of the processed jobs
             update_ui_callback(f"Processed {answer_dict['company_name']} / {answer_dict['small_summary'][:50]}")
         except json.JSONDecodeError:
-            self.log(f"Invalid JSON format: {answer}")
+            self.logger.warning("Invalid JSON format for job_id %s: %.200s", job_id, answer)
         
-        self.log(f"Processed job_id: {job_id}")
+        self.logger.debug("Processed job_id: %s", job_id)
 
     def read_resume_from_file(self, file_path):
         try:
@@ -61,7 +222,7 @@ class GPTProcessor:
         except FileNotFoundError:
             return "Resume file not found."
 
-    def generate_prompt(self, job_text, job_html, resume):
+    def generate_prompt(self, job_text, job_html, resume, profile=None):
         # Similar to the original prompt creation logic
         # Ensure to return the formatted prompt string
         # output_format = """{
@@ -84,14 +245,15 @@ class GPTProcessor:
         #     "fit_justification": "The position is for Wine and Open Source developers, neither of which the resume has experience with. The job is remote in the US"
         #     }"""
         output_format_str = os.getenv('COMMANDJOBS_OUTPUT_FORMAT')
-        self.log(f"output_format_str: {output_format_str}") 
+        self.logger.log(TRACE, "output_format_str: %s", output_format_str)
         # Convert the escaped newlines back to actual newline characters
         output_format = output_format_str.encode().decode('unicode_escape')
-        # self.log(f"output_format: {output_format}") 
-        roles = os.getenv('COMMANDJOBS_ROLE')
-        job_requirement_exclusions=os.getenv('COMMANDJOBS_EXCLUSIONS')
-        # self.log(f"job_requirement_exclusions: {job_requirement_exclusions}")
-        ideal_job_questions_template = os.getenv('COMMANDJOBS_IDEAL_JOB_QUESTIONS')
+        # self.logger.log(TRACE, "output_format: %s", output_format)
+        settings = self.get_profile_settings(profile)
+        roles = settings['roles']
+        job_requirement_exclusions = settings['exclusions']
+        # self.logger.log(TRACE, "job_requirement_exclusions: %s", job_requirement_exclusions)
+        ideal_job_questions_template = settings['ideal_job_questions']
         prompt_template = os.getenv('COMMANDJOBS_PROMPT')
 
         # Perform the interpolation
@@ -101,10 +263,7 @@ class GPTProcessor:
         return prompt
 
     async def get_gpt_response(self, prompt):
-        response = await self.client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=os.getenv('OPENAI_GPT_MODEL'),
-        )
-        self.log(f"response.choices: {response.choices}")
-        return response.choices[0].message.content
+        answer = await self.backend.complete(prompt)
+        self.logger.log(TRACE, "response: %s", answer)
+        return answer
 
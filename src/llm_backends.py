@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+
+from openai import AsyncOpenAI
+
+
+class LLMBackend:
+    """
+    Something that answers a prompt with text. GPTProcessor only talks to
+    this interface, so the OpenAI API, a local OpenAI-compatible server or
+    a fake one for tests can be swapped without touching the pipeline.
+    """
+    name = 'base'
+
+    async def complete(self, prompt):
+        raise NotImplementedError
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Chat completions over the OpenAI API, or any server that speaks it
+    (llama.cpp's llama-server, vLLM, Ollama, fake_llm_server.py...) when a
+    base_url is given. request_params are passed as-is to every request,
+    eg. {"temperature": 0, "max_tokens": 800}. max_concurrency limits the
+    requests in flight, a local model on CPU can only serve a few at a time.
+    """
+    name = 'openai'
+
+    def __init__(self, api_key, model, base_url=None, request_params=None, max_concurrency=None, timeout=None):
+        self.model = model
+        self.base_url = base_url
+        self.request_params = request_params or {}
+        client_options = {'api_key': api_key or 'not-needed', 'base_url': base_url or None}
+        if timeout:
+            client_options['timeout'] = timeout
+        self.client = AsyncOpenAI(**client_options)
+        self.max_concurrency = max_concurrency
+        self._semaphores = {}
+
+    def _get_semaphore(self):
+        # The app runs each batch in its own event loop (asyncio.run),
+        # and a semaphore can only be used from the loop it was created in
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+        return self._semaphores[loop]
+
+    async def complete(self, prompt):
+        if not self.max_concurrency:
+            return await self._complete(prompt)
+        async with self._get_semaphore():
+            return await self._complete(prompt)
+
+    async def _complete(self, prompt):
+        response = await self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.model,
+            **self.request_params,
+        )
+        return response.choices[0].message.content
+
+
+def create_backend_from_env(api_key=None):
+    """
+    Build the backend configured in the env variables:
+        OPENAI_BASE_URL             base URL of an OpenAI-compatible server, eg. http://localhost:8080/v1
+                                    (empty for the OpenAI API)
+        COMMANDJOBS_LLM_PARAMS      JSON object of extra request parameters, eg. {"temperature": 0}
+        COMMANDJOBS_LLM_CONCURRENCY maximum number of requests in flight (no limit by default)
+        COMMANDJOBS_LLM_TIMEOUT     seconds to wait for each answer (the client's 600 by default)
+    """
+    request_params = {}
+    params_str = os.getenv('COMMANDJOBS_LLM_PARAMS')
+    if params_str:
+        try:
+            request_params = json.loads(params_str)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"COMMANDJOBS_LLM_PARAMS is not valid JSON: {e}")
+        if not isinstance(request_params, dict):
+            raise ValueError("COMMANDJOBS_LLM_PARAMS should be a JSON object, eg. {\"temperature\": 0}")
+
+    concurrency = os.getenv('COMMANDJOBS_LLM_CONCURRENCY')
+    timeout = os.getenv('COMMANDJOBS_LLM_TIMEOUT')
+    return OpenAICompatibleBackend(
+        api_key=api_key or os.getenv('OPENAI_API_KEY'),
+        model=os.getenv('OPENAI_GPT_MODEL'),
+        base_url=os.getenv('OPENAI_BASE_URL'),
+        request_params=request_params,
+        max_concurrency=int(concurrency) if concurrency else None,
+        timeout=float(timeout) if timeout else None,
+    )
@@ -0,0 +1,95 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Below DEBUG, for the multi-kilobyte bodies (prompts, raw AI answers, SQL)
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
+
+_listener = None
+_queue_handler = None
+
+
+def parse_level(level_name, default=logging.INFO):
+    if not level_name:
+        return default
+    level_name = level_name.strip().upper()
+    if level_name.isdigit():
+        return int(level_name)
+    level = logging.getLevelName(level_name)
+    return level if isinstance(level, int) else default
+
+
+def parse_component_levels(levels_str):
+    """Parse "gpt_processor=TRACE,display_matching_table=WARNING" into {logger_name: level}."""
+    levels = {}
+    for item in (levels_str or '').split(','):
+        if '=' not in item:
+            continue
+        name, level_name = item.split('=', 1)
+        if name.strip():
+            levels[name.strip()] = parse_level(level_name)
+    return levels
+
+
+def setup_logging(log_file=None, level=None, component_levels=None, max_bytes=None, backup_count=None):
+    """
+    Send every log record through a queue to a background thread that writes
+    them to a size-rotated file, so logging from the asyncio event loop or the
+    curses UI loop never waits on file I/O.
+
+    Defaults come from the env variables:
+        COMMANDJOBS_LOG_FILE          application.log
+        COMMANDJOBS_LOG_LEVEL         INFO (TRACE includes prompts and raw AI answers)
+        COMMANDJOBS_LOG_LEVELS        per component, eg. gpt_processor=DEBUG,display_matching_table=WARNING
+        COMMANDJOBS_LOG_MAX_BYTES     5 MB per file
+        COMMANDJOBS_LOG_BACKUP_COUNT  3 rotated files kept
+
+    Calling it again replaces the previous configuration. Returns the
+    QueueListener, which is also stopped (flushing the queue) at exit.
+    """
+    global _listener, _queue_handler
+
+    log_file = log_file or os.getenv('COMMANDJOBS_LOG_FILE') or 'application.log'
+    level = level if level is not None else parse_level(os.getenv('COMMANDJOBS_LOG_LEVEL'))
+    if component_levels is None:
+        component_levels = parse_component_levels(os.getenv('COMMANDJOBS_LOG_LEVELS'))
+    max_bytes = max_bytes or int(os.getenv('COMMANDJOBS_LOG_MAX_BYTES') or 5 * 1024 * 1024)
+    backup_count = backup_count if backup_count is not None else int(os.getenv('COMMANDJOBS_LOG_BACKUP_COUNT') or 3)
+
+    stop_logging()
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    _queue_handler = QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    for name, component_level in component_levels.items():
+        logging.getLogger(name).setLevel(component_level)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out whatever is still queued and stop the background thread."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,24 +1,27 @@
 import curses
 import os
-import time
-from job_scraper.hacker_news.scraper import HNScraper
 from display_table import draw_table
 from database_manager import DatabaseManager
 from display_matching_table import MatchingTableDisplay
 from display_applications import ApplicationsDisplay
+from display_profiles import ProfilesDisplay
 from gpt_processor import GPTProcessor
+from log_setup import setup_logging
+from background_jobs import BackgroundJob, StatusUpdates
 
 import asyncio
 import sqlite3
 import logging
 import threading
-from queue import Queue
 from dotenv import load_dotenv
 
-from job_scraper.workday.scraper import WorkdayScraper
-from job_scraper.waas.work_startup_scraper import WorkStartupScraper
+from job_scraper.metrics import format_metrics
+from job_scraper.scheduler import ScrapeScheduler, format_results
 
 DB_PATH='job_listings.db'
+# How often the menu redraws the status bar and the progress of the AI
+# processing or scrape running in the background
+FRAME_MS = 250
 
 class MenuApp:
     def __init__(self, stdscr, logger):
@@ -39,20 +42,28 @@ class MenuApp:
                     '''
                 raise ValueError(error_message)
 
-        self.scraping_done_event = threading.Event()  # Event to signal scraping completion
+        self.ai_job = None  # BackgroundJob running the AI processing, if any
+        self.ai_job_on_done = None
+        self.ai_job_last_done = 0
+        self.scrape_job = None  # BackgroundJob running a scrape, if any, and its ScrapeScheduler
+        self.scrape_scheduler = None
+        # The status bar's messages, from whichever thread, drawn by this one
+        self.status_updates = StatusUpdates()
+        self.ui_thread = threading.current_thread()
         self.logger = logger
         self.stdscr = stdscr
         self.setup_ncurses()
         self.db_path = DB_PATH
         self.db_manager = DatabaseManager(self.db_path)  # Specify the path
         self.gpt_processor = GPTProcessor(self.db_manager, os.getenv('OPENAI_API_KEY'))
-        self.resume_path = os.getenv('BASE_RESUME_PATH')
         self.table_display = MatchingTableDisplay(self.stdscr, self.db_path)
+        self.load_active_profile()
         self.total_ai_job_recommendations = self.table_display.fetch_total_entries()
         self.update_processed_listings_count()
         self.total_listings = self.get_total_listings()
         env_limit = 0 if os.getenv('COMMANDJOBS_LISTINGS_PER_BATCH') is None else os.getenv('COMMANDJOBS_LISTINGS_PER_BATCH')
         self.listings_per_request = max(int(env_limit), 10)
+        self.update_stale_listings_count()
 
         resume_menu = "📄 Create resume (just paste it here once)"
         find_best_matches_menu = "🧠 Find best matches with AI (Create your resume first)"
@@ -75,36 +86,161 @@ class MenuApp:
             applications_menu,                   # 1  <-- moved up
             ai_recommendations_menu,             # 2  <-- moved up
             find_best_matches_menu,              # 3  <-- moved up
-            "🕸  Scrape \"Ask HN: Who's hiring?\"",   # 4
-            "🕸  Scrape \"Work at a Startup jobs\"",  # 5
-            "🕸  Scrape \"Workday\"",                  # 6
+            self.get_reevaluate_menu_item(),     # 4
+            "🕸  Scrape \"Ask HN: Who's hiring?\"",   # 5
+            "🕸  Scrape \"Work at a Startup jobs\"",  # 6
+            "🕸  Scrape \"Workday\"",                  # 7
+            "🕸  Scrape all sources at once",       # 8
+            self.get_profiles_menu_item(),       # 9
             resume_menu,                         # 0
-            db_menu_item                         # 7  <-- moved down
+            db_menu_item                         # 10 <-- moved down
         ]
         self.current_row = 0
         self.display_splash_screen()
+        if self.stale_listings_count > 0:
+            # Let the user know right away that answers are out of date
+            self.draw_menu()
+            self.update_status_bar(f"Resume or prompt changed since {self.stale_listings_count} listings were processed, use ♻️  to re-evaluate them")
         self.run()
 
-    def update_processed_listings_count(self):
-        self.processed_listings_count = self.db_manager.fetch_processed_listings_count()
+    def load_active_profile(self):
+        # Resume, matches and AI answers all follow the active profile
+        self.active_profile = self.db_manager.fetch_active_profile()
+        self.profiles_count = len(self.db_manager.fetch_profiles())
+        self.resume_path = self.gpt_processor.get_profile_resume_path(self.active_profile)
+        self.table_display.set_profile(self.active_profile['id'])
 
-    async def process_with_gpt(self):
-        exit_message = 'Processing completed successfully'
+    def get_profiles_menu_item(self):
+        return f"👥 Profile: {self.active_profile['name']} ({self.profiles_count} profiles)"
+
+    def update_processed_listings_count(self):
+        self.processed_listings_count = self.db_manager.fetch_processed_listings_count(self.active_profile['id'])
+
+    def update_stale_listings_count(self):
+        resume_hash, prompt_hash = self.gpt_processor.get_current_versions(self.resume_path, self.active_profile)
+        self.stale_listings_count = self.db_manager.fetch_stale_interactions_count(resume_hash, prompt_hash, self.active_profile['id'])
+
+    def get_reevaluate_menu_item(self):
+        if self.stale_listings_count > 0:
+            return f"♻️  Re-evaluate {self.stale_listings_count} listings processed with an older resume or prompt"
+        return "♻️  Re-evaluate listings (all AI answers match the current resume)"
+
+    def start_ai_job(self, name, target, on_done):
+        """
+        Run the AI processing coroutine {target} in the background, the menu
+        keeps working and shows its progress on the status bar. {on_done} is
+        called from the UI thread with the job's result and returns the exit message.
+        """
+        if self.ai_job is not None and self.ai_job.is_running():
+            return "AI processing is already running, [p] to pause or [c] to cancel it"
+        self.ai_job = BackgroundJob(name, target).start()
+        self.ai_job_on_done = on_done
+        self.ai_job_last_done = 0
+        return "AI processing started in the background, matches show up as they are found"
+
+    def create_background_gpt_processor(self, job):
+        # SQLite connections can't be shared between threads, and the
+        # AI client belongs to the job's event loop, so each job gets its own
+        db_manager = DatabaseManager(self.db_path)
+        return GPTProcessor(db_manager, os.getenv('OPENAI_API_KEY'), job=job)
+
+    async def process_with_gpt(self, job, all_profiles=False, profile=None, resume_path=None):
+        gpt_processor = self.create_background_gpt_processor(job)
         try:
-            self.logger.debug('Calling: self.gpt_processor.process_job_listings_with_gpt')
-            await self.gpt_processor.process_job_listings_with_gpt(self.resume_path, update_ui_callback=self.update_status_bar)
-        except Exception as e:
-            self.logger.exception("Failed to process listings with GPT: %s", str(e))
-            exit_message = f'Failed to process listings with GPT: {str(e)}'
+            if all_profiles:
+                self.logger.debug('Calling: gpt_processor.process_job_listings_for_all_profiles')
+                await gpt_processor.process_job_listings_for_all_profiles(update_ui_callback=job.set_message)
+            else:
+                self.logger.debug('Calling: gpt_processor.process_job_listings_with_gpt')
+                await gpt_processor.process_job_listings_with_gpt(resume_path, update_ui_callback=job.set_message,
+                                                                   profile=profile)
         finally:
+            gpt_processor.db_manager.close()
+
+    def process_with_gpt_done(self, recommendations_before):
+        def on_done(result):
             new_count = self.table_display.fetch_total_entries()
-            if new_count > self.total_ai_job_recommendations:
-                count_diff = new_count - self.total_ai_job_recommendations
-                exit_message = f'Processing completed successfully. {count_diff} new matches found ({new_count} total)'
-            else:
-                exit_message = f'Processing completed successfully. No new matches found ({new_count} total)'
+            if new_count > recommendations_before:
+                count_diff = new_count - recommendations_before
+                return f'Processing completed successfully. {count_diff} new matches found ({new_count} total)'
+            return f'Processing completed successfully. No new matches found ({new_count} total)'
+        return on_done
+
+    async def reevaluate_with_gpt(self, job, mode, profile=None, resume_path=None):
+        gpt_processor = self.create_background_gpt_processor(job)
+        recent_days = int(os.getenv('COMMANDJOBS_REEVALUATE_DAYS') or 14)
+        similarity_threshold = float(os.getenv('COMMANDJOBS_REEVALUATE_SIMILARITY') or 0.2)
+        try:
+            self.logger.debug('Calling: gpt_processor.reevaluate_job_listings (mode: %s)', mode)
+            return await gpt_processor.reevaluate_job_listings(
+                resume_path, mode, update_ui_callback=job.set_message,
+                recent_days=recent_days, similarity_threshold=similarity_threshold, profile=profile)
+        finally:
+            gpt_processor.db_manager.close()
+
+    def reevaluate_with_gpt_done(self, total):
+        new_count = self.table_display.fetch_total_entries()
+        return f'Re-evaluation completed. {total} listings checked against the current resume ({new_count} matches total)'
+
+    def poll_ai_job(self):
+        """Show the progress of the background AI processing, and its result once it's done."""
+        job = self.ai_job
+        if job is None:
+            return
+        done, total, message = job.snapshot()
+        if job.is_running():
+            if done != self.ai_job_last_done:
+                # Refresh the counters so new matches show up as they land
+                self.ai_job_last_done = done
+                self.update_menu_items()
+            state = "⏸  AI processing paused" if job.is_paused() else "🧠 AI processing"
+            self.update_status_bar(f"{state}: {done}/{total} listings | {message}")
+            return
+
+        self.ai_job = None
+        if job.error is not None:
+            exit_message = f'AI processing failed: {str(job.error)}'
+        elif job.is_cancelled():
+            exit_message = f'AI processing cancelled, {done} of {total} listings were processed'
+        else:
+            exit_message = self.ai_job_on_done(job.result)
+        self.stdscr.clear()
+        self.update_menu_items()
+        self.update_status_bar(exit_message)
+
+    def prompt_reevaluate_mode(self):
+        """
+        Ask which stale listings should be re-evaluated.
+        Returns 'recent', 'matches', 'similar', 'all', or None when cancelled.
+        """
+        text = "[r] Recent  [y] Previous \"Yes\" matches  [s] Similar to resume  [a] All  [q] Cancel"
+        modes = {ord('r'): 'recent', ord('y'): 'matches', ord('s'): 'similar', ord('a'): 'all', ord('q'): None}
+        return self.prompt_choice(text, modes)
+
+    def prompt_choice(self, text, choices):
+        """
+        Display a centered dialog with the {text} options and wait for one of
+        the keys in {choices}, returns the value mapped to the key pressed.
+        """
+        max_y, max_x = self.stdscr.getmaxyx()
+        width = min(len(text) + 4, max_x)
+        height = 3
+        win = curses.newwin(height, width, (max_y - height) // 2, max(0, (max_x - width) // 2))
+        win.box()
+        win.attron(curses.color_pair(7))
+        win.addstr(1, 2, text[:width - 4])
+        win.attroff(curses.color_pair(7))
+        win.refresh()
 
-        return exit_message
+        while True:
+            ch = win.getch()
+            if ch in choices:
+                break
+
+        win.clear()
+        self.stdscr.touchwin()
+        self.stdscr.refresh()
+        return choices[ch]
 
 
     def read_resume_from_file(self):
@@ -191,6 +327,13 @@ class MenuApp:
 
         # --- Centered controls hint line ---
         controls = "[↑↓] Select  [Enter] Go into  [q] Quit to terminal"
+        if self.ai_job is not None or self.scrape_job is not None:
+            controls = "[↑↓] Select  [Enter] Go into"
+            if self.ai_job is not None:
+                controls += "  [p] Pause/Resume AI  [c] Cancel AI"
+            if self.scrape_job is not None:
+                controls += "  [x] Stop scrape"
+            controls += "  [q] Quit"
         # place it two rows up from bottom
         hint_y = h - 2
         hint_x = max(0, (w - len(controls)) // 2)
@@ -203,8 +346,16 @@ class MenuApp:
     def run(self):
         while True:
             self.draw_menu()
+            self.poll_ai_job()
+            self.poll_scrape_job()
+            self.draw_status_bar()
+            # While AI processing or a scrape runs in the background, wake
+            # up every frame to redraw its progress instead of waiting for a key
+            background = self.ai_job is not None or self.scrape_job is not None
+            self.stdscr.timeout(FRAME_MS if background else -1)
             key = self.stdscr.getch()
-            self.handle_keypress(key)
+            if key != -1:
+                self.handle_keypress(key)
 
     def handle_keypress(self, key):
         if key == curses.KEY_UP:
@@ -213,14 +364,32 @@ class MenuApp:
             self.current_row = min(len(self.menu_items) - 1, self.current_row + 1)
         elif key in [curses.KEY_ENTER, 10, 13]:
             self.execute_menu_action()
+        elif key == ord('p') and self.ai_job is not None:
+            self.ai_job.toggle_pause()
+        elif key == ord('c') and self.ai_job is not None:
+            self.ai_job.cancel()
+        elif key == ord('x') and self.scrape_job is not None:
+            self.stop_scraping()
         elif key == ord('q'):
+            if self.ai_job is not None:
+                # Answers already saved are kept, stop the requests in flight
+                self.ai_job.cancel()
+                self.ai_job.wait(2)
+            if self.scrape_job is not None:
+                # Give the sources a moment to store what they parsed
+                self.stop_scraping()
+                self.scrape_job.wait(10)
             exit()
 
     def update_menu_items(self):
+        # The active profile may have changed
+        self.load_active_profile()
+
         # Update the total and processed listings count
         self.total_listings = self.get_total_listings()
         self.total_ai_job_recommendations = self.table_display.fetch_total_entries()
         self.update_processed_listings_count()
+        self.update_stale_listings_count()
 
         # Update the resume option
         resume_menu = "📄 Create resume (just paste it here once)"
@@ -247,17 +416,22 @@ class MenuApp:
         # 0 📋 Applications
         # 1 ✅ Recommended
         # 2 🧠 Find best matches
-        # 3 🕸 Scrape HN            ← leave untouched!
-        # 4 🕸 Scrape W@S
-        # 5 🕸 Scrape Workday
-        # 6 📄 Resume               ← update this one
-        # 7 💾 Navigate DB
+        # 3 ♻️ Re-evaluate          ← stale count changes
+        # 4 🕸 Scrape HN            ← leave untouched!
+        # 5 🕸 Scrape W@S
+        # 6 🕸 Scrape Workday
+        # 7 🕸 Scrape all sources
+        # 8 👥 Profiles             ← active profile name
+        # 9 📄 Resume               ← update this one
+        # 10 💾 Navigate DB
         # -----------------------------------------------
         self.menu_items[0] = applications_menu
         self.menu_items[1] = ai_recommendations_menu
         self.menu_items[2] = find_best_matches_menu
-        self.menu_items[6] = resume_menu          # ← was 3
-        self.menu_items[7] = db_menu_item
+        self.menu_items[3] = self.get_reevaluate_menu_item()
+        self.menu_items[8] = self.get_profiles_menu_item()
+        self.menu_items[9] = resume_menu          # ← was 3
+        self.menu_items[10] = db_menu_item
 
         # Redraw the menu to reflect the updated items
         self.draw_menu()
@@ -268,29 +442,56 @@ class MenuApp:
     # = "Create or replace base resume"
     def execute_menu_action(self):
         exit_message = ''
+        # Screens and text input below expect blocking reads
+        self.stdscr.timeout(-1)
         if   self.current_row == 0:      # 📋 Applications
             self.app_display = ApplicationsDisplay(self.stdscr, self.db_path)
             self.app_display.draw_board()
 
         elif self.current_row == 1:      # ✅ Recommended listings
-            self.table_display.draw_table()
+            self.table_display.draw_table(live=self.ai_job is not None)
 
         elif self.current_row == 2:      # 🧠 Find best matches
-            exit_message = asyncio.run(self.process_with_gpt())
-
-        elif self.current_row == 3:      # 🕸 Scrape “Ask HN”
-            self.start_scraping_with_status_updates()
-
-        elif self.current_row == 4:      # 🕸 Scrape “Work at a Startup”
-            self.start_scraping_WaaS_with_status_updates()
-
-        elif self.current_row == 5:      # 🕸 Scrape “Workday”
-            self.start_scraping_workday_with_status_updates()
-
-        elif self.current_row == 6:      # 📄 Resume
+            all_profiles = False
+            if self.profiles_count > 1:
+                all_profiles = self.prompt_choice(
+                    f"[p] Only profile '{self.active_profile['name']}'  [a] All {self.profiles_count} profiles  [q] Cancel",
+                    {ord('p'): False, ord('a'): True, ord('q'): None})
+            if all_profiles is not None:
+                profile, resume_path = self.active_profile, self.resume_path
+                exit_message = self.start_ai_job(
+                    'find-best-matches',
+                    lambda job: self.process_with_gpt(job, all_profiles, profile=profile, resume_path=resume_path),
+                    self.process_with_gpt_done(self.total_ai_job_recommendations))
+
+        elif self.current_row == 3:      # ♻️ Re-evaluate stale answers
+            mode = self.prompt_reevaluate_mode()
+            if mode:
+                profile, resume_path = self.active_profile, self.resume_path
+                exit_message = self.start_ai_job(
+                    're-evaluate',
+                    lambda job: self.reevaluate_with_gpt(job, mode, profile=profile, resume_path=resume_path),
+                    self.reevaluate_with_gpt_done)
+
+        elif self.current_row == 4:      # 🕸 Scrape “Ask HN”
+            exit_message = self.start_scraping(['hn'])
+
+        elif self.current_row == 5:      # 🕸 Scrape “Work at a Startup”
+            exit_message = self.start_scraping(['waas'])
+
+        elif self.current_row == 6:      # 🕸 Scrape “Workday”
+            exit_message = self.start_scraping(['workday'])
+
+        elif self.current_row == 7:      # 🕸 Scrape all sources
+            exit_message = self.start_scraping()
+
+        elif self.current_row == 8:      # 👥 Profiles
+            ProfilesDisplay(self.stdscr, self.db_manager).draw_profiles()
+
+        elif self.current_row == 9:      # 📄 Resume
             exit_message = self.manage_resume(self.stdscr)
 
-        elif self.current_row == 7:      # 💾 Navigate DB
+        elif self.current_row == 10:     # 💾 Navigate DB
             draw_table(self.stdscr, self.db_path)
 
         # redraw status / menu after the action
@@ -346,7 +547,7 @@ class MenuApp:
 
     def manage_resume(self, stdscr):
         curses.echo()
-        resume_path = os.getenv('BASE_RESUME_PATH')
+        resume_path = self.resume_path
 
         resume_updated = False
         exit_message = 'Resume not updated'
@@ -362,10 +563,26 @@ class MenuApp:
 
         if resume_updated:
             exit_message = f"Resume saved to {self.resume_path}"
+            self.update_stale_listings_count()
+            if self.stale_listings_count > 0:
+                exit_message += f", {self.stale_listings_count} AI answers are now out of date (use ♻️  to re-evaluate)"
 
         return exit_message
 
     def update_status_bar(self, text):
+        """
+        Show {text} on the status bar, from any thread: the UI thread draws
+        it right away, other threads only post it for the next frame.
+        """
+        self.status_updates.post(text)
+        if threading.current_thread() is self.ui_thread:
+            self.draw_status_bar()
+
+    def draw_status_bar(self):
+        """Draw the newest status posted since the last frame, if any, from the UI thread only."""
+        text = self.status_updates.latest()
+        if text is None:
+            return
         max_y, max_x = self.stdscr.getmaxyx()
         # Ensure the status text will not overflow the screen width
         status_text = text[:max_x - 3]
@@ -379,47 +596,75 @@ class MenuApp:
         except curses.error:
             pass  # Ignore the error or handle it as needed
 
-    def start_scraping_with_status_updates(self):
-        # Create a queue to receive the result from the scraping thread
-        result_queue = Queue()
-        # Pass self.update_status_bar as the update function to HNScraper
-        self.scraper = HNScraper(self.db_path)  # Initialize the scraper
-        start_url = os.getenv('HN_START_URL')  # Starting URL
-        scraping_thread = threading.Thread(target=self.scraper.scrape_hn_jobs, args=(
-            start_url, self.stdscr, self.update_status_bar, self.scraping_done_event, result_queue))
-        scraping_thread.start()
-        # Call this method after the scraping is done
-        self.scraping_done_event.wait()  # Wait for the event to be set by the scraping thread
-        # Retrieve the result from the queue
-        new_listings_count = result_queue.get()  # This will block until the result is available
-        self.update_status_bar(f"Scraping completed {new_listings_count} new listings added")
-        self.scraping_done_event.clear()  # Clear the event for the next scraping operation
-
-
-
-    def start_scraping_WaaS_with_status_updates(self):
-        result_queue= Queue()
-        self.scraper = WorkStartupScraper(self.db_path)
-        scraping_thread = threading.Thread(target=self.scraper.scrape_jobs, args=(self.stdscr, self.update_status_bar, self.scraping_done_event, result_queue))
-        scraping_thread.start()
-        self.scraping_done_event.wait()
-        new_listings_count = result_queue.get()
-        self.update_status_bar(f"Scraping of Waas completed {new_listings_count} new listings added")
-        self.scraping_done_event.clear()
-        time.sleep(3)
-        self.stdscr.clear()
-
-    def start_scraping_workday_with_status_updates(self):
-        result_queue= Queue()
-        self.scraper = WorkdayScraper(self.db_path, self.update_status_bar, self.scraping_done_event, result_queue)
-        scraping_thread = threading.Thread(target=self.scraper.scrape)
-        scraping_thread.start()
-        self.scraping_done_event.wait()
-        new_listings_count = result_queue.get()
-        self.update_status_bar(f"Scraping of Workday completed: {new_listings_count} new listings added")
-        self.scraping_done_event.clear()
-        time.sleep(3)
+    def draw_scrape_stats(self, snapshot):
+        """The live stats panel of the background scrape, between the menu and the controls hint."""
+        h, w = self.stdscr.getmaxyx()
+        top = h // 2 - len(self.menu_items) // 2 + len(self.menu_items) + 1
+        lines = [" Scraping ".center(min(w - 1, 60), "─")] + format_metrics(snapshot)
+        # As many lines as there's room for, above the controls hint
+        lines = lines[:max(0, h - 3 - top)]
+        try:
+            for idx, line in enumerate(lines):
+                x = max(0, (w - 60) // 2)
+                self.stdscr.move(top + idx, 0)
+                self.stdscr.clrtoeol()
+                self.stdscr.addstr(top + idx, x, line[:w - x - 1])
+        except curses.error:
+            pass  # Screen too small for the panel
+
+    def start_scraping(self, source_names=None):
+        """
+        Scrape the given sources (all of them by default) at once in the
+        background, the menu keeps working and shows the scrape's live
+        stats until it's done, [x] stops it. The final stats are dumped to
+        COMMANDJOBS_SCRAPE_METRICS_FILE.
+        """
+        if self.scrape_job is not None and self.scrape_job.is_running():
+            return "A scrape is already running, [x] to stop it"
+        scheduler = ScrapeScheduler(self.db_path, source_names, update_func=self.post_scrape_status,
+                                    metrics_path=os.getenv('COMMANDJOBS_SCRAPE_METRICS_FILE') or 'scrape_metrics.json')
+
+        async def scrape(job):
+            return await asyncio.to_thread(scheduler.run)
+
+        self.scrape_scheduler = scheduler
+        self.scrape_job = BackgroundJob('scrape', scrape).start()
+        return "Scraping started in the background, [x] to stop it"
+
+    def stop_scraping(self):
+        """Ask the background scrape to stop, the listings parsed so far are still stored."""
+        if self.scrape_scheduler is not None:
+            self.scrape_scheduler.cancel()
+            self.update_status_bar("🛑 Stopping the scrape, storing what was parsed so far...")
+
+    def post_scrape_status(self, message):
+        """The scrape's progress, called from its threads."""
+        scheduler = self.scrape_scheduler
+        if self.ai_job is not None or scheduler is None:
+            return  # The AI processing has the status bar
+        state = "🛑 Stopping the scrape" if scheduler.cancel_token.is_cancelled() else "🕸  Scraping"
+        self.update_status_bar(f"{state} | {message}")
+
+    def poll_scrape_job(self):
+        """Show the live stats of the background scrape, and its summary once it's done."""
+        job, scheduler = self.scrape_job, self.scrape_scheduler
+        if job is None:
+            return
+        if job.is_running():
+            self.draw_scrape_stats(scheduler.metrics.snapshot())
+            return
+
+        self.scrape_job = self.scrape_scheduler = None
+        if job.error is not None:
+            exit_message = f'Scraping failed: {str(job.error)}'
+        else:
+            results = job.result
+            new_listings_count = sum(result['new'] for result in results.values())
+            state = 'stopped' if scheduler.cancel_token.is_cancelled() else 'completed'
+            exit_message = f"Scraping {state}, {new_listings_count} new listings added ({format_results(results)})"
         self.stdscr.clear()
+        self.update_menu_items()
+        self.update_status_bar(exit_message)
 
 
     # Despite the name of the method, this currently
@@ -485,9 +730,7 @@ class MenuApp:
 
         return input_lines
 
-# Ensure logging is configured to write to a file or standard output
-logging.basicConfig(filename='application.log', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(name)s %(message)s')
-logger = logging.getLogger(__name__)
+logger = logging.getLogger('menu')
 
 def main(stdscr):
     global logger
@@ -495,5 +738,9 @@ def main(stdscr):
     app.run()  # Ensuring app.run is called to start the application loop
 
 if __name__ == "__main__":
+    # Log records are queued and written to a rotating application.log
+    # by a background thread, see log_setup.py for the COMMANDJOBS_LOG_* options
+    load_dotenv()
+    setup_logging()
     curses.wrapper(main)
 
@@ -0,0 +1,49 @@
+# src/migrations/008_add_interaction_versions.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def column_exists(cur, table, column):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == column for r in cur.fetchall())
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # Hashes of the resume and of the prompt config (role, exclusions,
+        # prompt template, output format, model) that produced each answer.
+        # Existing rows are left NULL, which the app treats as "unknown version"
+        if not column_exists(cur, 'gpt_interactions', 'resume_hash'):
+            print("Adding resume_hash column…")
+            cur.execute("ALTER TABLE gpt_interactions ADD COLUMN resume_hash TEXT")
+
+        if not column_exists(cur, 'gpt_interactions', 'prompt_hash'):
+            print("Adding prompt_hash column…")
+            cur.execute("ALTER TABLE gpt_interactions ADD COLUMN prompt_hash TEXT")
+
+        if not column_exists(cur, 'gpt_interactions', 'created_at'):
+            print("Adding created_at column…")
+            cur.execute("ALTER TABLE gpt_interactions ADD COLUMN created_at TEXT")
+
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_gpt_interactions_job_id ON gpt_interactions (job_id)")
+
+        conn.commit()
+        print("✔️  Migration 008 complete: added resume/prompt versions to gpt_interactions")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 008 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
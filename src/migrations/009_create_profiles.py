@@ -0,0 +1,58 @@
+# src/migrations/009_create_profiles.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def column_exists(cur, table, column):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == column for r in cur.fetchall())
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # A profile is a resume + role + exclusions the listings are evaluated against.
+        # NULL values fall back to the env variables (BASE_RESUME_PATH,
+        # COMMANDJOBS_ROLE, ...), so the 'default' profile keeps working
+        # exactly like the single-user setup did
+        cur.execute('''
+          CREATE TABLE IF NOT EXISTS profiles (
+            id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+            name                TEXT    NOT NULL UNIQUE,
+            resume_path         TEXT,
+            roles               TEXT,
+            exclusions          TEXT,
+            ideal_job_questions TEXT,
+            is_active           INTEGER NOT NULL DEFAULT 0,
+            created_at          TEXT    NOT NULL DEFAULT (datetime('now'))
+          )
+        ''')
+        cur.execute("INSERT OR IGNORE INTO profiles (id, name, is_active) VALUES (1, 'default', 1)")
+
+        if not column_exists(cur, 'gpt_interactions', 'profile_id'):
+            print("Adding profile_id column…")
+            cur.execute("ALTER TABLE gpt_interactions ADD COLUMN profile_id INTEGER REFERENCES profiles(id)")
+            # Everything processed so far belongs to the default profile
+            cur.execute("UPDATE gpt_interactions SET profile_id = 1 WHERE profile_id IS NULL")
+
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_gpt_interactions_profile_job ON gpt_interactions (profile_id, job_id)")
+
+        conn.commit()
+        print("✔️  Migration 009 complete: added profiles")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 009 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
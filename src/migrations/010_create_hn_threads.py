@@ -0,0 +1,42 @@
+# src/migrations/010_create_hn_threads.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # What the last scrape of each "Who is hiring" thread saw, so
+        # re-scraping it only downloads and stores what's new:
+        #   seen_ids    JSON list of the top-level comment ids already stored
+        #   validators  JSON object of ETag/Last-Modified per page (or 'thread' for the item API)
+        cur.execute('''
+          CREATE TABLE IF NOT EXISTS hn_threads (
+            thread_id       TEXT PRIMARY KEY,
+            page_count      INTEGER NOT NULL DEFAULT 0,
+            seen_ids        TEXT    NOT NULL DEFAULT '[]',
+            validators      TEXT    NOT NULL DEFAULT '{}',
+            last_fetched_at TEXT
+          )
+        ''')
+
+        conn.commit()
+        print("✔️  Migration 010 complete: added hn_threads")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 010 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
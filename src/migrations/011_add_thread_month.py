@@ -0,0 +1,40 @@
+# src/migrations/011_add_thread_month.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def column_exists(cur, table, column):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == column for r in cur.fetchall())
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # Month of the "Who is hiring" thread a listing comes from, eg. '2025-09',
+        # so listings from older threads can be filtered or archived
+        if not column_exists(cur, 'job_listings', 'thread_month'):
+            print("Adding thread_month column…")
+            cur.execute("ALTER TABLE job_listings ADD COLUMN thread_month TEXT")
+
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_job_listings_thread_month ON job_listings (thread_month)")
+
+        conn.commit()
+        print("✔️  Migration 011 complete: added job_listings.thread_month")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 011 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
@@ -0,0 +1,40 @@
+# src/migrations/012_create_page_hashes.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # Hash of the content of pages listing jobs (eg. a WAAS company page)
+        # as of the last scrape that went through all their jobs, so
+        # unchanged pages can be skipped entirely
+        cur.execute('''
+          CREATE TABLE IF NOT EXISTS page_hashes (
+            url          TEXT PRIMARY KEY,
+            source       TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            checked_at   TEXT
+          )
+        ''')
+
+        conn.commit()
+        print("✔️  Migration 012 complete: added page_hashes")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 012 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
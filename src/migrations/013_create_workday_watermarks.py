@@ -0,0 +1,40 @@
+# src/migrations/013_create_workday_watermarks.py
+
+import sqlite3
+import sys
+import os
+
+DB_PATH = 'job_listings.db'
+
+def main(db_path):
+    if not os.path.exists(db_path):
+        print(f"Error: database file not found at {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+
+        # Newest posting date each Workday company had at the last scrape, and
+        # the ids of the jobs posted that day (JSON list), so the next scrape
+        # stops at the first older posting and skips the ones already seen
+        cur.execute('''
+          CREATE TABLE IF NOT EXISTS workday_watermarks (
+            company          TEXT PRIMARY KEY,
+            newest_posted_on TEXT NOT NULL,
+            seen_ids         TEXT NOT NULL DEFAULT '[]',
+            updated_at       TEXT
+          )
+        ''')
+
+        conn.commit()
+        print("✔️  Migration 013 complete: added workday_watermarks")
+    except Exception as e:
+        conn.rollback()
+        print("❌ Migration 013 failed:", e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main(DB_PATH)
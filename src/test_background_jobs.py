@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from background_jobs import BackgroundJob, StatusUpdates
+
+
+async def count_to_ten(job):
+    job.set_total(10)
+    for i in range(10):
+        await job.checkpoint()
+        await asyncio.sleep(0.01)
+        job.advance()
+    return 'done'
+
+
+class TestBackgroundJob(unittest.TestCase):
+    def test_runs_to_completion(self):
+        job = BackgroundJob('count', count_to_ten).start()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.result, 'done')
+        self.assertEqual(job.snapshot()[:2], (10, 10))
+        self.assertFalse(job.is_running())
+
+    def test_pause_and_cancel(self):
+        job = BackgroundJob('count', count_to_ten)
+        job.pause()
+        job.start()
+        self.assertFalse(job.wait(0.3))
+        self.assertEqual(job.snapshot()[0], 0)
+
+        job.cancel()
+        self.assertTrue(job.wait(5))
+        self.assertTrue(job.is_cancelled())
+        self.assertIsNone(job.result)
+        self.assertIsNone(job.error)
+
+    def test_error_is_kept(self):
+        async def fail(job):
+            raise ValueError('boom')
+
+        job = BackgroundJob('fail', fail).start()
+        job.wait(5)
+        self.assertIsInstance(job.error, ValueError)
+
+
+class TestStatusUpdates(unittest.TestCase):
+    def test_keeps_the_newest_message(self):
+        updates = StatusUpdates()
+        self.assertIsNone(updates.latest())
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(updates.post, [f'page {i}' for i in range(100)]))
+        updates.post('done')
+        self.assertEqual(updates.latest(), 'done')
+        # Drawn once, not again at the next frame
+        self.assertIsNone(updates.latest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from dotenv import dotenv_values
+from database_manager import DatabaseManager
+from fake_llm_server import FakeLLMServer
+from job_scraper.sources import SOURCES, ScraperSource, register_source
+import cli
+
+SAMPLE_ENV = {key: value for key, value in dotenv_values('config/sample.env').items() if value is not None}
+
+
+class FakeSource(ScraperSource):
+    name = 'fake'
+
+    def iter_batches(self):
+        yield [{'original_text': f'Listing {i}', 'original_html': f'<p>Listing {i}</p>', 'source': 'Fake',
+                'external_id': f'fake-{i}'} for i in range(5)]
+
+
+class TestCli(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer().start_in_thread()
+        register_source(FakeSource)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        del SOURCES['fake']
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'test_db.db')
+        DatabaseManager(self.db_path).close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("ALTER TABLE job_listings ADD COLUMN scraped_at TEXT")
+        conn.execute("ALTER TABLE job_listings ADD COLUMN thread_month TEXT")
+        conn.close()
+        resume_path = os.path.join(self.tmp_dir.name, 'resume.txt')
+        with open(resume_path, 'w') as file:
+            file.write('Python and Rails engineer')
+        self.env = patch.dict(os.environ, {**SAMPLE_ENV, 'OPENAI_BASE_URL': self.server.base_url,
+                                           'BASE_RESUME_PATH': resume_path, 'COMMANDJOBS_LISTINGS_PER_BATCH': '2'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = cli.main([*argv, '--db', self.db_path, '--quiet'])
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_run_scrapes_and_processes_in_batches(self):
+        exit_code, (stats,) = self.run_cli('run', '--scrape', 'fake', '--process', '--max-listings', '3')
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stats['new_listings'], 5)
+        self.assertEqual(stats['scrape']['fake']['new'], 5)
+        self.assertEqual(stats['process']['processed'], 3)
+
+        # The rest of the backlog, 2 listings per batch, stopping when none are left
+        exit_code, (stats,) = self.run_cli('run', '--process')
+        self.assertEqual(stats['process']['processed'], 2)
+
+    def test_daemon_runs_until_the_limit(self):
+        exit_code, runs = self.run_cli('daemon', '--scrape', 'fake', '--interval', '0', '--runs', '2')
+        self.assertEqual(exit_code, 0)
+        self.assertEqual([stats['new_listings'] for stats in runs], [5, 0])
+
+    def test_failed_source_sets_exit_code(self):
+        with patch.dict(os.environ, {'HN_START_URL': ''}):
+            exit_code, (stats,) = self.run_cli('run', '--scrape', 'hn')
+        self.assertEqual(exit_code, 1)
+        self.assertIn('HN_START_URL', stats['scrape']['hn']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
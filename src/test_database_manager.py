@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from database_manager import DatabaseManager, DEFAULT_PROFILE_ID
+
+
+class TestStaleInteractions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir.name, 'test_db.db'))
+        # Columns normally added by the migrations
+        for column in ('discarded INTEGER DEFAULT 0', 'applied INTEGER DEFAULT 0', 'scraped_at TEXT'):
+            self.db.cursor.execute(f"ALTER TABLE job_listings ADD COLUMN {column}")
+
+        old = (datetime.now() - timedelta(days=30)).isoformat()
+        new = datetime.now().isoformat()
+        listings = [(1, old), (2, new), (3, new)]
+        for job_id, scraped_at in listings:
+            self.db.cursor.execute(
+                "INSERT INTO job_listings (id, original_text, original_html, source, external_id, scraped_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, f'text {job_id}', f'<p>html {job_id}</p>', 'test', f'ext-{job_id}', scraped_at))
+
+        self.db.save_gpt_interaction(1, 'prompt', '{"fit_for_resume": "Yes"}', 'old-resume', 'prompt-v1')
+        self.db.save_gpt_interaction(2, 'prompt', '{"fit_for_resume": "No"}', 'old-resume', 'prompt-v1')
+        self.db.save_gpt_interaction(3, 'prompt', '{"fit_for_resume": "Yes"}', 'new-resume', 'prompt-v1')
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_stale_count_uses_both_hashes(self):
+        self.assertEqual(self.db.fetch_stale_interactions_count('new-resume', 'prompt-v1'), 2)
+        self.assertEqual(self.db.fetch_stale_interactions_count('new-resume', 'prompt-v2'), 3)
+
+    def test_stale_listings_modes(self):
+        def ids(mode):
+            return sorted(row[0] for row in self.db.fetch_stale_job_listings('new-resume', 'prompt-v1', mode=mode))
+
+        self.assertEqual(ids('all'), [1, 2])
+        self.assertEqual(ids('recent'), [2])
+        self.assertEqual(ids('matches'), [1])
+
+    def test_saving_replaces_previous_answer(self):
+        self.db.save_gpt_interaction(1, 'prompt', '{"fit_for_resume": "No"}', 'new-resume', 'prompt-v1')
+        self.db.cursor.execute("SELECT COUNT(*), MAX(resume_hash) FROM gpt_interactions WHERE job_id = 1")
+        self.assertEqual(self.db.cursor.fetchone(), (1, 'new-resume'))
+
+
+class TestProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir.name, 'test_db.db'))
+        for job_id in (1, 2, 3):
+            self.db.cursor.execute(
+                "INSERT INTO job_listings (id, original_text, original_html, source, external_id) VALUES (?, ?, ?, ?, ?)",
+                (job_id, f'text {job_id}', f'<p>html {job_id}</p>', 'test', f'ext-{job_id}'))
+        self.other_id = self.db.create_profile('other', 'base_resume_other.txt', roles='data engineer')
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_default_profile_is_active(self):
+        self.assertEqual(self.db.fetch_active_profile()['id'], DEFAULT_PROFILE_ID)
+        self.db.set_active_profile(self.other_id)
+        self.assertEqual(self.db.fetch_active_profile()['name'], 'other')
+
+    def test_listings_are_shared_between_profiles(self):
+        self.db.save_gpt_interaction(1, 'prompt', '{}', profile_id=DEFAULT_PROFILE_ID)
+        self.db.save_gpt_interaction(2, 'prompt', '{}', profile_id=DEFAULT_PROFILE_ID)
+        self.db.save_gpt_interaction(2, 'prompt', '{}', profile_id=self.other_id)
+
+        self.assertEqual([row[0] for row in self.db.fetch_job_listings(10, DEFAULT_PROFILE_ID)], [3])
+        self.assertEqual([row[0] for row in self.db.fetch_job_listings(10, self.other_id)], [1, 3])
+
+        missing = self.db.fetch_job_listings_for_profiles(10, [DEFAULT_PROFILE_ID, self.other_id])
+        self.assertEqual([(row[0], sorted(row[3])) for row in missing],
+                         [(1, [self.other_id]), (3, [DEFAULT_PROFILE_ID, self.other_id])])
+
+    def test_deleting_profile_removes_its_answers(self):
+        self.db.set_active_profile(self.other_id)
+        self.db.save_gpt_interaction(1, 'prompt', '{}', profile_id=self.other_id)
+        self.assertTrue(self.db.delete_profile(self.other_id))
+        self.assertFalse(self.db.delete_profile(DEFAULT_PROFILE_ID))
+        self.assertEqual(self.db.fetch_processed_listings_count(self.other_id), 0)
+        self.assertEqual(self.db.fetch_active_profile()['id'], DEFAULT_PROFILE_ID)
+
+
+if __name__ == '__main__':
+    unittest.main()
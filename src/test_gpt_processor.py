@@ -0,0 +1,111 @@
+import asyncio
+import gc
+import json
+import os
+import tempfile
+import unittest
+import warnings
+from unittest.mock import patch
+from dotenv import dotenv_values
+from database_manager import DatabaseManager
+from fake_llm_server import FakeLLMServer, fake_answer
+from gpt_processor import GPTProcessor
+from llm_backends import OpenAICompatibleBackend, create_backend_from_env
+
+# Use the prompts from config/sample.env
+SAMPLE_ENV = {key: value for key, value in dotenv_values('config/sample.env').items() if value is not None}
+
+
+class TestGPTProcessorWithFakeServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer().start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, SAMPLE_ENV)
+        self.env.start()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir.name, 'test_db.db'))
+        for job_id in range(1, 6):
+            self.db.cursor.execute(
+                "INSERT INTO job_listings (id, original_text, original_html, source, external_id) VALUES (?, ?, ?, ?, ?)",
+                (job_id, f'Listing {job_id}', f'<p>Listing   {job_id}\n  Remote, Python</p>', 'test', f'ext-{job_id}'))
+        self.db.conn.commit()
+        self.resume_path = os.path.join(self.tmp_dir.name, 'resume.txt')
+        with open(self.resume_path, 'w') as file:
+            file.write('Python and Rails engineer')
+
+        backend = OpenAICompatibleBackend('test_key', 'fake-model', base_url=self.server.base_url,
+                                          request_params={'temperature': 0}, max_concurrency=2)
+        self.processor = GPTProcessor(self.db, 'test_key', backend=backend)
+
+    def tearDown(self):
+        self.db.close()
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def test_processes_listings_with_local_server(self):
+        messages = []
+        asyncio.run(self.processor.process_job_listings_with_gpt(self.resume_path, messages.append))
+
+        self.db.cursor.execute("SELECT job_id, prompt, answer FROM gpt_interactions ORDER BY job_id")
+        rows = self.db.cursor.fetchall()
+        self.assertEqual([row[0] for row in rows], [1, 2, 3, 4, 5])
+        for job_id, prompt, answer in rows:
+            # The listing html is normalized before being sent
+            self.assertIn(f'<p>Listing {job_id} Remote, Python</p>', prompt)
+            self.assertEqual(answer, fake_answer(prompt))
+            self.assertIn('company_name', json.loads(answer))
+        self.assertTrue(any(message.startswith('Processed Company') for message in messages))
+
+    def test_profiles_without_a_resume_file_are_skipped(self):
+        self.db.create_profile('Data', os.path.join(self.tmp_dir.name, 'base_resume_data.txt'))
+        messages = []
+        with patch.dict(os.environ, {'BASE_RESUME_PATH': self.resume_path}):
+            processed = asyncio.run(self.processor.process_job_listings_for_all_profiles(messages.append))
+
+        self.assertEqual(processed, 5)
+        self.db.cursor.execute("SELECT DISTINCT profile_id FROM gpt_interactions")
+        self.assertEqual(self.db.cursor.fetchall(), [(1,)])
+        self.assertIn("Skipping profiles without a resume file: Data", messages)
+
+    def test_a_failing_first_profile_stops_the_listing(self):
+        self.db.create_profile('Data', self.resume_path)
+        prompts = []
+
+        async def get_gpt_response(prompt):
+            prompts.append(prompt)
+            raise RuntimeError("API error")
+
+        with patch.dict(os.environ, {'BASE_RESUME_PATH': self.resume_path}), \
+                patch.object(self.processor, 'get_gpt_response', get_gpt_response), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            with self.assertRaises(RuntimeError):
+                asyncio.run(self.processor.process_job_listings_for_all_profiles(lambda message: None))
+            gc.collect()
+
+        # The other profile's requests were never created, so none was left unawaited
+        self.assertEqual(len(prompts), 5)
+        self.assertFalse([warning for warning in caught if 'never awaited' in str(warning.message)])
+
+    def test_backend_from_env(self):
+        with patch.dict(os.environ, {'OPENAI_BASE_URL': self.server.base_url,
+                                     'COMMANDJOBS_LLM_PARAMS': '{"temperature": 0, "max_tokens": 500}',
+                                     'COMMANDJOBS_LLM_CONCURRENCY': '4'}):
+            backend = create_backend_from_env('test_key')
+        self.assertEqual(backend.request_params, {'temperature': 0, 'max_tokens': 500})
+        self.assertEqual(asyncio.run(backend.complete('same prompt')), fake_answer('same prompt'))
+
+        with patch.dict(os.environ, {'COMMANDJOBS_LLM_PARAMS': '[1, 2]'}):
+            with self.assertRaises(ValueError):
+                create_backend_from_env('test_key')
+
+
+if __name__ == '__main__':
+    unittest.main()
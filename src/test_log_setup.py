@@ -0,0 +1,50 @@
+import logging
+import os
+import tempfile
+import unittest
+from log_setup import TRACE, parse_component_levels, setup_logging, stop_logging
+
+
+class TestLogSetup(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp_dir.name, 'application.log')
+
+    def tearDown(self):
+        stop_logging()
+        for name in ('gpt_processor', 'display_matching_table'):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        self.tmp_dir.cleanup()
+
+    def read_log(self):
+        with open(self.log_file) as file:
+            return file.read()
+
+    def test_component_levels(self):
+        setup_logging(self.log_file, level=logging.INFO,
+                      component_levels=parse_component_levels('gpt_processor=TRACE, display_matching_table=WARNING'))
+        logging.getLogger('gpt_processor').log(TRACE, 'the prompt body')
+        logging.getLogger('display_matching_table').info('page drawn')
+        logging.getLogger('menu').debug('debug message')
+        logging.getLogger('menu').info('info message')
+        stop_logging()  # flushes the queue
+
+        log = self.read_log()
+        self.assertIn('TRACE gpt_processor the prompt body', log)
+        self.assertNotIn('page drawn', log)
+        self.assertNotIn('debug message', log)
+        self.assertIn('INFO menu info message', log)
+
+    def test_size_based_rotation(self):
+        setup_logging(self.log_file, level=logging.INFO, component_levels={}, max_bytes=2000, backup_count=2)
+        for i in range(200):
+            logging.getLogger('menu').info('message %d', i)
+        stop_logging()
+
+        self.assertTrue(os.path.exists(self.log_file + '.1'))
+        self.assertFalse(os.path.exists(self.log_file + '.3'))
+        self.assertLessEqual(os.path.getsize(self.log_file), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """An empty database with the tables the scrapers write to, as left by the migrations."""
+    path = str(tmp_path / 'test.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE job_listings (id INTEGER PRIMARY KEY, original_text TEXT, original_html TEXT,
+                    source TEXT, external_id TEXT UNIQUE, scraped_at TEXT, thread_month TEXT)''')
+    conn.execute('''CREATE TABLE hn_threads (thread_id TEXT PRIMARY KEY, page_count INTEGER NOT NULL DEFAULT 0,
+                    seen_ids TEXT NOT NULL DEFAULT '[]', validators TEXT NOT NULL DEFAULT '{}', last_fetched_at TEXT)''')
+    conn.execute('''CREATE TABLE page_hashes (url TEXT PRIMARY KEY, source TEXT NOT NULL, content_hash TEXT NOT NULL,
+                    checked_at TEXT)''')
+    conn.execute('''CREATE TABLE workday_watermarks (company TEXT PRIMARY KEY, newest_posted_on TEXT NOT NULL,
+                    seen_ids TEXT NOT NULL DEFAULT '[]', updated_at TEXT)''')
+    conn.close()
+    return path
@@ -0,0 +1,66 @@
+"""
+A local stand-in for the sites the scrapers talk to: serves canned
+responses by path and query, so scrapers can be tested offline.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.request_body = self.rfile.read(length)
+        self.do_GET()
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            response = self.server.responses.get(self.path, (404, 'Not found', {}))
+            if isinstance(response, list):
+                # Answered in turn, the last one from then on
+                response = response.pop(0) if len(response) > 1 else response[0]
+        status, body, headers = response
+        if status == 200 and headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+            status, body = 304, b''
+        if callable(body):
+            body = body(self)
+        payload = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    responses maps a path with its query, eg. "/item?id=1&p=2", to (status,
+    body, headers), or to a list of them answered in turn. body can be a
+    function of the request handler, which has the POSTed data in request_body.
+    """
+    daemon_threads = True
+
+    def __init__(self, responses=None):
+        super().__init__(('127.0.0.1', 0), StubRequestHandler)
+        self.responses = responses or {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from job_scraper.workday.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeBrowserPool(BrowserPool):
+    """Hands out FakeDrivers instead of starting Chrome."""
+    def create_driver(self):
+        return FakeDriver()
+
+
+def test_drivers_are_bounded_and_reused():
+    pool = FakeBrowserPool(size=2)
+    in_use, peak, lock = set(), [0], threading.Lock()
+
+    def scrape_company(_):
+        with pool.driver() as driver:
+            with lock:
+                in_use.add(driver)
+                peak[0] = max(peak[0], len(in_use))
+            time.sleep(0.02)
+            with lock:
+                in_use.discard(driver)
+            return driver
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        drivers = set(executor.map(scrape_company, range(12)))
+
+    assert pool.created == 2
+    assert len(drivers) == 2
+    assert peak[0] == 2
+
+
+def test_broken_drivers_are_replaced_and_close_quits_all():
+    pool = FakeBrowserPool(size=1)
+    with pytest.raises(WebDriverException):
+        with pool.driver() as broken:
+            raise WebDriverException("chrome not reachable")
+    assert broken.quit_called
+
+    with pool.driver() as driver:
+        assert driver is not broken
+    pool.close()
+    assert driver.quit_called
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            pass
+
+
+def test_page_timeouts_keep_the_driver():
+    pool = FakeBrowserPool(size=1)
+    with pytest.raises(TimeoutException):
+        with pool.driver() as slow:
+            raise TimeoutException("Job Listing Element not found")
+    assert not slow.quit_called
+
+    with pool.driver() as driver:
+        assert driver is slow
+    assert pool.created == 1
+
+
+def test_a_waiting_borrower_gets_a_new_driver_when_one_is_discarded():
+    pool = FakeBrowserPool(size=1)
+    replacement = []
+
+    def borrow():
+        with pool.driver() as driver:
+            replacement.append(driver)
+
+    with pytest.raises(WebDriverException):
+        with pool.driver() as crashed:
+            # Daemon, so a borrower left waiting doesn't hang the test run
+            waiter = threading.Thread(target=borrow, daemon=True)
+            waiter.start()
+            time.sleep(0.05)  # blocked on the pool by now
+            raise WebDriverException("chrome not reachable")
+    waiter.join(timeout=5)
+
+    assert crashed.quit_called
+    assert len(replacement) == 1 and replacement[0] is not crashed
+    assert pool.created == 1
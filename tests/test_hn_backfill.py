@@ -0,0 +1,55 @@
+import json
+import sqlite3
+
+import pytest
+
+from job_scraper.hacker_news.backfill import HNBackfill
+from tests.stub_server import StubServer
+
+# Submissions of the whoishiring user, newest first, as the item API returns them
+THREADS = {
+    302: ('Ask HN: Who wants to be hired? (September 2025)', [3021]),
+    301: ('Ask HN: Freelancer? Seeking Freelancer? (September 2025)', [3011]),
+    300: ('Ask HN: Who is hiring? (September 2025)', [3001, 3002]),
+    200: ('Ask HN: Who is hiring? (August 2025)', [2001]),
+    100: ('Ask HN: Who is hiring? (July 2025)', [1001, 1002]),
+}
+
+
+@pytest.fixture
+def hn_api_server():
+    responses = {'/v0/user/whoishiring.json': (200, json.dumps({'id': 'whoishiring', 'submitted': list(THREADS)}), {})}
+    for thread_id, (title, kids) in THREADS.items():
+        responses[f'/v0/item/{thread_id}.json'] = (200, json.dumps(
+            {'id': thread_id, 'by': 'whoishiring', 'type': 'story', 'title': title, 'kids': kids}), {})
+        for kid in kids:
+            responses[f'/v0/item/{kid}.json'] = (200, json.dumps(
+                {'id': kid, 'parent': thread_id, 'type': 'comment', 'text': f'Company {kid} | Engineer'}), {})
+    with StubServer(responses) as server:
+        yield server
+
+
+def test_discovers_hiring_threads(hn_api_server):
+    backfill = HNBackfill(api_url=f'{hn_api_server.base_url}/v0')
+    assert backfill.discover_threads(months=2) == [(300, '2025-09'), (200, '2025-08')]
+    assert backfill.discover_threads(since='2025-08') == [(300, '2025-09'), (200, '2025-08')]
+
+
+def test_backfill_stores_thread_month(db_path, hn_api_server):
+    backfill = HNBackfill(db_path, api_url=f'{hn_api_server.base_url}/v0', max_threads=2, max_concurrency=4)
+    assert backfill.backfill(months=3) == {'2025-09': 2, '2025-08': 1, '2025-07': 2}
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT thread_month, COUNT(*) FROM job_listings GROUP BY thread_month ORDER BY thread_month').fetchall()
+    conn.close()
+    assert rows == [('2025-07', 2), ('2025-08', 1), ('2025-09', 2)]
+    # Listings of the other whoishiring threads are left alone
+    assert '/v0/item/3021.json' not in hn_api_server.requests
+
+
+def test_backfill_runs_again(db_path, hn_api_server):
+    backfill = HNBackfill(db_path, api_url=f'{hn_api_server.base_url}/v0', max_threads=2, max_concurrency=4,
+                          parse_workers=1)
+    assert backfill.backfill(months=2) == {'2025-09': 2, '2025-08': 1}
+    # The listings are known by then, but the threads are crawled again
+    assert backfill.backfill(months=3) == {'2025-09': 0, '2025-08': 0, '2025-07': 2}
@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from job_scraper.hacker_news.scraper import HNScraper, lxml_html, thread_month_from_title
+from job_scraper.scheduler import ScrapeScheduler
+from tests.stub_server import StubServer
+
+HN_API_FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'hn_api')
+
+
+def comment_row(comment_id, text, indent=0):
+    return f'''
+    <tr class="athing comtr" id="{comment_id}"><td><table><tr>
+      <td class="ind" indent="{indent}"><img src="s.gif" height="1" width="{indent * 40}"></td>
+      <td class="default"><div class="comment"><div class="commtext c00">{text}</div></div></td>
+    </tr></table></td></tr>'''
+
+
+def thread_page(page, comments, has_more):
+    rows = ''.join(comment_row(*comment) for comment in comments)
+    more = f'<a href="item?id=100&amp;p={page + 1}" class="morelink" rel="next">More</a>' if has_more else ''
+    return f'<html><body><table class="comment-tree">{rows}</table>{more}</body></html>'
+
+
+@pytest.fixture(params=['html.parser', pytest.param('lxml', marks=pytest.mark.skipif(lxml_html is None, reason="lxml not installed"))])
+def parser(request):
+    return request.param
+
+
+@pytest.fixture
+def hn_server():
+    pages = {
+        1: thread_page(1, [(1, 'Acme | Python'), (2, 'a reply', 1), (3, 'Initech | Rust')], True),
+        2: thread_page(2, [(4, 'Hooli | Go'), (5, 'Globex | Ruby')], True),
+        3: thread_page(3, [(6, 'Umbrella | Java')], False),
+    }
+    responses = {f'/item?id=100&p={page}': (200, html, {'Content-Type': 'text/html', 'ETag': f'"page-{page}"'})
+                 for page, html in pages.items()}
+    # Past the last page HN shows the thread again, the scraper should never parse it
+    responses.update({f'/item?id=100&p={page}': (200, pages[1], {}) for page in (4, 5, 6)})
+    with StubServer(responses) as server:
+        yield server
+
+
+def test_thread_month_from_title():
+    assert thread_month_from_title('Ask HN: Who is hiring? (September 2025)') == '2025-09'
+    assert thread_month_from_title('Ask HN: Who wants to be hired? (September 2025)') is None
+
+
+def test_page_url_replaces_page_number():
+    assert HNScraper.page_url('https://news.ycombinator.com/item?id=100&p=1', 3) == 'https://news.ycombinator.com/item?id=100&p=3'
+    assert HNScraper.page_url('https://news.ycombinator.com/item?id=100', 2) == 'https://news.ycombinator.com/item?id=100&p=2'
+
+
+def scrape(db_path, start_url, update_func=None, **options):
+    scheduler = ScrapeScheduler(db_path, ['hn'], update_func=update_func)
+    return scheduler.run_source('hn', start_url=start_url, **options)
+
+
+def thread_state(db_path, start_url):
+    scraper = HNScraper(db_path)
+    return scraper.load_thread_state(scraper.thread_id(start_url))
+
+
+def test_scrapes_pages_concurrently_in_order(db_path, hn_server, parser):
+    result = scrape(db_path, f'{hn_server.base_url}/item?id=100&p=1', window=3, parser=parser)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT original_text, external_id FROM job_listings ORDER BY id').fetchall()
+    conn.close()
+    assert [text.strip() for text, _ in rows] == ['Acme | Python', 'Initech | Rust', 'Hooli | Go', 'Globex | Ruby', 'Umbrella | Java']
+    assert rows[0][1] == 'https://news.ycombinator.com/item?id=1'
+    assert result['new'] == 5
+    # Pages past the last one may have been requested, but no more than the window ahead
+    assert max(int(path.rsplit('=', 1)[1]) for path in hn_server.requests) <= 5
+
+
+
+@pytest.fixture
+def hn_api_server():
+    # Replays item JSON recorded from https://hacker-news.firebaseio.com/v0/item/<id>.json
+    responses = {}
+    for file_name in os.listdir(HN_API_FIXTURES):
+        with open(os.path.join(HN_API_FIXTURES, file_name), encoding='utf-8') as f:
+            responses[f'/v0/item/{file_name}'] = (200, f.read(), {'Content-Type': 'application/json'})
+    with StubServer(responses) as server:
+        yield server
+
+
+def test_api_backend_ingests_top_level_comments(db_path, hn_api_server):
+    scrape(db_path, 'https://news.ycombinator.com/item?id=100', backend='api', api_url=f'{hn_api_server.base_url}/v0',
+           api_concurrency=4)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT original_text, external_id FROM job_listings ORDER BY id').fetchall()
+    conn.close()
+    # Thread order is kept, replies, deleted and dead comments are skipped
+    assert [external_id for _, external_id in rows] == [
+        'https://news.ycombinator.com/item?id=1',
+        'https://news.ycombinator.com/item?id=3',
+        'https://news.ycombinator.com/item?id=4',
+    ]
+    # Same text as the HTML path: paragraphs are joined and entities decoded
+    assert rows[2][0].strip() == 'Hooli | Go Engineer | REMOTEKubernetes & Postgres'
+    assert '/v0/item/2.json' not in hn_api_server.requests
+
+
+@pytest.mark.parametrize('item_id', [1, 3, 4])
+def test_api_listing_matches_html_listing(item_id, parser):
+    with open(os.path.join(HN_API_FIXTURES, f'{item_id}.json'), encoding='utf-8') as f:
+        item = json.load(f)
+    from_api = HNScraper.listing_from_item(item)
+    from_html, _ = HNScraper(window=1, parser=parser).parse_page(thread_page(1, [(item_id, item['text'])], False))
+    assert from_api == from_html[0]
+
+
+def test_rescrape_revalidates_unchanged_pages(db_path, hn_server):
+    start_url = f'{hn_server.base_url}/item?id=100&p=1'
+    scrape(db_path, start_url)
+    hn_server.responses['/item?id=100&p=2'] = (200, thread_page(2, [(4, 'Hooli | Go'), (5, 'Globex | Ruby'), (9, 'Vandelay | Python')], True),
+                                               {'ETag': '"page-2-v2"'})
+
+    assert scrape(db_path, start_url)['new'] == 1
+    state = thread_state(db_path, start_url)
+    assert state['page_count'] == 3
+    assert state['seen_ids'] == {'1', '3', '4', '5', '6', '9'}
+
+
+def test_rescrape_after_an_interrupted_scrape(db_path, hn_server):
+    start_url = f'{hn_server.base_url}/item?id=100&p=1'
+
+    def interrupt_after_page_1(message):
+        if message.startswith('[hn] Page 1:'):
+            scheduler.cancel()
+
+    scheduler = ScrapeScheduler(db_path, ['hn'], update_func=interrupt_after_page_1)
+    result = scheduler.run_source('hn', start_url=start_url, window=1)
+    assert (result['new'], result['cancelled']) == (2, True)
+    assert thread_state(db_path, start_url)['page_count'] == 0
+
+    # Page 1 is unchanged (304), the pages the interrupted scrape didn't reach are still fetched
+    hn_server.requests.clear()
+    assert scrape(db_path, start_url, window=1)['new'] == 3
+    assert thread_state(db_path, start_url)['page_count'] == 3
+    assert hn_server.requests[:3] == ['/item?id=100&p=1', '/item?id=100&p=2', '/item?id=100&p=3']
+
+
+def test_known_comments_are_skipped_before_parsing(db_path, parser):
+    scraper = HNScraper(db_path, window=1, parser=parser)
+    listings, _ = scraper.parse_page(thread_page(1, [(1, 'Acme'), (3, 'Initech')], False), known_ids={'1'})
+    assert [listing['external_id'] for listing in listings] == ['https://news.ycombinator.com/item?id=3']
+
+
+def test_api_rescrape_only_fetches_new_comments(db_path, hn_api_server):
+    api_url = f'{hn_api_server.base_url}/v0'
+    scrape(db_path, 'https://news.ycombinator.com/item?id=100', backend='api', api_url=api_url)
+    hn_api_server.requests.clear()
+
+    thread = json.loads(hn_api_server.responses['/v0/item/100.json'][1])
+    thread['kids'].append(5)
+    hn_api_server.responses['/v0/item/100.json'] = (200, json.dumps(thread), {})
+    hn_api_server.responses['/v0/item/5.json'] = (200, json.dumps(
+        {"by": "globex", "id": 5, "parent": 100, "text": "Globex | Ruby", "time": 1756735800, "type": "comment"}), {})
+
+    assert scrape(db_path, 'https://news.ycombinator.com/item?id=100', backend='api', api_url=api_url)['new'] == 1
+    # Deleted and dead comments are never stored, so they're requested again
+    assert sorted(hn_api_server.requests) == ['/v0/item/100.json', '/v0/item/5.json', '/v0/item/7.json', '/v0/item/8.json']
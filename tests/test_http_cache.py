@@ -0,0 +1,62 @@
+import pytest
+
+from job_scraper.http_cache import CacheMiss, HttpCache
+from job_scraper.http_client import create_session
+from job_scraper.workday.api_client import WorkdayApiClient
+from tests.stub_server import StubServer
+from tests.test_workday_api import workday_server  # noqa: F401, the fixture
+
+
+@pytest.fixture
+def server():
+    with StubServer({'/page': (200, 'hello', {'ETag': '"v1"'}),
+                     '/search': (200, lambda handler: handler.request_body, {})}) as server:
+        yield server
+
+
+def test_reuses_fresh_responses(tmp_path, server):
+    session = create_session(cache=HttpCache(str(tmp_path)))
+    assert session.get(f'{server.base_url}/page').text == 'hello'
+    response = session.get(f'{server.base_url}/page')
+    assert (response.status_code, response.text, response.from_cache) == (200, 'hello', True)
+    # POSTs with a different body are different entries
+    assert session.post(f'{server.base_url}/search', data='a').text == 'a'
+    assert session.post(f'{server.base_url}/search', data='b').text == 'b'
+    assert server.requests == ['/page', '/search', '/search']
+
+
+def test_rate_limited_answers_are_not_cached(tmp_path, server):
+    server.responses['/busy'] = [(429, 'slow down', {'Retry-After': '0'}), (200, 'ok', {})]
+    session = create_session(cache=HttpCache(str(tmp_path)))
+    # The retry reaches the site instead of getting the 429 back from the cache
+    assert session.get(f'{server.base_url}/busy').text == 'ok'
+    response = session.get(f'{server.base_url}/busy')
+    assert (response.status_code, response.text, response.from_cache) == (200, 'ok', True)
+    assert server.requests == ['/busy', '/busy']
+
+
+def test_revalidates_stale_responses(tmp_path, server):
+    session = create_session(cache=HttpCache(str(tmp_path), ttl=0))
+    session.get(f'{server.base_url}/page')
+    response = session.get(f'{server.base_url}/page')
+    # The site answered 304, the stored copy is returned
+    assert (response.status_code, response.text) == (200, 'hello')
+    assert len(server.requests) == 2
+    # The scrapers' own conditional requests still get their 304
+    assert session.get(f'{server.base_url}/page', headers={'If-None-Match': '"v1"'}).status_code == 304
+
+
+def test_replays_a_recorded_crawl_offline(tmp_path, workday_server):
+    company_url = f'http://localhost:{workday_server.server_address[1]}/External'
+
+    def is_recent(posting):
+        return '30+' not in posting['postedOn']
+
+    recorded = WorkdayApiClient(create_session(cache=HttpCache(str(tmp_path), 'record'))).fetch_listings(company_url, is_recent)
+    workday_server.shutdown()
+    workday_server.server_close()
+
+    replay_session = create_session(cache=HttpCache(str(tmp_path), 'replay'))
+    assert WorkdayApiClient(replay_session).fetch_listings(company_url, is_recent) == recorded
+    with pytest.raises(CacheMiss):
+        replay_session.get(f'{company_url}/not-recorded')
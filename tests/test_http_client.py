@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from job_scraper.http_client import HostLimiter, backoff_delay, create_session, parse_retry_after
+from job_scraper.metrics import ScrapeMetrics
+from tests.stub_server import StubServer
+
+
+def test_requests_to_a_host_are_capped():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def slow_page(handler):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return 'ok'
+
+    with StubServer({'/page': (200, slow_page, {})}) as server:
+        session = create_session(pool_size=2, max_per_host=2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(lambda _: session.get(f'{server.base_url}/page').status_code, range(8)))
+
+    assert statuses == [200] * 8
+    assert peak[0] == 2
+
+
+def test_waiting_on_a_busy_host_leaves_the_other_hosts_alone():
+    started, release = threading.Semaphore(0), threading.Event()
+
+    def blocked_page(handler):
+        started.release()
+        release.wait(5)
+        return 'ok'
+
+    with StubServer({'/blocked': (200, blocked_page, {}), '/page': (200, 'ok', {})}) as server:
+        port = server.server_address[1]
+        session = create_session(pool_size=2, max_concurrency=2, max_per_host=1)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # One request in flight to 127.0.0.1, the next one waits for the host's slot...
+            blocked = [executor.submit(session.get, f'http://127.0.0.1:{port}/blocked') for _ in range(2)]
+            assert started.acquire(timeout=5)
+            time.sleep(0.05)
+            # ...without taking the last global slot from localhost
+            other_host = executor.submit(session.get, f'http://localhost:{port}/page')
+            try:
+                assert other_host.result(timeout=2).status_code == 200
+            finally:
+                release.set()
+            assert [future.result().status_code for future in blocked] == [200, 200]
+
+
+def test_overloaded_answers_are_retried():
+    with StubServer({'/busy': (503, 'busy', {'Retry-After': '0'})}) as server:
+        session = create_session(pool_size=2)
+        session.backoff = 0.01
+        response = session.get(f'{server.base_url}/busy')
+        assert response.status_code == 503  # still failing after every retry
+        assert server.requests.count('/busy') == 4
+
+        # A transient failure is invisible to the caller
+        server.responses['/flaky'] = [(429, 'slow down', {'Retry-After': '0'}), (502, 'bad gateway', {}), (200, 'ok', {})]
+        assert session.get(f'{server.base_url}/flaky').text == 'ok'
+        assert server.requests.count('/flaky') == 3
+
+
+def test_responses_are_counted_in_the_metrics():
+    with StubServer({'/busy': [(503, 'busy', {'Retry-After': '0'}), (200, 'ok', {})]}) as server:
+        session = create_session(pool_size=2)
+        session.metrics = ScrapeMetrics()
+        assert session.get(f'{server.base_url}/busy').text == 'ok'
+
+    stats = session.metrics.snapshot()
+    assert (stats['pages'], stats['bytes'], stats['http_errors']) == (2, len('busy') + len('ok'), 1)
+    assert stats['timers']['http']['calls'] == 2
+
+
+def test_connection_errors_are_retried_then_raised():
+    session = create_session(pool_size=4)
+    session.backoff = 0.01
+    with StubServer() as server:
+        url = f'{server.base_url}/page'
+    # The server is gone, every attempt fails
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(url, timeout=1)
+    assert session.host_limiter(url).limit == 2  # halved once, not once per attempt
+
+
+def test_host_limit_grows_while_fast_and_halves_on_trouble():
+    limiter = HostLimiter(max_limit=8, initial=2)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+    assert limiter.limit == 5  # +1 per fast answer at first
+    limiter.acquire()
+    limiter.release(overloaded=True)
+    assert limiter.limit == 2.5
+    limiter.acquire()
+    limiter.release(latency=0.01)
+    assert limiter.limit == 2.9  # then +1 per {limit} answers
+    limiter.acquire()
+    limiter.release(latency=1.0)
+    assert limiter.limit == 2.9  # slow answers don't grow it
+
+
+def test_retry_after_and_backoff():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('soon') is None
+    assert all(0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt) for attempt in range(10))
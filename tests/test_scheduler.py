@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from job_scraper.scheduler import ScrapeScheduler, format_results
+from job_scraper.sources import SOURCES, ScraperSource, register_source
+from job_scraper.storage import load_page_hashes
+from job_scraper.waas.work_startup_scraper import SOURCE
+from tests.test_waas_scraper import job_page, waas_server  # noqa: F401, the fixture
+
+
+def listing(external_id):
+    return {'original_text': f'Job {external_id}', 'original_html': f'<p>Job {external_id}</p>',
+            'source': 'Fake', 'external_id': external_id}
+
+
+@pytest.fixture
+def fake_sources():
+    events = []
+
+    @register_source
+    class FakeSource(ScraperSource):
+        name = 'fake'
+
+        def iter_batches(self):
+            yield [listing('fake-1'), listing('fake-2')]
+            yield [listing('fake-2'), listing('fake-3')]
+
+        def saved(self, listings):
+            events.append(('saved', [item['external_id'] for item in listings]))
+
+        def close(self):
+            events.append(('close', self.name))
+
+    @register_source
+    class BrokenSource(ScraperSource):
+        name = 'broken'
+
+        def iter_batches(self):
+            yield [listing('broken-1')]
+            raise ConnectionError("connection reset")
+
+        def close(self):
+            events.append(('close', self.name))
+
+    yield events
+    del SOURCES['fake'], SOURCES['broken']
+
+
+def test_runs_sources_together_into_one_sink(db_path, fake_sources, waas_server, tmp_path):
+    messages = []
+    scheduler = ScrapeScheduler(db_path, ['fake', 'broken', 'waas'], update_func=messages.append,
+                                source_options={'waas': {'base_url': f'{waas_server.base_url}/jobs'}},
+                                metrics_path=str(tmp_path / 'metrics.json'))
+    results = scheduler.run()
+
+    assert results['fake'] | {'seconds': 0} == {'listings': 4, 'new': 3, 'seconds': 0, 'error': None, 'cancelled': False}
+    # A failing source keeps what it stored, and doesn't stop the others
+    assert results['broken']['new'] == 1 and results['broken']['error'] == 'connection reset'
+    assert results['waas']['new'] == 3 and results['waas']['error'] is None
+    assert ('saved', ['fake-2', 'fake-3']) in fake_sources
+    assert ('close', 'fake') in fake_sources and ('close', 'broken') in fake_sources
+    assert format_results(results) == 'fake: 3 new, broken: 1 new, failed (connection reset), waas: 3 new'
+    assert '[broken] Failed: connection reset' in messages
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM job_listings').fetchone() == (7,)
+    conn.close()
+
+    # The run's metrics, as dumped at the end
+    with open(tmp_path / 'metrics.json') as f:
+        metrics = json.load(f)
+    assert (metrics['listings'], metrics['new'], metrics['duplicates'], metrics['errors']) == (8, 7, 1, 1)
+    assert metrics['pages'] == len(waas_server.requests)
+    assert metrics['timers']['parse']['calls'] == metrics['pages']
+    assert metrics['timers']['db_write']['calls'] == 4  # one per batch
+
+
+def test_cancel_stores_the_jobs_parsed_so_far(db_path, waas_server):
+    released = threading.Event()
+
+    def stuck_job(handler):
+        released.wait(5)
+        return job_page(3)
+
+    waas_server.responses['/jobs/3'] = (200, stuck_job, {})
+    scheduler = None
+
+    def update_func(message):
+        # Both of acme's jobs are in, initech's is stuck
+        if message.endswith('2/3 jobs'):
+            scheduler.cancel()
+
+    scheduler = ScrapeScheduler(db_path, ['waas'], update_func=update_func,
+                                source_options={'waas': {'base_url': f'{waas_server.base_url}/jobs'}})
+    try:
+        results = scheduler.run()
+    finally:
+        released.set()
+
+    assert results['waas'] | {'seconds': 0} == {'listings': 2, 'new': 2, 'seconds': 0, 'error': None, 'cancelled': True}
+    assert format_results(results) == 'waas: 2 new, cancelled'
+    # acme and hooli (no jobs) are complete and skipped next time, initech is scraped again
+    assert set(load_page_hashes(db_path, SOURCE)) == {f'{waas_server.base_url}/companies/{name}' for name in ('acme', 'hooli')}
+
+
+def test_pages_are_parsed_in_worker_processes(db_path, waas_server):
+    scheduler = ScrapeScheduler(db_path, ['waas'], parse_workers=2,
+                                source_options={'waas': {'base_url': f'{waas_server.base_url}/jobs'}})
+    results = scheduler.run()
+
+    assert results['waas']['new'] == 3 and results['waas']['error'] is None
+    conn = sqlite3.connect(db_path)
+    texts = [row[0] for row in conn.execute('SELECT original_text FROM job_listings ORDER BY external_id')]
+    conn.close()
+    assert texts == [f'Job {job_id}: build things with Python.Remote friendly' for job_id in (1, 2, 3)]
+
+
+def test_unknown_source(db_path):
+    with pytest.raises(ValueError, match='Unknown source'):
+        ScrapeScheduler(db_path, ['nope'])
@@ -0,0 +1,112 @@
+import html
+import json
+import sqlite3
+
+import pytest
+
+from job_scraper.http_client import create_session
+from job_scraper.scheduler import ScrapeScheduler
+from job_scraper.storage import load_page_hashes
+from job_scraper.waas.work_startup_scraper import SOURCE
+from tests.stub_server import StubServer
+
+COMPANIES = {'acme': [1, 2], 'initech': [3], 'hooli': []}
+
+
+def company_page(base_url, jobs):
+    data = {'props': {'rawCompany': {'jobs': [{'show_path': f'{base_url}/jobs/{job_id}'} for job_id in jobs]}}}
+    return f'<html><body><div id="app" data-page="{html.escape(json.dumps(data))}"></div></body></html>'
+
+
+def job_page(job_id):
+    return f'''<html><body><div class="prose">
+      <div><span>About the role</span></div>
+      <p>Job {job_id}: build things with Python.</p>
+      <ul><li>Remote friendly</li></ul>
+      <div><span>How you'll contribute</span></div>
+      <p>Not part of the listing</p>
+    </div></body></html>'''
+
+
+@pytest.fixture
+def waas_server():
+    with StubServer() as server:
+        links = ''.join(f'<a target="company" href="{server.base_url}/companies/{name}">{name}</a>' * 2 for name in COMPANIES)
+        server.responses['/jobs'] = (200, f'<html><body>{links}</body></html>', {})
+        for name, jobs in COMPANIES.items():
+            server.responses[f'/companies/{name}'] = (200, company_page(server.base_url, jobs), {})
+            for job_id in jobs:
+                server.responses[f'/jobs/{job_id}'] = (200, job_page(job_id), {})
+        yield server
+
+
+def scrape(db_path, base_url, max_per_host=4, session=None, **options):
+    messages = []
+    scheduler = ScrapeScheduler(db_path, ['waas'], max_per_host=max_per_host, update_func=messages.append, session=session)
+    result = scheduler.run_source('waas', base_url=f'{base_url}/jobs', **options)
+    return result, messages
+
+
+def stored_ids(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT external_id, original_text FROM job_listings ORDER BY external_id').fetchall()
+    conn.close()
+    return rows
+
+
+def test_fetches_companies_and_jobs_concurrently(db_path, waas_server):
+    result, messages = scrape(db_path, waas_server.base_url, workers=4, max_per_host=2)
+
+    assert (result['new'], result['error']) == (3, None)
+    rows = stored_ids(db_path)
+    assert [external_id.rsplit('/', 1)[1] for external_id, _ in rows] == ['1', '2', '3']
+    assert rows[0][1].startswith('Job 1: build things with Python.')
+    assert "Not part of the listing" not in rows[0][1]
+    # Each company page is fetched once even when linked twice
+    assert waas_server.requests.count('/companies/acme') == 1
+    assert '[waas] Scraping: 3/3 companies, 3/3 jobs' in messages
+
+
+def test_rescrape_only_fetches_new_jobs(db_path, waas_server):
+    scrape(db_path, waas_server.base_url)
+    waas_server.requests.clear()
+    # initech posts a new job, acme and hooli don't change
+    server_url = waas_server.base_url
+    waas_server.responses['/companies/initech'] = (200, company_page(server_url, [3, 4]), {})
+    waas_server.responses['/jobs/4'] = (200, job_page(4), {})
+
+    result, _ = scrape(db_path, server_url)
+    assert result['new'] == 1
+    job_requests = sorted(path for path in waas_server.requests if path.startswith('/jobs/'))
+    assert job_requests == ['/jobs/4']
+
+
+def test_unchanged_companies_are_skipped(db_path, waas_server):
+    # A job page without an "About the role" section is never stored...
+    waas_server.responses['/jobs/2'] = (200, '<html><body>Closed</body></html>', {})
+    scrape(db_path, waas_server.base_url)
+    waas_server.requests.clear()
+
+    # ...but isn't fetched again as long as its company's jobs stay the same
+    scrape(db_path, waas_server.base_url)
+    assert not [path for path in waas_server.requests if path.startswith('/jobs/')]
+
+
+def test_a_scrape_without_jobs_completes(db_path, waas_server):
+    waas_server.responses['/jobs'] = (200, '<html><body>No companies today</body></html>', {})
+    result, _ = scrape(db_path, waas_server.base_url)
+    assert (result['new'], result['error'], result['cancelled']) == (0, None, False)
+
+
+def test_a_failing_job_is_skipped(db_path, waas_server):
+    waas_server.responses['/jobs/3'] = (500, 'Internal error', {})
+    session = create_session(pool_size=1)
+    session.backoff = 0.01
+    result, messages = scrape(db_path, waas_server.base_url, workers=1, batch_size=1, session=session)
+    assert (result['new'], result['error']) == (2, None)
+    assert len(stored_ids(db_path)) == 2
+    # Retried by the session before giving up on it
+    assert waas_server.requests.count('/jobs/3') == 4
+    assert any(message.startswith(f'[waas] Skipped {waas_server.base_url}/jobs/3') for message in messages)
+    # Its company is scraped again next time
+    assert f'{waas_server.base_url}/companies/initech' not in load_page_hashes(db_path, SOURCE)
@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from job_scraper.scheduler import ScrapeScheduler
+from job_scraper.utils import parse_workday_posted_on
+from job_scraper.workday.api_client import WorkdayApiClient, parse_workday_url
+from job_scraper.workday.browser_pool import BrowserPool
+from tests.stub_server import StubServer
+
+WORKDAY_FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'workday')
+
+
+def read_fixture(file_name):
+    with open(os.path.join(WORKDAY_FIXTURES, file_name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def workday_server():
+    # Replays JSON recorded from a career site's /wday/cxs/<tenant>/<site> endpoints.
+    # The tenant comes from the first label of the host name, here "localhost"
+    api_path = '/wday/cxs/localhost/External'
+    searches = []
+
+    def jobs_page(handler):
+        search = json.loads(handler.request_body)
+        searches.append(search)
+        return read_fixture(f"jobs_offset_{search['offset']}.json")
+
+    responses = {f'{api_path}/jobs': (200, jobs_page, {'Content-Type': 'application/json'})}
+    for file_name in os.listdir(WORKDAY_FIXTURES):
+        if file_name.startswith('job_'):
+            job = json.loads(read_fixture(file_name))['jobPostingInfo']
+            external_path = job['externalUrl'].split('/External', 1)[1]
+            responses[f'{api_path}{external_path}'] = (200, read_fixture(file_name), {'Content-Type': 'application/json'})
+    with StubServer(responses) as server:
+        server.searches = searches
+        yield server
+
+
+def test_parse_workday_url():
+    assert parse_workday_url('https://nvidia.wd5.myworkdayjobs.com/NVIDIAExternalCareerSite?jobFamilyGroup=0c40') == (
+        'https://nvidia.wd5.myworkdayjobs.com', 'nvidia', 'NVIDIAExternalCareerSite', {'jobFamilyGroup': ['0c40']})
+    base_url, tenant, site, facets = parse_workday_url(
+        'https://salesforce.wd12.myworkdayjobs.com/en-US/External_Career_Site/details/Lead_JR268932')
+    assert (tenant, site, facets) == ('salesforce', 'External_Career_Site', {})
+
+
+def test_parse_workday_posted_on():
+    today = date(2024, 3, 10)
+    assert parse_workday_posted_on('Posted Today', today) == today
+    assert parse_workday_posted_on('Posted Yesterday', today) == date(2024, 3, 9)
+    assert parse_workday_posted_on('Posted 5 Days Ago', today) == date(2024, 3, 5)
+    assert parse_workday_posted_on('Posted 30+ Days Ago', today) == date(2024, 2, 9)
+    assert parse_workday_posted_on('Recently', today) is None
+
+
+def test_fetches_recent_postings(workday_server):
+    client = WorkdayApiClient(workers=4)
+    company_url = f'http://localhost:{workday_server.server_address[1]}/en-US/External?jobFamilyGroup=abc'
+    listings = client.fetch_listings(company_url, lambda posting: '30+' not in posting['postedOn'])
+
+    assert [listing['external_id'] for listing in listings] == [f'JR{1990000 + i}' for i in range(25)]
+    assert listings[0]['original_text'].startswith('Senior Software Engineer\nWe are looking for')
+    assert listings[0]['source'].startswith('https://acme.wd5.myworkdayjobs.com/External/job/')
+    # The pages after the first one are requested together, up to the first one with older postings
+    assert sorted(search['offset'] for search in workday_server.searches) == [0, 20, 40]
+    assert workday_server.searches[0]['appliedFacets'] == {'jobFamilyGroup': ['abc']}
+
+
+def scrape(db_path, workday_server, browser_pool=None):
+    scheduler = ScrapeScheduler(db_path, ['workday'])
+    return scheduler.run_source('workday', browser_pool=browser_pool or BrowserPool(),
+                                companies={'ACME': f'http://localhost:{workday_server.server_address[1]}/External'})
+
+
+def test_scraper_uses_the_api(db_path, workday_server):
+    browser_pool = BrowserPool()
+    result = scrape(db_path, workday_server, browser_pool)
+
+    assert (result['new'], result['error']) == (25, None)  # every posting up to 7 days old
+    assert browser_pool.created == 0  # the browser was never needed
+
+
+def test_rescrape_stops_at_the_watermark(db_path, workday_server):
+    def scrape_new():
+        return scrape(db_path, workday_server)['new']
+
+    assert scrape_new() == 25
+    conn = sqlite3.connect(db_path)
+    newest_posted_on, seen_ids = conn.execute(
+        "SELECT newest_posted_on, seen_ids FROM workday_watermarks WHERE company = 'ACME'").fetchone()
+    conn.close()
+    assert newest_posted_on == date.today().isoformat()
+    assert json.loads(seen_ids)  # the postings from today
+
+    workday_server.requests.clear()
+    workday_server.searches.clear()
+    assert scrape_new() == 0
+    # Only the first page of postings is read, and no job is opened again
+    assert [search['offset'] for search in workday_server.searches] == [0]
+    assert all(path.endswith('/jobs') for path in workday_server.requests)
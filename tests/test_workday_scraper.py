@@ -1,36 +1,184 @@
+import json
+import sqlite3
+from datetime import date
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
 import pytest
-from selenium import webdriver
+import requests
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
 
+from job_scraper.scheduler import ScrapeScheduler
 from job_scraper.scraper_selectors.workday_selectors import WorkDaySelectors
-from job_scraper.utils import get_workday_company_urls
-
-
-@pytest.fixture(scope="module")
-def selenium_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    yield driver
-    driver.quit()
-
-@pytest.mark.parametrize(
-    "company_name, url", list(get_workday_company_urls().items())
-)
-def test_job_listing_xpath_present(selenium_driver, company_name, url):
-    selenium_driver.get(url)
-    wait = WebDriverWait(selenium_driver, 10)
-
-    try:
-        wait.until(EC.presence_of_element_located((By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)))
-    except TimeoutException:
-        pytest.fail(f"FAIL: JOB_LISTING_XPATH not found for {company_name}")
\ No newline at end of file
+from job_scraper.workday.browser_pool import BrowserPool
+from tests.stub_server import StubServer
+
+lxml_html = pytest.importorskip('lxml.html')
+
+# (job id, posted on) of each page of ACME's career site, as the browser renders them
+PAGES = [
+    [('JR1', 'Posted Today'), ('JR2', 'Posted Yesterday')],
+    [('JR3', 'Posted 3 Days Ago'), ('JR4', 'Posted 30+ Days Ago')],
+]
+
+
+def search_page(jobs, has_next, site='/External'):
+    rows = ''.join(f'''
+      <li class="css-1q2dra3">
+        <div><h3><a href="{site}/job/Remote/Engineer_{job_id}">Engineer {job_id}</a></h3></div>
+        <ul data-automation-id="subtitle"><li>{job_id}</li></ul>
+        <dl><dt>posted on</dt><dd class="css-129m7dg">{posted_on}</dd></dl>
+      </li>''' for job_id, posted_on in jobs)
+    next_button = '<button data-uxi-element-id="next" aria-label="next">next</button>' if has_next else ''
+    return f'<html><body><section><ul role="list">{rows}</ul></section><nav>{next_button}</nav></body></html>'
+
+
+def job_page(job_id):
+    return f'''<html><body><div data-automation-id="jobPostingDescription">
+      <p>Engineer {job_id}: build things with Python.</p><ul><li>Remote friendly</li></ul>
+    </div></body></html>'''
+
+
+class ReplayDriver:
+    """
+    Stands in for Chrome on a career site served by StubServer: pages are
+    fetched with requests and the scraper's XPaths run on them with lxml.
+    Clicking a job opens its description next to the list, as the site's
+    side panel does, and the next page button loads ?page=<n + 1>.
+    """
+    def __init__(self):
+        self.current_url = None
+        self.documents = []
+
+    def load(self, url):
+        response = requests.get(url, timeout=5)
+        if response.status_code != 200:
+            raise WebDriverException(f"{url} answered {response.status_code}")
+        return lxml_html.fromstring(response.text)
+
+    def get(self, url):
+        self.current_url = url
+        self.documents = [self.load(url)]
+
+    def open_panel(self, href):
+        self.documents = [self.documents[0], self.load(urljoin(self.current_url, href))]
+
+    def next_page(self):
+        parts = urlsplit(self.current_url)
+        page = int(dict(parse_qsl(parts.query)).get('page', 1))
+        self.get(urlunsplit(parts._replace(query=urlencode({'page': page + 1}))))
+
+    def find_elements(self, by, xpath):
+        return [ReplayElement(self, node) for document in self.documents for node in document.xpath(xpath)]
+
+    def find_element(self, by, xpath):
+        elements = self.find_elements(by, xpath)
+        if not elements:
+            raise NoSuchElementException(xpath)
+        return elements[0]
+
+    def quit(self):
+        pass
+
+
+class ReplayElement:
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+
+    @property
+    def text(self):
+        return ' '.join(self.node.text_content().split())
+
+    def get_attribute(self, name):
+        if name == 'innerHTML':
+            return (self.node.text or '') + ''.join(lxml_html.tostring(child, encoding='unicode') for child in self.node)
+        return self.node.get(name)
+
+    def find_elements(self, by, xpath):
+        return [ReplayElement(self.driver, node) for node in self.node.xpath(xpath)]
+
+    def find_element(self, by, xpath):
+        elements = self.find_elements(by, xpath)
+        if not elements:
+            raise NoSuchElementException(xpath)
+        return elements[0]
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        if self.node.get('href'):
+            self.driver.open_panel(self.node.get('href'))
+        else:
+            self.driver.next_page()
+
+
+class ReplayBrowserPool(BrowserPool):
+    def create_driver(self):
+        return ReplayDriver()
+
+
+@pytest.fixture
+def workday_site():
+    responses = {}
+    for number, jobs in enumerate(PAGES, 1):
+        path = '/External' if number == 1 else f'/External?page={number}'
+        responses[path] = (200, search_page(jobs, number < len(PAGES)), {'Content-Type': 'text/html'})
+        for job_id, _ in jobs:
+            responses[f'/External/job/Remote/Engineer_{job_id}'] = (200, job_page(job_id), {'Content-Type': 'text/html'})
+    with StubServer(responses) as server:
+        yield server
+
+
+def test_selectors_find_the_rendered_listings(workday_site):
+    driver = ReplayDriver()
+    driver.get(f'{workday_site.base_url}/External')
+
+    jobs = driver.find_elements(By.XPATH, WorkDaySelectors.JOB_LISTING_XPATH)
+    assert [job.find_element(By.XPATH, WorkDaySelectors.JOB_ID_XPATH).text for job in jobs] == ['JR1', 'JR2']
+    assert jobs[1].find_element(By.XPATH, WorkDaySelectors.POSTED_ON_XAPTH).text == 'Posted Yesterday'
+    jobs[0].find_element(By.XPATH, WorkDaySelectors.JOB_TITLE_XPATH).click()
+    description = driver.find_element(By.XPATH, WorkDaySelectors.JOB_DESCRIPTION_XPATH)
+    assert description.text.startswith('Engineer JR1: build things with Python.')
+    assert driver.find_element(By.XPATH, WorkDaySelectors.NEXT_PAGE_XPATH).is_enabled()
+
+
+def test_browser_scrape_stops_at_old_postings(db_path, workday_site):
+    scheduler = ScrapeScheduler(db_path, ['workday'])
+    result = scheduler.run_source('workday', backend='browser', browser_pool=ReplayBrowserPool(size=1),
+                                  companies={'ACME': f'{workday_site.base_url}/External'})
+
+    assert (result['new'], result['error']) == (3, None)
+    conn = sqlite3.connect(db_path)
+    external_ids = [row[0] for row in conn.execute('SELECT external_id FROM job_listings ORDER BY external_id')]
+    watermark = conn.execute("SELECT newest_posted_on, seen_ids FROM workday_watermarks WHERE company = 'ACME'").fetchone()
+    conn.close()
+    assert external_ids == ['JR1', 'JR2', 'JR3']
+    assert watermark == (date.today().isoformat(), json.dumps(['JR1']))
+    # The 30+ days old posting ends the crawl, it's never opened
+    assert '/External/job/Remote/Engineer_JR4' not in workday_site.requests
+
+
+def test_a_failing_company_keeps_its_watermark(db_path, workday_site):
+    # Hooli's second page fails once the postings of the first one were seen
+    workday_site.responses['/hooli/External'] = (200, search_page([('HL1', 'Posted Today')], True, '/hooli/External'), {})
+    workday_site.responses['/hooli/External/job/Remote/Engineer_HL1'] = (200, job_page('HL1'), {})
+    workday_site.responses['/hooli/External?page=2'] = (500, 'Internal error', {})
+    messages = []
+    scheduler = ScrapeScheduler(db_path, ['workday'], update_func=messages.append)
+    result = scheduler.run_source('workday', backend='browser', browser_pool=ReplayBrowserPool(size=2),
+                                  companies={'ACME': f'{workday_site.base_url}/External',
+                                             'Hooli': f'{workday_site.base_url}/hooli/External'})
+
+    assert result['new'] == 3
+    assert result['error'].startswith('Scraping failed for Hooli (')
+    assert any(message.startswith('[workday] Scraping Hooli failed') for message in messages)
+    conn = sqlite3.connect(db_path)
+    watermarks = [row[0] for row in conn.execute('SELECT company FROM workday_watermarks')]
+    conn.close()
+    # ACME's watermark moves, Hooli's postings are scraped again next time
+    assert watermarks == ['ACME']